@@ -17,6 +17,8 @@ from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from app.core.config import settings
+from mongodb_config import mongodb_config
+from mongodb_indexes import ensure_collections
 
 logger = logging.getLogger(__name__)
 
@@ -286,101 +288,70 @@ async def init_sql_database() -> None:
         raise
 
 
-# MongoDB globals
-sync_client: Optional[MongoClient] = None
-async_client: Optional[AsyncIOMotorClient] = None
-mongodb: Optional[MongoClient] = None
-async_mongodb = None
-
-
-from pymongo import MongoClient
-from app.core.config import settings
-
+# MongoDB clients come from the shared connection manager in mongodb_config
 def get_mongodb_client() -> MongoClient:
-    """Get MongoDB client for local setup."""
-    global sync_client
-    if sync_client is None:
-        sync_client = MongoClient(
-            settings.MONGO_URI,
-            serverSelectionTimeoutMS=5000,
-            connectTimeoutMS=10000,
-            socketTimeoutMS=10000
-        )
-    return sync_client
+    """Get the shared synchronous MongoDB client."""
 
+    return mongodb_config.get_sync_client()
 
 
 def get_mongodb_database():
     """Get synchronous MongoDB database."""
 
-    global mongodb
-    if mongodb is None:
-        client = get_mongodb_client()
-        mongodb = client[settings.MONGO_DB_NAME]
-    return mongodb
+    return mongodb_config.get_database()
 
 
 async def get_async_mongodb_client() -> AsyncIOMotorClient:
-    """Get asynchronous MongoDB client."""
-
-    global async_client
-    if async_client is None:
-        async_client = AsyncIOMotorClient(
-            settings.MONGO_URI,
-            serverSelectionTimeoutMS=5000,
-            connectTimeoutMS=10000,
-            socketTimeoutMS=10000,
-        )
-    return async_client
+    """Get the shared asynchronous MongoDB client."""
+
+    return mongodb_config.get_async_client()
 
 
 async def get_async_mongodb_database():
     """Get asynchronous MongoDB database."""
 
-    global async_mongodb
-    if async_mongodb is None:
-        client = await get_async_mongodb_client()
-        async_mongodb = client[settings.MONGO_DB_NAME]
-    return async_mongodb
+    return mongodb_config.get_async_database()
+
+
+def get_mongodb_pool_stats() -> dict:
+    """Connection pool checkout and wait metrics."""
 
+    return mongodb_config.pool_stats()
 
-async def init_mongodb() -> None:
-    """Initialize MongoDB if a server is available."""
 
-    global sync_client, mongodb
+async def init_mongodb(create_mongodb_indexes: bool = False) -> None:
+    """Initialize MongoDB if a server is available.
+
+    Indexes are only created when ``create_mongodb_indexes`` is set, which the
+    deploy script (``init_db.py``) does; application startup just checks the
+    connection.
+    """
 
     try:
-        client = get_mongodb_client()
-        client.admin.command("ping")
+        database = await get_async_mongodb_database()
+        await database.command("ping")
     except PyMongoError as exc:  # pragma: no cover - startup logging
         logger.warning(
             "⚠️ MongoDB not reachable (%s). Continuing without MongoDB features.",
             exc,
         )
-        if sync_client is not None:
-            sync_client.close()
-            sync_client = None
-        mongodb = None
         return
     except Exception as exc:  # pragma: no cover - startup logging
         logger.warning(
             "⚠️ Unexpected MongoDB issue (%s). Continuing without MongoDB features.",
             exc,
         )
-        if sync_client is not None:
-            sync_client.close()
-            sync_client = None
-        mongodb = None
         return
 
-    logger.info("✅ MongoDB connected successfully to: %s", settings.MONGO_DB_NAME)
+    logger.info("✅ MongoDB connected successfully to: %s", mongodb_config.database_name)
 
-    await create_indexes()
-    logger.info("✅ MongoDB indexes created successfully")
+    if create_mongodb_indexes:
+        await create_indexes()
+        logger.info("✅ MongoDB indexes created successfully")
 
 
 async def create_indexes() -> None:
-    """Create MongoDB indexes for performance."""
+    """Provision retention and create the MongoDB indexes defined in mongodb_indexes."""
 
     try:
         db = get_mongodb_database()
@@ -392,10 +363,13 @@ async def create_indexes() -> None:
         return
 
     try:
-        db.knowledge_database.create_index([("content", "text")])
-        db.chat_history.create_index([("user_id", 1), ("created_at", -1)])
-        db.user_sessions.create_index([("user_id", 1)])
-        db.scraped_data.create_index([("source_id", 1)])
+        await asyncio.to_thread(
+            ensure_collections,
+            db,
+            mongodb_config.collections,
+            mongodb_config.retention_days,
+            mongodb_config.expiry_fields,
+        )
 
         logger.info("✅ MongoDB indexes ensured")
 
@@ -408,17 +382,17 @@ async def create_indexes() -> None:
         logger.warning("⚠️ Failed to create MongoDB indexes: %s", exc)
 
 
-async def init_db() -> None:
+async def init_db(create_mongodb_indexes: bool = False) -> None:
     """Initialize both SQL and MongoDB resources."""
 
     await init_sql_database()
-    await init_mongodb()
+    await init_mongodb(create_mongodb_indexes)
 
 
 async def close_db() -> None:
     """Close database connections for SQLAlchemy and MongoDB."""
 
-    global engine, SessionLocal, async_engine, async_session_factory, sync_client, async_client, mongodb, async_mongodb
+    global engine, SessionLocal, async_engine, async_session_factory
 
     try:
         if async_engine is not None:
@@ -431,15 +405,7 @@ async def close_db() -> None:
             engine = None
         SessionLocal = None
 
-        if sync_client is not None:
-            sync_client.close()
-            sync_client = None
-        if async_client is not None:
-            async_client.close()
-            async_client = None
-
-        mongodb = None
-        async_mongodb = None
+        mongodb_config.close_connections()
 
         logger.info("✅ Database connections closed")
 
@@ -472,5 +438,6 @@ __all__ = [
     "close_db",
     "get_collection",
     "get_async_collection",
+    "get_mongodb_pool_stats",
 ]
 
@@ -0,0 +1,191 @@
+"""
+Process-local read caches kept in sync with MongoDB across workers
+
+``LocalCache`` holds query results tagged with what they depend on: a
+``(collection, key)`` pair such as ``("knowledge_database", "admissions")``,
+or ``(collection, None)`` for results that depend on the whole collection.
+
+``CacheInvalidationWatcher`` pushes other workers' writes into the cache.
+On replica sets and sharded clusters it follows a change stream on the
+watched collections; on standalone servers, which have no change streams,
+it polls the ``cache_versions`` document that writers bump with
+``version_bump``. Either way only the entries depending on a changed
+category or source are dropped, so workers converge within a poll interval
+without reloading everything.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+CACHE_VERSIONS_ID = "cache_versions"  # Document in the database_stats collection
+
+# The field whose value identifies what a change touched, per watched collection
+INVALIDATION_KEYS = {
+    "knowledge_database": "category",
+    "scraped_data": "source_id"
+}
+
+# Server errors meaning change streams are unavailable (standalone server, old version)
+CHANGE_STREAM_UNSUPPORTED = {40573, 40324}
+CHANGE_STREAM_HISTORY_LOST = 286
+
+MISSING = object()
+
+Tag = Tuple[str, Optional[str]]
+
+
+def tag_key(key: Optional[str]) -> Optional[str]:
+    """``key`` as stored in tags and in cache_versions field names (no dots or dollars)"""
+    return key.replace(".", "_").replace("$", "_") if key is not None else None
+
+
+def version_field(collection: str, key: str) -> str:
+    """Field of the cache_versions document counting changes to one key"""
+    return f"{collection}.{tag_key(key)}"
+
+
+def version_bump(collection: str, keys: Iterable[str]) -> Dict[str, Any]:
+    """Update recording that ``keys`` of ``collection`` changed (for polling workers)"""
+    return {"$inc": {version_field(collection, key): 1 for key in set(keys)}}
+
+
+class LocalCache:
+    """Tagged query results with a TTL as a backstop against missed invalidations"""
+
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[float, Any, Tuple[Tag, ...]]] = {}
+        self._tagged: Dict[Tag, Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        """Cached value for ``key``, or ``MISSING``"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        if entry[0] < time.monotonic():
+            self._drop(key)
+            return MISSING
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[Tag]):
+        self._drop(key)
+        while len(self._entries) >= self.max_entries:
+            self._drop(next(iter(self._entries)))  # Oldest first
+        tags = tuple((collection, tag_key(key)) for collection, key in tags)
+        self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+        for tag in tags:
+            self._tagged.setdefault(tag, set()).add(key)
+
+    def invalidate(self, collection: str, key: Optional[str] = None) -> int:
+        """Drop entries depending on ``key`` of ``collection`` (every entry of it when None)"""
+        if key is None:
+            tags = [tag for tag in self._tagged if tag[0] == collection]
+        else:
+            tags = [(collection, tag_key(key)), (collection, None)]
+        dropped = 0
+        for tag in tags:
+            for cache_key in list(self._tagged.get(tag, ())):
+                dropped += self._drop(cache_key)
+        return dropped
+
+    def clear(self):
+        self._entries.clear()
+        self._tagged.clear()
+
+    def _drop(self, key: Hashable) -> int:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return 0
+        for tag in entry[2]:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+        return 1
+
+
+class CacheInvalidationWatcher:
+    """Background task applying MongoDB changes to a ``LocalCache``"""
+
+    def __init__(self, mongodb, cache: LocalCache, poll_interval: float = 2.0, retry_delay: float = 5.0):
+        self.mongodb = mongodb
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.mode = "starting"
+        self._resume_token = None
+        self._versions: Optional[Dict[str, Dict[str, int]]] = None
+
+    async def run(self):
+        """Follow change streams, falling back to version polling where unsupported"""
+        while True:
+            try:
+                if self.mode == "polling":
+                    await self._poll_versions()
+                else:
+                    await self._follow_change_stream()
+            except OperationFailure as e:
+                if e.code in CHANGE_STREAM_UNSUPPORTED:
+                    print("⚠️ Change streams unavailable (standalone server); polling cache versions")
+                    self.mode = "polling"
+                    continue
+                if e.code == CHANGE_STREAM_HISTORY_LOST:
+                    # Changes since the resume token are gone: start over from a clean cache
+                    self._resume_token = None
+                    self.cache.clear()
+                    continue
+                print(f"❌ Cache invalidation watcher failed: {str(e)}")
+                await asyncio.sleep(self.retry_delay)
+            except PyMongoError as e:
+                print(f"❌ Cache invalidation watcher failed: {str(e)}")
+                await asyncio.sleep(self.retry_delay)
+
+    async def _follow_change_stream(self):
+        pipeline = [{"$match": {"ns.coll": {"$in": [self.mongodb.collections[name] for name in INVALIDATION_KEYS]}}}]
+        database = self.mongodb.get_async_database()
+        async with database.watch(pipeline, full_document="updateLookup", resume_after=self._resume_token) as stream:
+            if self._resume_token is None:
+                # Without a resume point, anything cached before the stream opened may be stale
+                for collection in INVALIDATION_KEYS:
+                    self.cache.invalidate(collection)
+            self._resume_token = stream.resume_token
+            self.mode = "change_stream"
+            async for change in stream:
+                self._resume_token = stream.resume_token
+                self.apply_change(change)
+
+    def apply_change(self, change: Dict[str, Any]):
+        """Invalidate what one change stream event touched"""
+        collection = next((name for name, stored in self.mongodb.collections.items()
+                           if stored == change.get("ns", {}).get("coll")), None)
+        if collection not in INVALIDATION_KEYS:
+            return
+        document = change.get("fullDocument") or {}
+        key = document.get(INVALIDATION_KEYS[collection])
+        # Deletes and drops carry no document: the whole collection may have changed
+        self.cache.invalidate(collection, key if isinstance(key, str) else None)
+
+    async def _poll_versions(self):
+        stats = self.mongodb.get_async_collection("database_stats")
+        while True:
+            document = await stats.find_one({"_id": CACHE_VERSIONS_ID}) or {}
+            versions = {collection: dict(document.get(collection) or {}) for collection in INVALIDATION_KEYS}
+            if self._versions is None:
+                for collection in INVALIDATION_KEYS:
+                    self.cache.invalidate(collection)
+            else:
+                for collection, keys in versions.items():
+                    seen = self._versions.get(collection, {})
+                    for key, version in keys.items():
+                        if seen.get(key) != version:
+                            self.cache.invalidate(collection, key)
+            self._versions = versions
+            await asyncio.sleep(self.poll_interval)
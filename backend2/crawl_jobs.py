@@ -0,0 +1,243 @@
+"""
+Crawl jobs shared by every web worker and the crawler process
+
+Workers submit jobs and serve their progress; the crawler process runs them.
+All state lives in one directory on the filesystem the processes share:
+
+- ``<id>.json``: the job document, replaced atomically on every update
+- ``<id>.events``: progress events appended as JSON lines by the crawler
+- ``active/<source_id>``: claim on a source by the job that will crawl it,
+  created exclusively so two workers never queue the same source twice
+
+A job is written as ``submitting`` before it claims its sources and becomes
+``queued`` once it holds them; the crawler only picks up ``queued`` jobs.
+The crawler's own scheduled crawls claim their sources the same way, as
+jobs that go straight to ``running``.
+"""
+
+import json
+import os
+import tempfile
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+JOB_SUFFIX = ".json"
+EVENTS_SUFFIX = ".events"
+FINAL_STATES = ("completed", "failed")
+SUBMIT_TIMEOUT = 60  # Seconds after which a job still ``submitting`` belongs to a worker that died
+
+
+class CrawlJobStore:
+    """Crawl job documents, progress events and source claims under ``directory``"""
+
+    def __init__(self, directory: str, history: int = 50):
+        self.directory = directory
+        self.active_dir = os.path.join(directory, "active")
+        self.history = history
+
+    def _job_path(self, job_id: str) -> str:
+        return os.path.join(self.directory, job_id + JOB_SUFFIX)
+
+    def _events_path(self, job_id: str) -> str:
+        return os.path.join(self.directory, job_id + EVENTS_SUFFIX)
+
+    def _claim_path(self, source_id: str) -> str:
+        return os.path.join(self.active_dir, source_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """The job document with ``job_id``, or None"""
+        if not job_id or os.sep in job_id or (os.altsep and os.altsep in job_id):
+            return None
+        try:
+            with open(self._job_path(job_id), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save(self, job: Dict[str, Any]):
+        """Write ``job`` to a temporary file and rename it into place, so readers never see a partial document"""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(job, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, self._job_path(job["id"]))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        """Every stored job, newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        jobs = [self.get(name[:-len(JOB_SUFFIX)]) for name in os.listdir(self.directory) if name.endswith(JOB_SUFFIX)]
+        return sorted((job for job in jobs if job), key=lambda job: job["created_at"], reverse=True)
+
+    def queued(self) -> List[Dict[str, Any]]:
+        """Jobs waiting for the crawler, oldest first"""
+        return [job for job in reversed(self.jobs()) if job["status"] == "queued"]
+
+    def active_sources(self) -> Dict[str, str]:
+        """Source id -> id of the queued or running job crawling it"""
+        if not os.path.isdir(self.active_dir):
+            return {}
+        claims = {}
+        for source_id in os.listdir(self.active_dir):
+            job_id = self._claim_owner(source_id)
+            job = self.get(job_id) if job_id else None
+            if job is not None and job["status"] not in FINAL_STATES:
+                claims[source_id] = job_id
+        return claims
+
+    def _claim_owner(self, source_id: str) -> Optional[str]:
+        try:
+            with open(self._claim_path(source_id), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _claim(self, source_id: str, job_id: str) -> Optional[str]:
+        """Claim ``source_id`` for ``job_id``; returns the id of the live job already holding it, if any"""
+        path = self._claim_path(source_id)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                owner = self._claim_owner(source_id)
+                job = self.get(owner) if owner else None
+                if job is not None and job["status"] not in FINAL_STATES:
+                    return owner
+                # Left behind by a job that finished or was never written
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(job_id)
+            return None
+        return self._claim_owner(source_id)
+
+    def release(self, job_id: str, source_id: str):
+        """Drop ``job_id``'s claim on ``source_id``"""
+        if self._claim_owner(source_id) == job_id:
+            try:
+                os.remove(self._claim_path(source_id))
+            except FileNotFoundError:
+                pass
+
+    def _create(self, source_ids: List[str], kind: str) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Write a ``submitting`` job holding the claims it could take on ``source_ids``"""
+        os.makedirs(self.active_dir, exist_ok=True)
+        job = {
+            "id": uuid.uuid4().hex[:12],
+            "kind": kind,
+            "sources": [],
+            "status": "submitting",
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "current_source": None,
+            "last_url": None,
+            "pages_done": 0,
+            "pages_failed": 0,
+            "results": {},
+            "error": None,
+            "event_count": 0
+        }
+        self.save(job)
+
+        already_running = {}
+        for source_id in source_ids:
+            owner = self._claim(source_id, job["id"])
+            if owner:
+                already_running[source_id] = owner
+            else:
+                job["sources"].append(source_id)
+        return job, already_running
+
+    def submit(self, source_ids: List[str], kind: str = "sources") -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Queue a crawl of the sources no other job is crawling; returns ``(job, already_running)``
+
+        ``already_running`` maps each requested source that is already being
+        crawled to the id of that job. When every requested source is taken,
+        no job is created and the job crawling the first one is returned.
+        """
+        job, already_running = self._create(source_ids, kind)
+        if not job["sources"]:
+            self._remove(job["id"])
+            existing = self.get(already_running[source_ids[0]])
+            if existing is not None:
+                return existing, already_running
+            return self.submit(source_ids, kind)  # The holder was pruned meanwhile, so its claims are stale
+
+        job["status"] = "queued"
+        self.save(job)
+        self.prune()
+        return job, already_running
+
+    def start(self, source_ids: List[str], kind: str) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Claim the sources no other job is crawling for a crawl the caller runs itself
+
+        Like ``submit``, but the job is ``running`` at once and never queued,
+        and it is created even when every source is taken (with no sources).
+        """
+        job, already_running = self._create(source_ids, kind)
+        job["status"] = "running"
+        job["started_at"] = datetime.now().isoformat()
+        self.save(job)
+        self.prune()
+        return job, already_running
+
+    def add_event(self, job: Dict[str, Any], event: str, data: Dict[str, Any]):
+        """Append a progress event and save ``job`` with its new event count"""
+        job["event_count"] += 1
+        line = json.dumps({"seq": job["event_count"], "event": event, "data": data}, ensure_ascii=False, default=str)
+        with open(self._events_path(job["id"]), "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        self.save(job)
+
+    def read_events(self, job_id: str, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """Complete events written after byte ``offset`` and the offset to continue from"""
+        try:
+            with open(self._events_path(job_id), "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], offset
+        end = data.rfind(b"\n") + 1  # A line still being written is read on the next call
+        events = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+        return events, offset + end
+
+    def recover(self) -> List[str]:
+        """Fail jobs a dead crawler or worker left unfinished and release their claims; returns their ids"""
+        failed = []
+        now = datetime.now()
+        for job in self.jobs():
+            abandoned = job["status"] == "submitting" and (now - datetime.fromisoformat(job["created_at"])).total_seconds() > SUBMIT_TIMEOUT
+            if job["status"] == "running" or abandoned:
+                job["error"] = "Crawler process restarted" if job["status"] == "running" else "Submission was interrupted"
+                job["status"] = "failed"
+                job["current_source"] = None
+                job["finished_at"] = datetime.now().isoformat()
+                self.add_event(job, "failed", dict(job))
+                failed.append(job["id"])
+            if job["status"] in FINAL_STATES:
+                for source_id in job["sources"]:
+                    self.release(job["id"], source_id)
+        return failed
+
+    def prune(self):
+        """Forget all but the newest ``history`` finished jobs"""
+        finished = [job for job in self.jobs() if job["status"] in FINAL_STATES]
+        for job in finished[self.history:]:
+            self._remove(job["id"])
+
+    def _remove(self, job_id: str):
+        for path in (self._job_path(job_id), self._events_path(job_id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -7,27 +7,42 @@ from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
 
 class ScrapedDataModel(BaseModel):
-    """Model for scraped website data"""
+    """Model for the per-source summary of scraped website data (pages live in scraped_pages)"""
     source_id: str = Field(..., description="Unique identifier for the source")
     source_name: str = Field(..., description="Human-readable name of the source")
     url: str = Field(..., description="Main URL of the source")
     status: str = Field(..., description="Scraping status (success, failed, in_progress)")
     timestamp: datetime = Field(default_factory=datetime.now, description="When data was scraped")
-    depth: int = Field(..., description="Current scraping depth")
-    max_depth: int = Field(..., description="Maximum allowed depth")
-    max_pages: int = Field(..., description="Maximum allowed pages")
+    depth: int = Field(default=0, description="Deepest page depth reached")
+    max_depth: Optional[int] = Field(None, description="Maximum allowed depth")
+    max_pages: Optional[int] = Field(None, description="Maximum allowed pages")
     total_pages_scraped: int = Field(default=0, description="Total pages scraped")
-    content: Dict[str, Any] = Field(default_factory=dict, description="Extracted content")
-    sub_pages: List[Dict[str, Any]] = Field(default_factory=list, description="Sub-page data")
+    changed_pages: int = Field(default=0, description="Pages whose content changed in the last crawl")
     error_message: Optional[str] = Field(None, description="Error message if scraping failed")
     processing_time: Optional[float] = Field(None, description="Time taken to scrape in seconds")
 
+class ScrapedPageModel(BaseModel):
+    """Model for one scraped page: extracted fields and a reference to its raw body"""
+    source_id: str = Field(..., description="ID of the source the page belongs to")
+    url: str = Field(..., description="URL of the page")
+    parent_url: Optional[str] = Field(None, description="Page the URL was discovered on")
+    depth: int = Field(default=0, description="Link depth from the source's main URL")
+    status: str = Field(..., description="Scraping status (success, error, skipped)")
+    timestamp: str = Field(..., description="When the page was last fetched (ISO format)")
+    content: Dict[str, Any] = Field(default_factory=dict, description="Extracted content")
+    body_hash: Optional[str] = Field(None, description="SHA-256 of the raw body in the page body store")
+    error: Optional[str] = Field(None, description="Error message if the fetch failed")
+    reason: Optional[str] = Field(None, description="Why the page was skipped")
+    last_changed: datetime = Field(default_factory=datetime.now, description="When the page content last changed")
+    last_seen: datetime = Field(default_factory=datetime.now, description="Save that last included the page")
+
 class KnowledgeDatabaseModel(BaseModel):
     """Model for knowledge database entries"""
     category: str = Field(..., description="Content category (admissions, courses, research, etc.)")
     content: str = Field(..., description="The actual content text")
     source_url: str = Field(..., description="URL where this content was found")
     source_id: str = Field(..., description="ID of the source where content was found")
+    content_hash: Optional[str] = Field(None, description="Hash of category, source and content; the upsert key")
     keywords: List[str] = Field(default_factory=list, description="Extracted keywords")
     relevance_score: float = Field(default=1.0, description="Relevance score (0-1)")
     timestamp: datetime = Field(default_factory=datetime.now, description="When content was added")
@@ -55,7 +70,9 @@ class UserSessionModel(BaseModel):
     last_active: datetime = Field(default_factory=datetime.now, description="Last activity timestamp")
     total_messages: int = Field(default=0, description="Total messages in this session")
     total_responses: int = Field(default=0, description="Total AI responses in this session")
-    average_response_time: float = Field(default=0.0, description="Average response time in ms")
+    average_response_time: float = Field(default=0.0, description="Average response time in ms (derived on read)")
+    total_response_time: float = Field(default=0.0, description="Sum of timed response times in ms")
+    timed_responses: int = Field(default=0, description="Responses included in total_response_time")
     preferred_topics: List[str] = Field(default_factory=list, description="Topics user frequently asks about")
     session_duration: Optional[float] = Field(None, description="Session duration in seconds")
     is_active: bool = Field(default=True, description="Whether session is currently active")
@@ -66,12 +83,15 @@ class AnalyticsModel(BaseModel):
     user_id: Optional[str] = Field(None, description="User ID for user-specific analytics")
     total_messages: int = Field(default=0, description="Total messages on this date")
     total_responses: int = Field(default=0, description="Total AI responses on this date")
-    average_response_time: float = Field(default=0.0, description="Average response time in ms")
+    average_response_time: float = Field(default=0.0, description="Average response time in ms (derived on read)")
+    total_response_time: float = Field(default=0.0, description="Sum of timed response times in ms")
+    timed_responses: int = Field(default=0, description="Responses included in total_response_time")
     most_asked_topics: List[str] = Field(default_factory=list, description="Most frequently asked topics")
     database_hits: int = Field(default=0, description="Times knowledge database was used")
     fallback_usage: int = Field(default=0, description="Times fallback responses were used")
     user_satisfaction: Optional[float] = Field(None, description="Average user satisfaction rating")
     peak_usage_hour: Optional[int] = Field(None, description="Hour with highest usage (0-23)")
+    created_at: datetime = Field(default_factory=datetime.now, description="When the entry was created; drives retention")
 
 class ScrapingLogModel(BaseModel):
     """Model for scraping operation logs"""
@@ -99,10 +119,12 @@ class DatabaseStatsModel(BaseModel):
     last_database_update: datetime = Field(..., description="When knowledge database was last updated")
     scraping_frequency: str = Field(..., description="How often scraping occurs")
     total_storage_used: Optional[str] = Field(None, description="Total storage used by database")
+    storage_by_collection: Dict[str, int] = Field(default_factory=dict, description="Bytes on disk (data and indexes) per collection")
 
 # Database collection names
 COLLECTIONS = {
     'scraped_data': 'scraped_data',
+    'scraped_pages': 'scraped_pages',
     'knowledge_database': 'knowledge_database', 
     'chat_history': 'chat_history',
     'user_sessions': 'user_sessions',
@@ -1,77 +1,315 @@
 """
 Database Service Layer for MongoDB Operations
+
+Every method runs on Motor collections, so Mongo round trips are awaited
+instead of blocking the event loop. The synchronous pymongo client in
+``mongodb_config`` is only for CLI scripts such as ``init_mongodb.py``,
+which also create the indexes.
 """
 
 import asyncio
+import gzip
+import hashlib
+import json
+import os
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
-from bson import ObjectId
+from typing import Dict, Any, AsyncIterator, Iterable, List, Optional, Tuple
+from bson import ObjectId, json_util
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 from mongodb_config import mongodb_config
 from database_models import (
-    ScrapedDataModel, KnowledgeDatabaseModel, ChatHistoryModel,
+    ScrapedDataModel, ScrapedPageModel, KnowledgeDatabaseModel, ChatHistoryModel,
     UserSessionModel, AnalyticsModel, ScrapingLogModel, DatabaseStatsModel
 )
+from page_store import PageRecord, SourceStats
+from page_bodies import RAW_PAGES_DIR, PageBodyStore
+from cache_invalidation import (
+    CACHE_VERSIONS_ID, MISSING, CacheInvalidationWatcher, LocalCache, version_bump
+)
+from near_duplicates import NearDuplicateIndex
+from process_lock import ProcessLock
+
+# Page content lists stored as knowledge items, by knowledge category
+KNOWLEDGE_CONTENT_CATEGORIES = {
+    "admission_info": "admissions",
+    "course_info": "courses",
+    "research_info": "research"
+}
+
+# Knowledge item upserts sent per unordered bulk_write
+KNOWLEDGE_BULK_BATCH_SIZE = int(os.getenv("KNOWLEDGE_BULK_BATCH_SIZE", "1000"))
+
+# Knowledge item fields a recrawl refreshes; an item seen with all of them as stored is unchanged
+KNOWLEDGE_REFRESHED_FIELDS = ("source_url", "keywords", "relevance_score")
+
+# Scraped page upserts sent per unordered bulk_write
+SCRAPED_PAGES_BATCH_SIZE = 1000
+
+# Queued session/analytics counter upserts: flush interval (seconds) and early-flush size
+COUNTER_FLUSH_INTERVAL = float(os.getenv("COUNTER_FLUSH_INTERVAL", "2"))
+COUNTER_MAX_PENDING = 1000
+
+def knowledge_content_hash(category: str, source_id: str, content: str) -> str:
+    """Upsert key of a knowledge item: one document per category, source and content"""
+    return hashlib.sha1(f"{category}\0{source_id}\0{content}".encode("utf-8")).hexdigest()
+
+# Archival of documents about to expire (see MongoDBConfig.retention_days)
+ARCHIVE_DIR = os.getenv("MONGO_ARCHIVE_DIR", "mongo_archives")
+ARCHIVE_LEAD_DAYS = float(os.getenv("ARCHIVE_LEAD_DAYS", "2"))  # Export this long before expiry
+ARCHIVE_INTERVAL = float(os.getenv("ARCHIVE_INTERVAL", "21600"))  # Seconds between archival runs
+ARCHIVE_BATCH_SIZE = 1000
+
+# Only the worker holding this lock refreshes stats and archives, so workers never export documents twice
+MAINTENANCE_LOCK_PATH = os.getenv("MONGO_MAINTENANCE_LOCK", os.path.join(ARCHIVE_DIR, "maintenance.lock"))
+MAINTENANCE_ELECTION_INTERVAL = 30  # Seconds between other workers' attempts to take over
+
+# Knowledge item fields returned by search_knowledge_database
+KNOWLEDGE_SEARCH_FIELDS = ("content", "category", "source_url", "relevance_score")
+
+# Local knowledge/scraped data read cache: TTL backstop and version poll interval (seconds)
+KNOWLEDGE_CACHE_TTL = float(os.getenv("KNOWLEDGE_CACHE_TTL", "300"))
+CACHE_VERSION_POLL_INTERVAL = float(os.getenv("CACHE_VERSION_POLL_INTERVAL", "2"))
+
+# Chat history fields the chat UI renders, a per-user read cache TTL (seconds) and the export batch size
+CHAT_HISTORY_FIELDS = ("type", "message", "response", "timestamp", "source_used")
+CHAT_HISTORY_CACHE_TTL = float(os.getenv("CHAT_HISTORY_CACHE_TTL", "30"))
+CHAT_EXPORT_BATCH_SIZE = 500
+
+# Seconds between database_stats refreshes by run_stats_updater
+STATS_UPDATE_INTERVAL = float(os.getenv("STATS_UPDATE_INTERVAL", "900"))
+
+def format_bytes(size: float) -> str:
+    """Human-readable size, e.g. '12.3 MB'"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+def merge_counter_update(target: Dict[str, Any], update: Dict[str, Any]):
+    """Fold one counter update into another so both apply as a single upsert"""
+    for operator, fields in update.items():
+        merged = target.setdefault(operator, {})
+        for field, value in fields.items():
+            if operator == "$inc":
+                merged[field] = merged.get(field, 0) + value
+            elif operator == "$max":
+                merged[field] = max(merged[field], value) if field in merged else value
+            elif operator == "$addToSet":
+                current = merged.get(field)
+                values = current["$each"] if isinstance(current, dict) else ([] if current is None else [current])
+                for item in (value["$each"] if isinstance(value, dict) else [value]):
+                    if item not in values:
+                        values.append(item)
+                merged[field] = {"$each": values}
+            elif operator == "$setOnInsert":
+                merged.setdefault(field, value)
+            else:
+                merged[field] = value
 
 class DatabaseService:
     """Service layer for all database operations"""
     
     def __init__(self):
         self.mongodb = mongodb_config
-        self.mongodb.connect_sync()
-        self.mongodb.create_indexes()
+        # (collection, filter items) -> merged counter upsert, see record_chat_turn
+        self._pending_counters: Dict[Tuple[str, Tuple], Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        self._counter_flush: Optional[asyncio.Task] = None
+        # Knowledge and scraped data reads, invalidated by run_cache_watcher
+        self.cache = LocalCache(KNOWLEDGE_CACHE_TTL)
+        # Recent chat history per user; this worker's writes invalidate it, others' age out with the TTL
+        self.chat_cache = LocalCache(CHAT_HISTORY_CACHE_TTL)
+        # Raw page bodies written by the crawler, referenced by scraped_pages.body_hash
+        self.page_bodies = PageBodyStore(RAW_PAGES_DIR) if RAW_PAGES_DIR else None
+        # Loops started by start_background_tasks
+        self._background_tasks: List[asyncio.Task] = []
+    
+    # ==================== BACKGROUND TASKS ====================
+    
+    def start_background_tasks(self):
+        """Start this worker's background loops; call from the app's startup, inside the event loop
+        
+        Counter flushing and cache invalidation run in every worker; stats
+        refreshes and archival run in one worker at a time (``run_maintenance``).
+        """
+        if self._background_tasks:
+            return
+        self._background_tasks = [
+            asyncio.create_task(self.run_counter_writer()),
+            asyncio.create_task(self.run_cache_watcher()),
+            asyncio.create_task(self.run_maintenance())
+        ]
+    
+    async def stop_background_tasks(self):
+        """Cancel the background loops; queued counters are flushed before this returns"""
+        for task in self._background_tasks:
+            task.cancel()
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        self._background_tasks = []
+    
+    async def run_maintenance(self, election_interval: float = MAINTENANCE_ELECTION_INTERVAL):
+        """Run the stats updater and archiver once this worker holds the maintenance lock"""
+        lock = ProcessLock(MAINTENANCE_LOCK_PATH)
+        while not lock.acquire():
+            await asyncio.sleep(election_interval)
+        print(f"✅ Worker {os.getpid()} runs database stats and archival")
+        try:
+            await asyncio.gather(self.run_stats_updater(), self.run_archiver())
+        finally:
+            lock.release()
     
     # ==================== SCRAPED DATA OPERATIONS ====================
     
-    async def save_scraped_data(self, source_id: str, data: Dict[str, Any]) -> bool:
-        """Save scraped data to MongoDB"""
+    def _scraped_page_upsert(self, page: PageRecord, saved_at: datetime) -> UpdateOne:
+        """Upsert of one page document; a page unchanged since the last crawl only gets its fetch time bumped"""
+        document = ScrapedPageModel(
+            source_id=page.source_id,
+            url=page.url,
+            parent_url=page.parent_url,
+            depth=page.depth,
+            status=page.status,
+            timestamp=page.timestamp,
+            content=page.content,
+            body_hash=page.body_hash,
+            error=page.error,
+            reason=page.reason,
+            last_changed=saved_at,
+            last_seen=saved_at
+        ).dict()
+        
+        always = {"timestamp": page.timestamp, "status": page.status, "last_seen": saved_at}
+        if page.unchanged:
+            # Extracted fields are only written if the page has no document yet
+            on_insert = {field: value for field, value in document.items()
+                         if field not in always and field not in ("source_id", "url")}
+            update = {"$set": always, "$setOnInsert": on_insert}
+        else:
+            update = {"$set": {field: value for field, value in document.items() if field not in ("source_id", "url")}}
+        return UpdateOne({"source_id": page.source_id, "url": page.url}, update, upsert=True)
+    
+    async def save_scraped_data(self, source_id: str, pages: Iterable[PageRecord],
+                                batch_size: int = SCRAPED_PAGES_BATCH_SIZE) -> Dict[str, int]:
+        """Save one source's crawl: a document per page plus a small scraped_data summary
+        
+        Page documents in ``scraped_pages`` hold the extracted fields and the
+        ``body_hash`` of the raw body in the page body store, never the body
+        itself, so no document grows with the size of the site. Pages marked
+        unchanged by the crawler are not rewritten, and pages missing from
+        this crawl are deleted. Returns counts of inserted, updated and
+        removed pages and failed writes.
+        """
+        counts = {"inserted": 0, "updated": 0, "removed": 0, "errors": 0}
         try:
-            collection = self.mongodb.get_collection('scraped_data')
+            pages_collection = self.mongodb.get_async_collection('scraped_pages')
+            collection = self.mongodb.get_async_collection('scraped_data')
+            
+            records = [page for page in pages if page.source_id == source_id]
+            saved_at = datetime.now()
+            operations = [self._scraped_page_upsert(page, saved_at) for page in records]
+            for start in range(0, len(operations), max(1, batch_size)):
+                batch = operations[start:start + max(1, batch_size)]
+                try:
+                    result = await pages_collection.bulk_write(batch, ordered=False)
+                    inserted, modified = result.upserted_count, result.modified_count
+                except BulkWriteError as e:
+                    details = e.details
+                    inserted, modified = details.get("nUpserted", 0), details.get("nModified", 0)
+                    counts["errors"] += len(details.get("writeErrors", []))
+                counts["inserted"] += inserted
+                counts["updated"] += modified
+            
+            # Pages this crawl did not reach again
+            if not counts["errors"]:
+                result = await pages_collection.delete_many({"source_id": source_id, "last_seen": {"$ne": saved_at}})
+                counts["removed"] = result.deleted_count
             
-            # Update existing or insert new
-            result = collection.update_one(
+            stats = SourceStats(records)
+            roots = [page for page in records if page.parent_url is None]
+            root = roots[0] if roots else (records[0] if records else None)
+            summary = ScrapedDataModel(
+                source_id=source_id,
+                source_name=root.source if root else source_id,
+                url=root.url if len(roots) == 1 else "",
+                status=stats.status if records else "failed",
+                timestamp=saved_at,
+                depth=max((page.depth for page in records), default=0),
+                total_pages_scraped=stats.pages,
+                changed_pages=sum(1 for page in records if not page.unchanged),
+                error_message=root.error if root else None
+            ).dict()
+            # Documents written before pages moved out still carry the nested tree
+            await collection.update_one(
                 {"source_id": source_id},
-                {"$set": data},
+                {"$set": summary, "$unset": {"content": "", "sub_pages": ""}},
                 upsert=True
             )
+            await self._changed('scraped_data', [source_id])
             
-            return result.acknowledged
+            print(f"✅ Saved {stats.pages} pages of {source_id}: {counts['inserted']} inserted, "
+                  f"{counts['updated']} updated, {counts['removed']} removed ({counts['errors']} errors)")
+            return counts
             
         except Exception as e:
             print(f"❌ Failed to save scraped data: {str(e)}")
-            return False
+            counts["errors"] += 1
+            return counts
     
     async def get_scraped_data(self, source_id: str = None) -> Dict[str, Any]:
-        """Get scraped data from MongoDB"""
+        """Get a source's summary and pages, or every source's summary by source ID"""
         try:
-            collection = self.mongodb.get_collection('scraped_data')
+            collection = self.mongodb.get_async_collection('scraped_data')
+            
+            cache_key = ('scraped_data', source_id)
+            cached = self.cache.get(cache_key)
+            if cached is not MISSING:
+                return dict(cached)
             
             if source_id:
-                data = collection.find_one({"source_id": source_id})
-                return data if data else {}
+                data = await collection.find_one({"source_id": source_id})
+                if data:
+                    pages_collection = self.mongodb.get_async_collection('scraped_pages')
+                    data["pages"] = await pages_collection.find(
+                        {"source_id": source_id}, {"_id": 0, "last_seen": 0}
+                    ).to_list(length=None)
+                data = data if data else {}
             else:
-                data = list(collection.find({}))
-                return {item["source_id"]: item for item in data}
+                data = {item["source_id"]: item async for item in collection.find({})}
+            
+            self.cache.set(cache_key, data, [('scraped_data', source_id)])
+            return dict(data)
                 
         except Exception as e:
             print(f"❌ Failed to get scraped data: {str(e)}")
             return {}
     
+    async def get_page_body(self, body_hash: str) -> Optional[bytes]:
+        """Raw body of a scraped page by its ``body_hash``, or None if it is not stored"""
+        if self.page_bodies is None or not body_hash:
+            return None
+        try:
+            return await asyncio.to_thread(self.page_bodies.get, body_hash)
+        except Exception as e:
+            print(f"❌ Failed to read page body {body_hash}: {str(e)}")
+            return None
+    
     async def get_scraped_data_summary(self) -> Dict[str, Any]:
         """Get summary of all scraped data"""
         try:
-            collection = self.mongodb.get_collection('scraped_data')
+            collection = self.mongodb.get_async_collection('scraped_data')
             
             summary = {}
-            for doc in collection.find({}):
+            async for doc in collection.find({}, {"content": 0}):
                 source_id = doc.get("source_id")
                 status = doc.get("status", "unknown")
-                sub_pages = len(doc.get("sub_pages", []))
+                # Documents saved before pages moved to scraped_pages only have sub_pages
+                total_pages = doc.get("total_pages_scraped") or len(doc.get("sub_pages", [])) + 1
                 summary[source_id] = {
                     "status": status,
-                    "sub_pages": sub_pages,
+                    "sub_pages": total_pages - 1,
                     "timestamp": doc.get("timestamp"),
-                    "total_pages": sub_pages + 1
+                    "total_pages": total_pages
                 }
             
             return summary
@@ -82,41 +320,89 @@ class DatabaseService:
     
     # ==================== KNOWLEDGE DATABASE OPERATIONS ====================
     
+    def _knowledge_item_upsert(self, category: str, content: str, source_url: str, source_id: str,
+                               occurrences: int = 1) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Filter and update that insert a knowledge item or bump its usage_count by ``occurrences``"""
+        content_hash = knowledge_content_hash(category, source_id, content)
+        item = KnowledgeDatabaseModel(
+            category=category,
+            content=content,
+            source_url=source_url,
+            source_id=source_id,
+            content_hash=content_hash,
+            keywords=self._extract_keywords(content),
+            relevance_score=self._calculate_relevance_score(content, category)
+        ).dict()
+        
+        # usage_count and last_updated change on every sighting; the rest only on insert
+        last_updated = item.pop("last_updated")
+        item.pop("usage_count")
+        return {"content_hash": content_hash}, {
+            "$setOnInsert": item,
+            "$set": {"last_updated": last_updated},
+            "$inc": {"usage_count": occurrences}
+        }
+    
+    def _knowledge_item_refresh(self, category: str, content: str, source_url: str, source_id: str,
+                                occurrences: int = 1) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Filter and pipeline update that insert a knowledge item or refresh it from a recrawl
+        
+        Like ``_knowledge_item_upsert``, usage_count grows by ``occurrences``
+        and insert-only fields keep their stored values. The
+        KNOWLEDGE_REFRESHED_FIELDS take the crawl's values, and last_updated
+        moves only when one of them differs.
+        """
+        content_hash = knowledge_content_hash(category, source_id, content)
+        item = KnowledgeDatabaseModel(
+            category=category,
+            content=content,
+            source_url=source_url,
+            source_id=source_id,
+            content_hash=content_hash,
+            keywords=self._extract_keywords(content),
+            relevance_score=self._calculate_relevance_score(content, category)
+        ).dict()
+        
+        last_updated = item.pop("last_updated")
+        item.pop("usage_count")
+        refreshed = {field: item.pop(field) for field in KNOWLEDGE_REFRESHED_FIELDS}
+        # Every expression of one $set stage sees the stored document, so this compares old values
+        unchanged = {"$and": [{"$eq": [f"${field}", {"$literal": value}]} for field, value in refreshed.items()]}
+        return {"content_hash": content_hash}, [{"$set": {
+            **{field: {"$ifNull": [f"${field}", {"$literal": value}]} for field, value in item.items()},
+            **{field: {"$literal": value} for field, value in refreshed.items()},
+            "usage_count": {"$add": [{"$ifNull": ["$usage_count", 0]}, occurrences]},
+            "last_updated": {"$cond": [unchanged, "$last_updated", {"$literal": last_updated}]}
+        }}]
+    
+    async def _count_unchanged_knowledge_items(self, collection,
+                                               refreshes: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]) -> int:
+        """How many of the items ``refreshes`` (``_knowledge_item_refresh`` results) are stored with the values they send
+        
+        Counted with one read before the write, since usage_count makes every
+        refresh of a stored item a modification.
+        """
+        sent = {
+            query["content_hash"]: {field: pipeline[0]["$set"][field]["$literal"] for field in KNOWLEDGE_REFRESHED_FIELDS}
+            for query, pipeline in refreshes
+        }
+        
+        projection = {"_id": 0, "content_hash": 1, **{field: 1 for field in KNOWLEDGE_REFRESHED_FIELDS}}
+        unchanged = 0
+        async for stored in collection.find({"content_hash": {"$in": list(sent)}}, projection):
+            values = sent[stored["content_hash"]]
+            if all(stored.get(field) == value for field, value in values.items()):
+                unchanged += 1
+        return unchanged
+    
     async def save_knowledge_item(self, category: str, content: str, source_url: str, source_id: str) -> bool:
         """Save a knowledge database item"""
         try:
-            collection = self.mongodb.get_collection('knowledge_database')
-            
-            # Check if item already exists
-            existing = collection.find_one({
-                "category": category,
-                "content": content,
-                "source_id": source_id
-            })
-            
-            if existing:
-                # Update existing item
-                result = collection.update_one(
-                    {"_id": existing["_id"]},
-                    {
-                        "$set": {
-                            "last_updated": datetime.now(),
-                            "usage_count": existing.get("usage_count", 0) + 1
-                        }
-                    }
-                )
-            else:
-                # Insert new item
-                item = KnowledgeDatabaseModel(
-                    category=category,
-                    content=content,
-                    source_url=source_url,
-                    source_id=source_id,
-                    keywords=self._extract_keywords(content),
-                    relevance_score=self._calculate_relevance_score(content, category)
-                )
-                
-                result = collection.insert_one(item.dict())
+            collection = self.mongodb.get_async_collection('knowledge_database')
+            
+            query, update = self._knowledge_item_upsert(category, content, source_url, source_id)
+            result = await collection.update_one(query, update, upsert=True)
+            await self._changed('knowledge_database', [category])
             
             return result.acknowledged
             
@@ -127,91 +413,153 @@ class DatabaseService:
     async def get_knowledge_items(self, category: str = None, limit: int = 100) -> List[Dict[str, Any]]:
         """Get knowledge database items"""
         try:
-            collection = self.mongodb.get_collection('knowledge_database')
+            collection = self.mongodb.get_async_collection('knowledge_database')
+            
+            cache_key = ('knowledge_items', category, limit)
+            cached = self.cache.get(cache_key)
+            if cached is not MISSING:
+                return list(cached)
             
             query = {"is_active": True}
             if category:
                 query["category"] = category
             
             cursor = collection.find(query).sort("relevance_score", -1).limit(limit)
-            return list(cursor)
+            items = await cursor.to_list(length=limit)
+            
+            self.cache.set(cache_key, items, [('knowledge_database', category or None)])
+            return list(items)
             
         except Exception as e:
             print(f"❌ Failed to get knowledge items: {str(e)}")
             return []
     
-    async def search_knowledge_database(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
-        """Search knowledge database for relevant content"""
+    async def search_knowledge_database(self, query: str, limit: int = 20,
+                                        category: str = None) -> List[Dict[str, Any]]:
+        """Search knowledge database for relevant content
+        
+        Uses the weighted ``knowledge_text`` index (see mongodb_indexes),
+        optionally restricted to one ``category``. Results are ranked by text
+        score times the item's relevance_score and carry only the fields the
+        chat path uses.
+        """
         try:
-            collection = self.mongodb.get_collection('knowledge_database')
+            collection = self.mongodb.get_async_collection('knowledge_database')
             
-            # Text search using MongoDB text index
-            result = collection.find(
-                {"$text": {"$search": query}, "is_active": True},
-                {"score": {"$meta": "textScore"}}
-            ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+            cache_key = ('knowledge_search', " ".join(query.lower().split()), category, limit)
+            cached = self.cache.get(cache_key)
+            if cached is not MISSING:
+                return list(cached)
+            
+            match = {"$text": {"$search": query}, "is_active": True}
+            if category:
+                match["category"] = category
+            
+            pipeline = [
+                {"$match": match},
+                {"$project": {
+                    "_id": 0,
+                    **{field: 1 for field in KNOWLEDGE_SEARCH_FIELDS},
+                    "score": {"$multiply": [{"$meta": "textScore"}, {"$ifNull": ["$relevance_score", 1.0]}]}
+                }},
+                {"$sort": {"score": -1}},
+                {"$limit": limit}
+            ]
+            results = await collection.aggregate(pipeline).to_list(length=limit)
             
-            return list(result)
+            self.cache.set(cache_key, results, [('knowledge_database', category or None)])
+            return list(results)
             
         except Exception as e:
             print(f"❌ Failed to search knowledge database: {str(e)}")
             return []
     
-    async def update_knowledge_database(self, scraped_data: Dict[str, Any]) -> bool:
-        """Update knowledge database from scraped data"""
+    async def update_knowledge_database(self, pages: Iterable[PageRecord],
+                                        batch_size: int = KNOWLEDGE_BULK_BATCH_SIZE) -> Dict[str, int]:
+        """Upsert knowledge items from the flat page table (``page_store.pages()``)
+        
+        Items are keyed on their content hash and sent as unordered bulk_write
+        batches of ``batch_size`` upserts, one operation per distinct item
+        (see ``_knowledge_item_refresh``). Returns counts of inserted, updated
+        and unchanged (re-seen with the values already stored) items,
+        near-duplicates skipped and failed writes.
+        """
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0, "near_duplicates": 0, "errors": 0}
         try:
-            success_count = 0
+            collection = self.mongodb.get_async_collection('knowledge_database')
+            near_duplicates = NearDuplicateIndex()
             
-            for source_id, source_data in scraped_data.items():
-                if source_data.get("status") != "success":
+            # Distinct items of this crawl, with how often each was seen
+            items: Dict[str, List[Any]] = {}
+            for page in pages:
+                if page.status != "success":
                     continue
                 
-                # Process main content
-                content = source_data.get("content", {})
-                
-                # Process admissions
-                if "admission_info" in content:
-                    for item in content["admission_info"]:
-                        if await self.save_knowledge_item("admissions", item, source_data["url"], source_id):
-                            success_count += 1
-                
-                # Process courses
-                if "course_info" in content:
-                    for item in content["course_info"]:
-                        if await self.save_knowledge_item("courses", item, source_data["url"], source_id):
-                            success_count += 1
-                
-                # Process research
-                if "research_info" in content:
-                    for item in content["research_info"]:
-                        if await self.save_knowledge_item("research", item, source_data["url"], source_id):
-                            success_count += 1
-                
-                # Process sub-pages
-                for sub_page in source_data.get("sub_pages", []):
-                    sub_content = sub_page.get("content", {})
-                    
-                    if "admission_info" in sub_content:
-                        for item in sub_content["admission_info"]:
-                            if await self.save_knowledge_item("admissions", item, sub_page["url"], source_id):
-                                success_count += 1
-                    
-                    if "course_info" in sub_content:
-                        for item in sub_content["course_info"]:
-                            if await self.save_knowledge_item("courses", item, sub_page["url"], source_id):
-                                success_count += 1
-                    
-                    if "research_info" in sub_content:
-                        for item in sub_content["research_info"]:
-                            if await self.save_knowledge_item("research", item, sub_page["url"], source_id):
-                                success_count += 1
-            
-            print(f"✅ Knowledge database updated with {success_count} new items")
-            return True
+                for content_type, category in KNOWLEDGE_CONTENT_CATEGORIES.items():
+                    for item in page.content.get(content_type, []):
+                        key = knowledge_content_hash(category, page.source_id, item)
+                        if key in items:
+                            items[key][4] += 1
+                            continue
+                        # Store one canonical item per cluster of near-identical snippets
+                        known_items = len(near_duplicates)
+                        if near_duplicates.add(item) < known_items:
+                            counts["near_duplicates"] += 1
+                            continue
+                        items[key] = [category, item, page.url, page.source_id, 1]
+            
+            refreshes = [self._knowledge_item_refresh(*entry) for entry in items.values()]
+            for start in range(0, len(refreshes), max(1, batch_size)):
+                batch = refreshes[start:start + max(1, batch_size)]
+                unchanged = await self._count_unchanged_knowledge_items(collection, batch)
+                try:
+                    result = await collection.bulk_write([UpdateOne(*refresh, upsert=True) for refresh in batch], ordered=False)
+                    inserted, matched = result.upserted_count, result.matched_count
+                except BulkWriteError as e:
+                    # Unordered: the rest of the batch was still applied
+                    details = e.details
+                    inserted, matched = details.get("nUpserted", 0), details.get("nMatched", 0)
+                    counts["errors"] += len(details.get("writeErrors", []))
+                unchanged = min(unchanged, matched)
+                counts["inserted"] += inserted
+                counts["updated"] += matched - unchanged
+                counts["unchanged"] += unchanged
+            
+            if counts["inserted"] or counts["updated"]:
+                await self._changed('knowledge_database', {entry[0] for entry in items.values()})
+            
+            print(f"✅ Knowledge database updated: {counts['inserted']} inserted, {counts['updated']} updated, "
+                  f"{counts['unchanged']} unchanged ({counts['near_duplicates']} near-duplicates skipped, "
+                  f"{counts['errors']} errors)")
+            return counts
             
         except Exception as e:
             print(f"❌ Failed to update knowledge database: {str(e)}")
-            return False
+            counts["errors"] += 1
+            return counts
+    
+    # ==================== CACHE INVALIDATION ====================
+    
+    async def _changed(self, collection_name: str, keys: Iterable[str]):
+        """Drop this worker's cached reads of ``keys`` and bump their versions for other workers"""
+        keys = [key for key in keys if key]
+        for key in keys:
+            self.cache.invalidate(collection_name, key)
+        if not keys:
+            return
+        try:
+            stats_collection = self.mongodb.get_async_collection('database_stats')
+            await stats_collection.update_one({"_id": CACHE_VERSIONS_ID}, version_bump(collection_name, keys), upsert=True)
+        except Exception as e:
+            print(f"❌ Failed to bump cache versions: {str(e)}")
+    
+    async def run_cache_watcher(self, poll_interval: float = None):
+        """Background task invalidating cached reads when any worker changes knowledge or scraped data"""
+        watcher = CacheInvalidationWatcher(
+            self.mongodb, self.cache,
+            poll_interval=CACHE_VERSION_POLL_INTERVAL if poll_interval is None else poll_interval
+        )
+        await watcher.run()
     
     # ==================== CHAT HISTORY OPERATIONS ====================
     
@@ -219,7 +567,7 @@ class DatabaseService:
                                response_time: float = None, source_used: str = None) -> bool:
         """Save chat message to MongoDB"""
         try:
-            collection = self.mongodb.get_collection('chat_history')
+            collection = self.mongodb.get_async_collection('chat_history')
             
             # Save user message
             user_message = ChatHistoryModel(
@@ -243,67 +591,82 @@ class DatabaseService:
                 source_used=source_used
             )
             
-            # Insert both messages
-            result1 = collection.insert_one(user_message.dict())
-            result2 = collection.insert_one(ai_response.dict())
+            # Insert both messages in one round trip, user message first
+            result = await collection.insert_many([user_message.dict(), ai_response.dict()])
+            self.chat_cache.invalidate('chat_history', user_id)
             
-            return result1.acknowledged and result2.acknowledged
+            return result.acknowledged
             
         except Exception as e:
             print(f"❌ Failed to save chat message: {str(e)}")
             return False
     
     async def get_chat_history(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get chat history for a user"""
+        """Get a user's latest ``limit`` messages, newest first, with the ``CHAT_HISTORY_FIELDS``"""
         try:
-            collection = self.mongodb.get_collection('chat_history')
+            cache_key = ('chat_history', user_id, limit)
+            cached = self.chat_cache.get(cache_key)
+            if cached is not MISSING:
+                return list(cached)
+            
+            collection = self.mongodb.get_async_collection('chat_history')
             
-            cursor = collection.find({"user_id": user_id}).sort("timestamp", -1).limit(limit)
-            return list(cursor)
+            # Served by the (user_id, timestamp) index
+            cursor = collection.find({"user_id": user_id}, self._chat_history_projection()).sort("timestamp", -1).limit(limit)
+            history = await cursor.to_list(length=limit)
+            
+            self.chat_cache.set(cache_key, history, [('chat_history', user_id)])
+            return list(history)
             
         except Exception as e:
             print(f"❌ Failed to get chat history: {str(e)}")
             return []
     
+    async def export_chat_history(self, user_id: str, since: datetime = None,
+                                  batch_size: int = CHAT_EXPORT_BATCH_SIZE) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a user's whole chat history, oldest first, without loading it into memory
+        
+        Messages are fetched ``batch_size`` at a time and bypass the history
+        cache; ``since`` limits the export to messages after that time.
+        """
+        collection = self.mongodb.get_async_collection('chat_history')
+        query: Dict[str, Any] = {"user_id": user_id}
+        if since is not None:
+            query["timestamp"] = {"$gt": since}
+        try:
+            cursor = collection.find(query, self._chat_history_projection()).sort("timestamp", 1).batch_size(batch_size)
+            async for message in cursor:
+                yield message
+        except Exception as e:
+            print(f"❌ Failed to export chat history: {str(e)}")
+    
+    def _chat_history_projection(self) -> Dict[str, int]:
+        return {"_id": 0, **{field: 1 for field in CHAT_HISTORY_FIELDS}}
+    
     # ==================== USER SESSION OPERATIONS ====================
     
+    def _user_session_upsert(self, user_id: str, message_count: int = 1,
+                             response_time: float = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Filter and update that create a user session or add one chat turn to it"""
+        increments = {"total_messages": message_count, "total_responses": message_count}
+        if response_time:
+            increments["total_response_time"] = response_time
+            increments["timed_responses"] = 1
+        
+        return {"user_id": user_id}, {
+            "$setOnInsert": {"session_start": datetime.now(), "session_duration": None, "is_active": True},
+            "$max": {"last_active": datetime.now()},
+            "$inc": increments
+        }
+    
     async def update_user_session(self, user_id: str, message_count: int = 1, 
                                 response_time: float = None) -> bool:
         """Update or create user session"""
         try:
-            collection = self.mongodb.get_collection('user_sessions')
+            collection = self.mongodb.get_async_collection('user_sessions')
             
-            # Get existing session
-            existing = collection.find_one({"user_id": user_id})
-            
-            if existing:
-                # Update existing session
-                update_data = {
-                    "last_active": datetime.now(),
-                    "total_messages": existing.get("total_messages", 0) + message_count,
-                    "total_responses": existing.get("total_responses", 0) + message_count
-                }
-                
-                if response_time:
-                    current_avg = existing.get("average_response_time", 0)
-                    total_responses = existing.get("total_responses", 0)
-                    new_avg = ((current_avg * total_responses) + response_time) / (total_responses + 1)
-                    update_data["average_response_time"] = new_avg
-                
-                result = collection.update_one(
-                    {"user_id": user_id},
-                    {"$set": update_data}
-                )
-            else:
-                # Create new session
-                session = UserSessionModel(
-                    user_id=user_id,
-                    total_messages=message_count,
-                    total_responses=message_count,
-                    average_response_time=response_time or 0.0
-                )
-                
-                result = collection.insert_one(session.dict())
+            query, update = self._user_session_upsert(user_id, message_count, response_time)
+            result = await collection.update_one(query, update, upsert=True)
             
             return result.acknowledged
             
@@ -311,58 +674,49 @@ class DatabaseService:
             print(f"❌ Failed to update user session: {str(e)}")
             return False
     
+    async def get_user_session(self, user_id: str) -> Dict[str, Any]:
+        """Get a user session with its average response time"""
+        try:
+            collection = self.mongodb.get_async_collection('user_sessions')
+            session = await collection.find_one({"user_id": user_id})
+            return self._with_average_response_time(session) if session else {}
+            
+        except Exception as e:
+            print(f"❌ Failed to get user session: {str(e)}")
+            return {}
+    
     # ==================== ANALYTICS OPERATIONS ====================
     
+    def _analytics_upsert(self, user_id: str, response_time: float, source_used: str,
+                          topic: str = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Filter and update that add one chat turn to a user's analytics for today"""
+        increments = {
+            "total_messages": 1,
+            "total_responses": 1,
+            "database_hits": 1 if source_used == "database" else 0,
+            "fallback_usage": 1 if source_used == "fallback" else 0
+        }
+        if response_time:
+            increments["total_response_time"] = response_time
+            increments["timed_responses"] = 1
+        
+        update = {
+            "$setOnInsert": {"user_satisfaction": None, "peak_usage_hour": None, "created_at": datetime.now()},
+            "$inc": increments
+        }
+        if topic:
+            update["$addToSet"] = {"most_asked_topics": topic}
+        
+        return {"date": datetime.now().strftime("%Y-%m-%d"), "user_id": user_id}, update
+    
     async def update_analytics(self, user_id: str, response_time: float, 
                              source_used: str, topic: str = None) -> bool:
         """Update analytics data"""
         try:
-            collection = self.mongodb.get_collection('analytics')
-            
-            today = datetime.now().strftime("%Y-%m-%d")
+            collection = self.mongodb.get_async_collection('analytics')
             
-            # Get existing analytics for today
-            existing = collection.find_one({"date": today, "user_id": user_id})
-            
-            if existing:
-                # Update existing analytics
-                update_data = {
-                    "total_messages": existing.get("total_messages", 0) + 1,
-                    "total_responses": existing.get("total_responses", 0) + 1,
-                    "database_hits": existing.get("database_hits", 0) + (1 if source_used == "database" else 0),
-                    "fallback_usage": existing.get("fallback_usage", 0) + (1 if source_used == "fallback" else 0)
-                }
-                
-                # Update average response time
-                current_avg = existing.get("average_response_time", 0)
-                total_responses = existing.get("total_responses", 0)
-                new_avg = ((current_avg * (total_responses - 1)) + response_time) / total_responses
-                update_data["average_response_time"] = new_avg
-                
-                # Update topics
-                topics = existing.get("most_asked_topics", [])
-                if topic and topic not in topics:
-                    topics.append(topic)
-                update_data["most_asked_topics"] = topics[:10]  # Keep top 10
-                
-                result = collection.update_one(
-                    {"date": today, "user_id": user_id},
-                    {"$set": update_data}
-                )
-            else:
-                # Create new analytics entry
-                analytics = AnalyticsModel(
-                    date=today,
-                    user_id=user_id,
-                    total_messages=1,
-                    total_responses=1,
-                    average_response_time=response_time,
-                    database_hits=1 if source_used == "database" else 0,
-                    fallback_usage=1 if source_used == "fallback" else 0,
-                    most_asked_topics=[topic] if topic else []
-                )
-                
-                result = collection.insert_one(analytics.dict())
+            query, update = self._analytics_upsert(user_id, response_time, source_used, topic)
+            result = await collection.update_one(query, update, upsert=True)
             
             return result.acknowledged
             
@@ -370,6 +724,91 @@ class DatabaseService:
             print(f"❌ Failed to update analytics: {str(e)}")
             return False
     
+    async def get_analytics(self, date: str, user_id: str = None) -> List[Dict[str, Any]]:
+        """Get analytics for a date (YYYY-MM-DD), optionally for one user"""
+        try:
+            collection = self.mongodb.get_async_collection('analytics')
+            
+            query = {"date": date}
+            if user_id:
+                query["user_id"] = user_id
+            
+            return [self._with_average_response_time(doc) async for doc in collection.find(query)]
+            
+        except Exception as e:
+            print(f"❌ Failed to get analytics: {str(e)}")
+            return []
+    
+    def _with_average_response_time(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Derive average_response_time from the running sums stored by the $inc updates"""
+        timed_responses = doc.get("timed_responses", 0)
+        if timed_responses:
+            doc["average_response_time"] = doc.get("total_response_time", 0.0) / timed_responses
+        else:
+            doc.setdefault("average_response_time", 0.0)
+        return doc
+    
+    # ==================== BATCHED COUNTER WRITES ====================
+    
+    def record_chat_turn(self, user_id: str, response_time: float = None,
+                         source_used: str = None, topic: str = None):
+        """Queue the session and analytics counters of one chat turn without waiting
+        
+        Turns for the same user and day are merged in memory and written by
+        ``flush_counter_writes``, which ``run_counter_writer`` calls every
+        COUNTER_FLUSH_INTERVAL seconds. Counters still queued when the process
+        dies are lost.
+        """
+        for collection_name, (query, update) in (
+            ('user_sessions', self._user_session_upsert(user_id, 1, response_time)),
+            ('analytics', self._analytics_upsert(user_id, response_time, source_used, topic))
+        ):
+            key = (collection_name, tuple(sorted(query.items())))
+            pending = self._pending_counters.get(key)
+            if pending is None:
+                self._pending_counters[key] = (query, update)
+            else:
+                merge_counter_update(pending[1], update)
+        
+        if len(self._pending_counters) >= COUNTER_MAX_PENDING and self._counter_flush is None:
+            try:
+                self._counter_flush = asyncio.get_running_loop().create_task(self.flush_counter_writes())
+            except RuntimeError:
+                pass  # No running loop; the next flush picks them up
+    
+    async def flush_counter_writes(self) -> int:
+        """Write all queued counter updates as unordered bulk upserts; returns the number sent"""
+        pending, self._pending_counters = self._pending_counters, {}
+        try:
+            batches: Dict[str, List[UpdateOne]] = {}
+            for (collection_name, _), (query, update) in pending.items():
+                batches.setdefault(collection_name, []).append(UpdateOne(query, update, upsert=True))
+            
+            for collection_name, operations in batches.items():
+                collection = self.mongodb.get_async_collection(collection_name)
+                try:
+                    await collection.bulk_write(operations, ordered=False)
+                except BulkWriteError as e:
+                    print(f"❌ {len(e.details.get('writeErrors', []))} {collection_name} counter updates failed")
+                except Exception as e:
+                    print(f"❌ Failed to write {len(operations)} {collection_name} counter updates: {str(e)}")
+            
+            return len(pending)
+        finally:
+            self._counter_flush = None
+    
+    async def run_counter_writer(self, interval: float = None):
+        """Background task flushing queued counters; flushes once more when cancelled"""
+        interval = COUNTER_FLUSH_INTERVAL if interval is None else interval
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                if self._pending_counters:
+                    await self.flush_counter_writes()
+        finally:
+            if self._pending_counters:
+                await self.flush_counter_writes()
+    
     # ==================== SCRAPING LOGS OPERATIONS ====================
     
     async def log_scraping_operation(self, source_id: str, operation_type: str, 
@@ -379,7 +818,7 @@ class DatabaseService:
                                    new_items_added: int = 0) -> bool:
         """Log scraping operation details"""
         try:
-            collection = self.mongodb.get_collection('scraping_logs')
+            collection = self.mongodb.get_async_collection('scraping_logs')
             
             log_entry = ScrapingLogModel(
                 source_id=source_id,
@@ -393,7 +832,7 @@ class DatabaseService:
                 new_items_added=new_items_added
             )
             
-            result = collection.insert_one(log_entry.dict())
+            result = await collection.insert_one(log_entry.dict())
             return result.acknowledged
             
         except Exception as e:
@@ -403,42 +842,52 @@ class DatabaseService:
     # ==================== DATABASE STATISTICS OPERATIONS ====================
     
     async def update_database_stats(self) -> bool:
-        """Update database statistics"""
+        """Recompute the current_stats document with server-side aggregations
+        
+        Counts come from collection metadata and $group pipelines, so no
+        document is shipped to Python. Run it from ``run_stats_updater``,
+        never from a request handler; readers use ``get_database_stats``.
+        """
         try:
-            collection = self.mongodb.get_collection('database_stats')
-            
-            # Calculate statistics
-            scraped_collection = self.mongodb.get_collection('scraped_data')
-            knowledge_collection = self.mongodb.get_collection('knowledge_database')
-            chat_collection = self.mongodb.get_collection('chat_history')
-            users_collection = self.mongodb.get_collection('user_sessions')
-            
-            total_sources = scraped_collection.count_documents({})
-            total_pages_scraped = sum(
-                len(doc.get("sub_pages", [])) + 1 
-                for doc in scraped_collection.find({})
-            )
+            collection = self.mongodb.get_async_collection('database_stats')
+            
+            scraped_collection = self.mongodb.get_async_collection('scraped_data')
+            pages_collection = self.mongodb.get_async_collection('scraped_pages')
+            knowledge_collection = self.mongodb.get_async_collection('knowledge_database')
+            chat_collection = self.mongodb.get_async_collection('chat_history')
+            users_collection = self.mongodb.get_async_collection('user_sessions')
+            
+            total_sources = await scraped_collection.estimated_document_count()
+            total_pages_scraped = await pages_collection.estimated_document_count()
             
-            total_knowledge_items = knowledge_collection.count_documents({"is_active": True})
             knowledge_by_category = {}
-            for doc in knowledge_collection.find({"is_active": True}):
-                category = doc.get("category", "unknown")
-                knowledge_by_category[category] = knowledge_by_category.get(category, 0) + 1
+            async for row in knowledge_collection.aggregate([
+                {"$match": {"is_active": True}},
+                {"$group": {"_id": "$category", "count": {"$sum": 1}}}
+            ]):
+                knowledge_by_category[row["_id"] or "unknown"] = row["count"]
+            total_knowledge_items = sum(knowledge_by_category.values())
             
-            total_users = users_collection.count_documents({})
-            total_chat_messages = chat_collection.count_documents({})
+            total_users = await users_collection.estimated_document_count()
+            total_chat_messages = await chat_collection.estimated_document_count()
             
-            # Calculate average response time
-            response_times = [
-                doc.get("response_time", 0) 
-                for doc in chat_collection.find({"type": "assistant", "response_time": {"$exists": True}})
-            ]
-            average_response_time = sum(response_times) / len(response_times) if response_times else 0
+            # Average response time and database hit rate over assistant messages
+            average_response_time = 0
+            database_hit_rate = 0
+            async for row in chat_collection.aggregate([
+                {"$match": {"type": "assistant"}},
+                {"$group": {
+                    "_id": None,
+                    "responses": {"$sum": 1},
+                    "average_response_time": {"$avg": "$response_time"},
+                    "database_hits": {"$sum": {"$cond": [{"$eq": ["$source_used", "database"]}, 1, 0]}}
+                }}
+            ]):
+                average_response_time = row["average_response_time"] or 0
+                if row["responses"]:
+                    database_hit_rate = row["database_hits"] / row["responses"] * 100
             
-            # Calculate database hit rate
-            database_hits = chat_collection.count_documents({"source_used": "database"})
-            total_responses = chat_collection.count_documents({"type": "assistant"})
-            database_hit_rate = (database_hits / total_responses * 100) if total_responses > 0 else 0
+            storage_by_collection = await self._collection_storage()
             
             stats = DatabaseStatsModel(
                 total_sources=total_sources,
@@ -451,11 +900,12 @@ class DatabaseService:
                 database_hit_rate=database_hit_rate,
                 last_database_update=datetime.now(),
                 scraping_frequency="Every 15 minutes",
-                total_storage_used=self._calculate_storage_usage()
+                total_storage_used=await self._calculate_storage_usage(),
+                storage_by_collection=storage_by_collection
             )
             
             # Update or insert stats
-            result = collection.update_one(
+            result = await collection.update_one(
                 {"_id": "current_stats"},
                 {"$set": stats.dict()},
                 upsert=True
@@ -467,17 +917,95 @@ class DatabaseService:
             print(f"❌ Failed to update database stats: {str(e)}")
             return False
     
+    async def run_stats_updater(self, interval: float = None):
+        """Background task refreshing the database_stats document every ``interval`` seconds"""
+        interval = STATS_UPDATE_INTERVAL if interval is None else interval
+        while True:
+            await self.update_database_stats()
+            await asyncio.sleep(interval)
+    
     async def get_database_stats(self) -> Dict[str, Any]:
         """Get current database statistics"""
         try:
-            collection = self.mongodb.get_collection('database_stats')
-            stats = collection.find_one({"_id": "current_stats"})
+            collection = self.mongodb.get_async_collection('database_stats')
+            stats = await collection.find_one({"_id": "current_stats"})
             return stats if stats else {}
             
         except Exception as e:
             print(f"❌ Failed to get database stats: {str(e)}")
             return {}
     
+    # ==================== ARCHIVAL OPERATIONS ====================
+    
+    async def archive_expiring_documents(self, archive_dir: str = ARCHIVE_DIR) -> Dict[str, int]:
+        """Export documents that expire within ARCHIVE_LEAD_DAYS to gzipped JSON lines
+        
+        Each run exports the window between the previous run's cutoff (kept in
+        ``<archive_dir>/<collection>/watermark.json``) and the new one, as
+        ``<collection>-<from>-<to>.jsonl.gz`` in Extended JSON. As long as runs
+        are less than ARCHIVE_LEAD_DAYS apart, every document is archived
+        before its TTL removes it. Returns documents archived per collection.
+        """
+        archived = {}
+        for name, days in self.mongodb.retention_days.items():
+            if not days:
+                continue
+            try:
+                archived[name] = await self._archive_collection(name, days, os.path.join(archive_dir, name))
+            except Exception as e:
+                print(f"❌ Failed to archive {name}: {str(e)}")
+        
+        if any(archived.values()):
+            print("✅ Archived " + ", ".join(f"{count} {name}" for name, count in archived.items() if count))
+        return archived
+    
+    async def _archive_collection(self, name: str, retention_days: int, directory: str) -> int:
+        field = self.mongodb.expiry_fields[name]
+        watermark_path = os.path.join(directory, "watermark.json")
+        cutoff = datetime.now() - timedelta(days=retention_days - ARCHIVE_LEAD_DAYS)
+        since = await asyncio.to_thread(_read_watermark, watermark_path)
+        
+        query = {field: {"$lt": cutoff}}
+        if since is not None:
+            if since >= cutoff:
+                return 0
+            query[field]["$gte"] = since
+        
+        window = f"{since:%Y%m%dT%H%M%S}" if since else "start"
+        path = os.path.join(directory, f"{name}-{window}-{cutoff:%Y%m%dT%H%M%S}.jsonl.gz")
+        temporary_path = path + ".tmp"
+        await asyncio.to_thread(os.makedirs, directory, exist_ok=True)
+        
+        count = 0
+        archive = await asyncio.to_thread(gzip.open, temporary_path, "wt", encoding="utf-8")
+        try:
+            batch = []
+            async for doc in self.mongodb.get_async_collection(name).find(query).sort(field, 1).batch_size(ARCHIVE_BATCH_SIZE):
+                batch.append(json_util.dumps(doc))
+                if len(batch) >= ARCHIVE_BATCH_SIZE:
+                    await asyncio.to_thread(archive.write, "\n".join(batch) + "\n")
+                    count += len(batch)
+                    batch = []
+            if batch:
+                await asyncio.to_thread(archive.write, "\n".join(batch) + "\n")
+                count += len(batch)
+        finally:
+            await asyncio.to_thread(archive.close)
+        
+        if count:
+            await asyncio.to_thread(os.replace, temporary_path, path)
+        else:
+            await asyncio.to_thread(os.remove, temporary_path)
+        await asyncio.to_thread(_write_watermark, watermark_path, cutoff)
+        return count
+    
+    async def run_archiver(self, interval: float = None):
+        """Background task archiving expiring documents every ``interval`` seconds"""
+        interval = ARCHIVE_INTERVAL if interval is None else interval
+        while True:
+            await self.archive_expiring_documents()
+            await asyncio.sleep(interval)
+    
     # ==================== UTILITY METHODS ====================
     
     def _extract_keywords(self, content: str) -> List[str]:
@@ -521,29 +1049,49 @@ class DatabaseService:
         # Ensure score is between 0 and 1
         return min(max(base_score, 0.0), 1.0)
     
-    def _calculate_storage_usage(self) -> str:
-        """Calculate approximate storage usage"""
+    async def _calculate_storage_usage(self) -> str:
+        """Storage used by the database on disk, from dbStats"""
         try:
-            # This is a rough estimate - in production you'd get actual storage stats
-            total_docs = 0
-            for collection_name in self.mongodb.collections.values():
-                collection = self.mongodb.get_collection(collection_name)
-                total_docs += collection.count_documents({})
-            
-            # Rough estimate: 1KB per document
-            estimated_bytes = total_docs * 1024
-            
-            if estimated_bytes < 1024 * 1024:  # Less than 1MB
-                return f"{estimated_bytes / 1024:.1f} KB"
-            else:
-                return f"{estimated_bytes / (1024 * 1024):.1f} MB"
+            database = self.mongodb.get_async_database()
+            db_stats = await database.command("dbStats")
+            return format_bytes(db_stats.get("storageSize", 0) + db_stats.get("indexSize", 0))
                 
         except Exception:
             return "Unknown"
     
+    async def _collection_storage(self) -> Dict[str, int]:
+        """Bytes on disk (data plus indexes) per collection, from collStats"""
+        database = self.mongodb.get_async_database()
+        storage = {}
+        for name, collection_name in self.mongodb.collections.items():
+            try:
+                coll_stats = await database.command("collStats", collection_name)
+                storage[name] = coll_stats.get("storageSize", 0) + coll_stats.get("totalIndexSize", 0)
+            except Exception:
+                continue  # Collection not created yet
+        return storage
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Connection pool checkout and wait metrics"""
+        return self.mongodb.pool_stats()
+    
     def close_connections(self):
         """Close all database connections"""
         self.mongodb.close_connections()
 
+def _read_watermark(path: str) -> Optional[datetime]:
+    """Cutoff of the last archival run, or None before the first one"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return datetime.fromisoformat(json.load(f)["archived_before"])
+    except FileNotFoundError:
+        return None
+
+def _write_watermark(path: str, cutoff: datetime):
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as f:
+        json.dump({"archived_before": cutoff.isoformat()}, f)
+    os.replace(temporary_path, path)
+
 # Global database service instance
 db_service = DatabaseService()
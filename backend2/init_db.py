@@ -21,8 +21,8 @@ def main():
         create_tables()
         print("✅ Database tables created successfully!")
         
-        # Initialize database (async)
-        asyncio.run(init_db())
+        # Initialize database (async); indexes are only created here, at deploy time
+        asyncio.run(init_db(create_mongodb_indexes=True))
         print("✅ Database initialized successfully!")
         
     except Exception as e:
@@ -8,9 +8,10 @@ import asyncio
 import os
 from datetime import datetime
 from dotenv import load_dotenv
+from pymongo.errors import DuplicateKeyError
 
 from mongodb_config import mongodb_config
-from database_service import db_service
+from database_service import knowledge_content_hash
 
 def init_mongodb():
     """Initialize MongoDB database with proper structure"""
@@ -23,27 +24,26 @@ def init_mongodb():
         client = mongodb_config.connect_sync()
         print("✅ MongoDB connection successful!")
         
-        # Create indexes
+        # Create indexes, including the weighted knowledge text index
         print("\n2️⃣ Creating Database Indexes...")
         mongodb_config.create_indexes()
         print("✅ Database indexes created!")
         
-        # Create text index for knowledge database search
-        print("\n3️⃣ Creating Text Search Index...")
-        knowledge_collection = mongodb_config.get_collection('knowledge_database')
-        try:
-            knowledge_collection.create_index([("content", "text")])
-            print("✅ Text search index created!")
-        except Exception as e:
-            print(f"⚠️ Text index creation failed (may already exist): {e}")
-        
         # Initialize with sample data
-        print("\n4️⃣ Initializing Sample Data...")
+        print("\n3️⃣ Initializing Sample Data...")
         init_sample_data()
         print("✅ Sample data initialized!")
         
+        # Key existing knowledge items for bulk upserts
+        print("\n🔑 Backfilling Knowledge Content Hashes...")
+        backfill_knowledge_hashes()
+        
+        # Give analytics written before retention a field their TTL index can expire them on
+        print("\n⏳ Backfilling Analytics Expiry Dates...")
+        backfill_analytics_created_at()
+        
         # Test database operations
-        print("\n5️⃣ Testing Database Operations...")
+        print("\n4️⃣ Testing Database Operations...")
         test_database_operations()
         print("✅ Database operations working!")
         
@@ -149,6 +149,51 @@ def init_sample_data():
     except Exception as e:
         print(f"   ❌ Sample data initialization failed: {e}")
 
+def backfill_knowledge_hashes():
+    """Set content_hash on knowledge items stored before items were keyed by it"""
+    try:
+        knowledge_collection = mongodb_config.get_collection('knowledge_database')
+        updated = removed = 0
+        for item in knowledge_collection.find({"content_hash": {"$exists": False}},
+                                              {"category": 1, "source_id": 1, "content": 1}):
+            content_hash = knowledge_content_hash(item.get("category", ""), item.get("source_id", ""), item.get("content", ""))
+            try:
+                knowledge_collection.update_one({"_id": item["_id"]}, {"$set": {"content_hash": content_hash}})
+                updated += 1
+            except DuplicateKeyError:
+                # An identical item already holds this hash
+                knowledge_collection.delete_one({"_id": item["_id"]})
+                removed += 1
+        
+        print(f"   ✅ {updated} knowledge items keyed, {removed} duplicates removed")
+        
+    except Exception as e:
+        print(f"   ❌ Content hash backfill failed: {e}")
+
+def backfill_analytics_created_at():
+    """Set created_at on analytics documents stored before it drove their retention
+    
+    The TTL index ignores documents without the field, so they would never
+    expire. It is taken from the document's ``date`` (YYYY-MM-DD), or is the
+    current time when that is missing or unreadable.
+    """
+    try:
+        analytics_collection = mongodb_config.get_collection('analytics')
+        now = datetime.now()
+        result = analytics_collection.update_many(
+            {"created_at": {"$exists": False}},
+            [{"$set": {"created_at": {"$cond": [
+                {"$eq": [{"$type": "$date"}, "date"]},
+                "$date",
+                {"$dateFromString": {"dateString": "$date", "format": "%Y-%m-%d", "onError": now, "onNull": now}}
+            ]}}}]
+        )
+        
+        print(f"   ✅ {result.modified_count} analytics documents given an expiry date")
+        
+    except Exception as e:
+        print(f"   ❌ Analytics created_at backfill failed: {e}")
+
 def test_database_operations():
     """Test basic database operations"""
     try:
@@ -0,0 +1,110 @@
+"""
+Inverted indexes over knowledge database items
+
+``KnowledgeIndex`` tokenizes items once when a knowledge database is built,
+using the same terms as the snapshot postings. ``SnapshotKnowledgeIndex``
+answers the same queries straight from a mapped snapshot's postings, so
+loading a snapshot does not re-tokenize anything. Either way queries only
+touch the postings of their own terms instead of scanning and
+re-lowercasing every item.
+"""
+
+import heapq
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from knowledge_snapshot import KnowledgeSnapshot, tokenize
+
+
+class KnowledgeIndex:
+    """Term -> item postings with IDF-weighted top-k lookup
+
+    The index keeps its own copy of the item texts, so a reader holding one
+    index never mixes results from two different knowledge builds.
+    """
+
+    __slots__ = ("categories", "items", "item_categories", "postings")
+
+    def __init__(self, knowledge: Dict[str, Sequence[str]]):
+        self.categories: Tuple[str, ...] = tuple(knowledge)
+        items: List[str] = []
+        item_categories: List[int] = []
+        postings: Dict[str, List[int]] = {}
+
+        for category_id, category in enumerate(self.categories):
+            for text in knowledge[category]:
+                position = len(items)
+                items.append(text)
+                item_categories.append(category_id)
+                for term in dict.fromkeys(tokenize(text)):
+                    postings.setdefault(term, []).append(position)
+
+        self.items: Tuple[str, ...] = tuple(items)
+        self.item_categories: Tuple[int, ...] = tuple(item_categories)
+        self.postings: Dict[str, Tuple[int, ...]] = {term: tuple(positions) for term, positions in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def term_postings(self, term: str) -> Sequence[int]:
+        return self.postings.get(term, ())
+
+    def category_of(self, position: int) -> int:
+        return self.item_categories[position]
+
+    def item(self, position: int) -> str:
+        return self.items[position]
+
+    def search(self, query: str, categories: Optional[Iterable[str]] = None, limit: int = 6) -> List[str]:
+        """Best ``limit`` items sharing terms with ``query``, optionally restricted to ``categories``
+
+        Items score the summed IDF of the distinct query terms they contain;
+        ties keep knowledge database order, which is already ranked per category.
+        """
+        allowed = None
+        if categories is not None:
+            wanted = set(categories)
+            allowed = {index for index, name in enumerate(self.categories) if name in wanted}
+            if not allowed:
+                return []
+
+        total = len(self)
+        scores: Dict[int, float] = {}
+        for term in dict.fromkeys(tokenize(query)):
+            positions = self.term_postings(term)
+            if not positions:
+                continue
+            weight = math.log(1 + total / len(positions))
+            for position in positions:
+                if allowed is None or self.category_of(position) in allowed:
+                    scores[position] = scores.get(position, 0.0) + weight
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda entry: (entry[1], -entry[0]))
+        return [self.item(position) for position, _ in best]
+
+
+class SnapshotKnowledgeIndex(KnowledgeIndex):
+    """``KnowledgeIndex`` over a mapped snapshot's postings and items
+
+    Holding the index keeps its snapshot mapped, so readers of one build
+    never see items of another.
+    """
+
+    __slots__ = ("knowledge", "snapshot")
+
+    def __init__(self, snapshot: KnowledgeSnapshot):
+        self.snapshot = snapshot
+        self.knowledge = snapshot.knowledge()
+        self.categories = tuple(self.knowledge)
+
+    def __len__(self) -> int:
+        return self.snapshot.item_count
+
+    def term_postings(self, term: str) -> Sequence[int]:
+        return self.snapshot.postings(term)
+
+    def category_of(self, position: int) -> int:
+        return self.knowledge.category_of(position)
+
+    def item(self, position: int) -> str:
+        return self.snapshot.item(position)
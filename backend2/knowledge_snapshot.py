@@ -0,0 +1,431 @@
+"""
+Versioned binary snapshots of the knowledge database
+
+A snapshot is a single file that readers memory-map instead of parsing:
+
+    header      magic, format version, build version, section offsets, CRC32
+    strings     u32 offset table + UTF-8 blob (category names, items, terms)
+    items       u32 string id per knowledge item, grouped by category
+    categories  (name id, first item, item count) per category
+    postings    (term id, first posting, posting count) per term, sorted by
+                term, followed by the u32 item positions of every term
+    meta        zlib-compressed JSON for everything else (timestamps, crawl status)
+    pages       (group name id, blob offset, blob length) per page group,
+                followed by one zlib-compressed JSON blob per group
+
+Readers reject files with a different magic or format version, or whose
+payload up to the page blobs does not match the header checksum. Page blobs
+are only read (and verified by zlib) when their group is first used, so
+mapping a snapshot and serving from it costs nothing per item or page.
+"""
+
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import time
+import zlib
+from bisect import bisect_right
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"SRMKSNAP"
+SNAPSHOT_FORMAT_VERSION = 3  # Also bumped when ``tokenize`` changes, since postings store its terms
+SNAPSHOT_SUFFIX = ".snap"
+
+# magic, format version, flags, build version, created at,
+# strings (offset, count), items (offset, count), categories (offset, count),
+# postings (offset, count), meta (offset, length), pages (offset, count),
+# CRC32 of the payload up to the page blobs
+HEADER = struct.Struct("<8sHHQd13I")
+U32 = struct.Struct("<I")
+PAIR = struct.Struct("<II")
+TRIPLE = struct.Struct("<III")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "for", "from",
+    "has", "have", "how", "i", "in", "is", "it", "its", "me", "my", "of", "on",
+    "or", "our", "tell", "that", "the", "their", "there", "this", "to", "was",
+    "we", "what", "when", "where", "which", "who", "will", "with", "you", "your",
+    "about", "all", "any", "also", "into", "more", "than", "them", "they", "were"
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# Dotted abbreviations ("B.Tech", "M.B.A", "Ph.D") are one term, not their one-letter pieces
+ABBREVIATION_PATTERN = re.compile(r"\b(?:[a-z]{1,2}\.)+[a-z]+\b")
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, truncated, corrupt or incompatible"""
+
+
+def normalize_term(token: str) -> str:
+    """Fold a plural onto its singular ("admissions" -> "admission", "faculties" -> "faculty")"""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith(("sses", "ches", "shes", "xes")):
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase ``text`` and split it into index terms, dropping stopwords
+
+    Items and queries go through the same steps: dotted abbreviations are
+    joined ("b.tech" -> "btech") and plurals folded, so "B.Tech admissions"
+    and "btech admission" share their terms.
+    """
+    text = ABBREVIATION_PATTERN.sub(lambda match: match.group().replace(".", ""), text.lower())
+    return [
+        normalize_term(token) for token in TOKEN_PATTERN.findall(text)
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def snapshot_filename(build_version: int) -> str:
+    return f"knowledge-{build_version:010d}{SNAPSHOT_SUFFIX}"
+
+
+def list_snapshots(directory: str) -> List[str]:
+    """Snapshot paths in ``directory``, oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(
+        name for name in os.listdir(directory)
+        if name.startswith("knowledge-") and name.endswith(SNAPSHOT_SUFFIX)
+    )
+    return [os.path.join(directory, name) for name in names]
+
+
+def latest_snapshot_path(directory: str) -> Optional[str]:
+    snapshots = list_snapshots(directory)
+    return snapshots[-1] if snapshots else None
+
+
+def latest_build_version(directory: str) -> int:
+    """Build version of the newest snapshot file in ``directory`` (0 if there is none), read from its name"""
+    path = latest_snapshot_path(directory)
+    if path is None:
+        return 0
+    try:
+        return int(os.path.basename(path)[len("knowledge-"):-len(SNAPSHOT_SUFFIX)])
+    except ValueError:
+        return 0
+
+
+def prune_snapshots(directory: str, keep: int = 3):
+    """Delete all but the newest ``keep`` snapshots"""
+    for path in list_snapshots(directory)[:-keep]:
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not remove old snapshot {path}: {e}")
+
+
+def write_snapshot(directory: str, knowledge: Dict[str, List[str]], build_version: int,
+                   meta: Optional[Dict[str, Any]] = None, pages: Optional[Dict[str, Any]] = None) -> str:
+    """Write ``knowledge`` as snapshot ``build_version`` and return its path
+
+    ``pages`` maps page group names (e.g. source IDs) to JSON-serializable
+    values stored as separate blobs, read with ``KnowledgeSnapshot.page_group``.
+    The file is written next to its final name and renamed into place, so
+    readers only ever see complete snapshots.
+    """
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    # Items grouped by category, in category order
+    item_ids: List[int] = []
+    item_texts: List[str] = []
+    categories = []
+    for category, items in knowledge.items():
+        first = len(item_ids)
+        for item in items:
+            item_ids.append(intern(item))
+            item_texts.append(item)
+        categories.append((intern(category), first, len(items)))
+
+    # Inverted index: term -> item positions
+    term_postings: Dict[str, List[int]] = {}
+    for position, text in enumerate(item_texts):
+        for term in dict.fromkeys(tokenize(text)):
+            term_postings.setdefault(term, []).append(position)
+    terms = sorted(term_postings)
+    term_ids = [intern(term) for term in terms]
+    groups = list(pages or {})
+    group_ids = [intern(group) for group in groups]
+
+    payload = bytearray()
+    offset = HEADER.size
+
+    # Strings section
+    encoded = [value.encode("utf-8") for value in strings]
+    strings_offset = offset + len(payload)
+    position = 0
+    payload += U32.pack(position)
+    for value in encoded:
+        position += len(value)
+        payload += U32.pack(position)
+    for value in encoded:
+        payload += value
+
+    # Items section
+    items_offset = offset + len(payload)
+    for string_id in item_ids:
+        payload += U32.pack(string_id)
+
+    # Categories section
+    categories_offset = offset + len(payload)
+    for entry in categories:
+        payload += TRIPLE.pack(*entry)
+
+    # Postings section
+    postings_offset = offset + len(payload)
+    first = 0
+    for term, term_id in zip(terms, term_ids):
+        payload += TRIPLE.pack(term_id, first, len(term_postings[term]))
+        first += len(term_postings[term])
+    for term in terms:
+        for item_position in term_postings[term]:
+            payload += U32.pack(item_position)
+
+    # Meta section
+    meta_offset = offset + len(payload)
+    meta_blob = zlib.compress(json.dumps(meta or {}, ensure_ascii=False, default=str).encode("utf-8"))
+    payload += meta_blob
+
+    # Pages section: the group table is checksummed, the blobs are not
+    pages_offset = offset + len(payload)
+    blobs = [zlib.compress(json.dumps(pages[group], ensure_ascii=False, default=str).encode("utf-8")) for group in groups]
+    blob_offset = 0
+    for group_id, blob in zip(group_ids, blobs):
+        payload += TRIPLE.pack(group_id, blob_offset, len(blob))
+        blob_offset += len(blob)
+    checksum = zlib.crc32(payload)
+    for blob in blobs:
+        payload += blob
+
+    header = HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, 0, build_version, time.time(),
+        strings_offset, len(strings),
+        items_offset, len(item_ids),
+        categories_offset, len(categories),
+        postings_offset, len(terms),
+        meta_offset, len(meta_blob),
+        pages_offset, len(groups),
+        checksum
+    )
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, snapshot_filename(build_version))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+class KnowledgeSnapshot:
+    """Read-only, memory-mapped view of a snapshot file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            self._file = open(path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Cannot map snapshot {path}: {e}") from e
+
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise SnapshotError(f"Snapshot {path} is truncated")
+
+        (magic, format_version, _flags, self.build_version, self.created_at,
+         self._strings_offset, self._strings_count,
+         self._items_offset, self._items_count,
+         self._categories_offset, self._categories_count,
+         self._postings_offset, self._terms_count,
+         self._meta_offset, self._meta_length,
+         self._pages_offset, self._groups_count,
+         checksum) = HEADER.unpack_from(self._map, 0)
+
+        if magic != SNAPSHOT_MAGIC:
+            self.close()
+            raise SnapshotError(f"{path} is not a knowledge snapshot")
+        if format_version != SNAPSHOT_FORMAT_VERSION:
+            self.close()
+            raise SnapshotError(
+                f"Snapshot {path} has format version {format_version}, expected {SNAPSHOT_FORMAT_VERSION}"
+            )
+        self._pages_data = self._pages_offset + self._groups_count * TRIPLE.size
+        if self._pages_data > len(self._map) or zlib.crc32(self._map[HEADER.size:self._pages_data]) != checksum:
+            self.close()
+            raise SnapshotError(f"Snapshot {path} failed its checksum")
+
+        self._string_blob = self._strings_offset + (self._strings_count + 1) * U32.size
+        self._postings_data = self._postings_offset + self._terms_count * TRIPLE.size
+
+    def close(self):
+        """Unmap the file; only safe once no view of this snapshot is in use
+
+        Published snapshots are not closed explicitly: readers may still hold
+        a ``knowledge()`` view or a lazily loaded page group, and the map is
+        released when the last reference to the snapshot goes away.
+        """
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        if getattr(self, "_file", None) is not None:
+            self._file.close()
+            self._file = None
+
+    def string(self, string_id: int) -> str:
+        start, end = PAIR.unpack_from(self._map, self._strings_offset + string_id * U32.size)
+        return self._map[self._string_blob + start:self._string_blob + end].decode("utf-8")
+
+    @property
+    def item_count(self) -> int:
+        return self._items_count
+
+    def item(self, position: int) -> str:
+        (string_id,) = U32.unpack_from(self._map, self._items_offset + position * U32.size)
+        return self.string(string_id)
+
+    def category_ranges(self) -> List[tuple]:
+        """(category, first item position, item count) per category"""
+        ranges = []
+        for index in range(self._categories_count):
+            name_id, first, count = TRIPLE.unpack_from(self._map, self._categories_offset + index * TRIPLE.size)
+            ranges.append((self.string(name_id), first, count))
+        return ranges
+
+    def knowledge(self) -> "SnapshotKnowledge":
+        """Read-only ``{category: items}`` view that reads items from the map on access"""
+        return SnapshotKnowledge(self)
+
+    def categories(self) -> Dict[str, List[str]]:
+        """Materialize the knowledge database as ``{category: [items]}``"""
+        return {
+            category: [self.item(position) for position in range(first, first + count)]
+            for category, first, count in self.category_ranges()
+        }
+
+    def term(self, index: int) -> str:
+        term_id, _, _ = TRIPLE.unpack_from(self._map, self._postings_offset + index * TRIPLE.size)
+        return self.string(term_id)
+
+    def postings(self, term: str) -> List[int]:
+        """Item positions containing ``term`` (binary search over the sorted term table)"""
+        low, high = 0, self._terms_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.term(middle) < term:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self._terms_count or self.term(low) != term:
+            return []
+        _, first, count = TRIPLE.unpack_from(self._map, self._postings_offset + low * TRIPLE.size)
+        start = self._postings_data + first * U32.size
+        return list(struct.unpack_from(f"<{count}I", self._map, start))
+
+    def terms(self) -> Iterable[str]:
+        for index in range(self._terms_count):
+            yield self.term(index)
+
+    def meta(self) -> Dict[str, Any]:
+        blob = self._map[self._meta_offset:self._meta_offset + self._meta_length]
+        return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+    def page_groups(self) -> List[str]:
+        """Names of the page groups stored in the snapshot"""
+        return [
+            self.string(TRIPLE.unpack_from(self._map, self._pages_offset + index * TRIPLE.size)[0])
+            for index in range(self._groups_count)
+        ]
+
+    def page_group(self, name: str) -> Any:
+        """Decode one page group (None if the snapshot has no group ``name``)"""
+        for index in range(self._groups_count):
+            name_id, start, length = TRIPLE.unpack_from(self._map, self._pages_offset + index * TRIPLE.size)
+            if self.string(name_id) != name:
+                continue
+            start += self._pages_data
+            if start + length > len(self._map):
+                raise SnapshotError(f"Snapshot {self.path} is truncated")
+            try:
+                return json.loads(zlib.decompress(self._map[start:start + length]).decode("utf-8"))
+            except (zlib.error, ValueError) as e:
+                raise SnapshotError(f"Page group {name} of snapshot {self.path} is corrupt: {e}") from e
+        return None
+
+
+class SnapshotItems(Sequence):
+    """Items of one category, read from the snapshot map on access"""
+
+    def __init__(self, snapshot: KnowledgeSnapshot, first: int, count: int):
+        self._snapshot = snapshot
+        self._first = first
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("knowledge item index out of range")
+        return self._snapshot.item(self._first + index)
+
+
+class SnapshotKnowledge(Mapping):
+    """Knowledge database view of a snapshot: ``{category: SnapshotItems}`` in snapshot order"""
+
+    def __init__(self, snapshot: KnowledgeSnapshot):
+        self.snapshot = snapshot
+        self._categories = {
+            category: SnapshotItems(snapshot, first, count)
+            for category, first, count in snapshot.category_ranges()
+        }
+        self._starts = [items._first for items in self._categories.values()]
+
+    def __getitem__(self, category: str) -> SnapshotItems:
+        return self._categories[category]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._categories)
+
+    def __len__(self) -> int:
+        return len(self._categories)
+
+    def category_of(self, position: int) -> int:
+        """Index (in iteration order) of the category holding item ``position``"""
+        return bisect_right(self._starts, position) - 1
+
+
+def open_latest_snapshot(directory: str) -> Optional[KnowledgeSnapshot]:
+    """Map the newest readable snapshot in ``directory``, skipping incompatible or corrupt files"""
+    for path in reversed(list_snapshots(directory)):
+        try:
+            return KnowledgeSnapshot(path)
+        except SnapshotError as e:
+            logger.warning(f"⚠️ Skipping snapshot: {e}")
+    return None
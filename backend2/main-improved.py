@@ -5,22 +5,53 @@ Main application entry point - Same features, simplified implementation
 
 import asyncio
 import logging
+import os
 import requests
 from contextlib import asynccontextmanager
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, Iterable, List, Optional
+from types import MappingProxyType
 from bs4 import BeautifulSoup
 import json
-from datetime import datetime
+import hashlib
+import heapq
+import itertools
+import math
+import random
+import gzip
+import io
+import re
+import signal
+import sys
+from datetime import datetime, timezone
 import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+import xml.etree.ElementTree as ET
 
-from fastapi import FastAPI, Request, status, BackgroundTasks
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 import uvicorn
 
+from knowledge_snapshot import KnowledgeSnapshot, write_snapshot, open_latest_snapshot, prune_snapshots, latest_build_version
+from knowledge_index import KnowledgeIndex, SnapshotKnowledgeIndex
+from page_store import PageRecord, PageStore, SourceStats, page_tree
+from page_bodies import RAW_PAGES_DIR, PageBodyStore
+from process_lock import ProcessLock
+from crawl_jobs import CrawlJobStore, FINAL_STATES as CRAWL_JOB_FINAL_STATES
+from near_duplicates import NearDuplicateIndex, boilerplate_clusters, PAGE_SIMILARITY_THRESHOLD
+
+try:
+    from pypdf import PdfReader  # Optional: enables PDF text extraction
+except ImportError:
+    PdfReader = None
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,7 +59,7 @@ logger = logging.getLogger(__name__)
 # Enhanced storage with pre-scraped database
 chat_history = []
 user_sessions = {}
-scraped_data = {}
+page_store = PageStore()  # Crawled pages of every source, one flat record per URL; swapped whole on snapshot reload
 
 # Pre-scraped knowledge database for instant AI responses
 KNOWLEDGE_DATABASE = {
@@ -89,9 +120,353 @@ KNOWLEDGE_DATABASE = {
     ]
 }
 
+def freeze_knowledge(database: Dict[str, List[str]]) -> MappingProxyType:
+    """Read-only view of a knowledge database; published builds are never mutated"""
+    return MappingProxyType({category: tuple(items) for category, items in database.items()})
+
+KNOWLEDGE_DATABASE = freeze_knowledge(KNOWLEDGE_DATABASE)
+KNOWLEDGE_INDEX = KnowledgeIndex(KNOWLEDGE_DATABASE)  # Rebuilt and swapped with every published database
+
 # Database update status
 last_database_update = datetime.now().isoformat()  # Initialize with current time
-database_update_in_progress = False
+database_update_in_progress = False  # A build is running; further requests are coalesced into it
+knowledge_builds_requested = 0  # Build requests so far; a pass covers every request made before it started
+knowledge_builds_completed = 0  # Requests covered by the last finished pass
+knowledge_build_lock = threading.Lock()
+knowledge_build_done = threading.Condition(knowledge_build_lock)
+
+# Versioned knowledge snapshots written after every build and memory-mapped on startup
+KNOWLEDGE_SNAPSHOT_DIR = os.getenv("KNOWLEDGE_SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots"))
+knowledge_version = 0
+current_snapshot = None
+# Writers in every process allocate snapshot versions while holding this file lock (and the thread lock)
+SNAPSHOT_LOCK_PATH = os.path.join(KNOWLEDGE_SNAPSHOT_DIR, "snapshot.lock")
+SNAPSHOT_LOCK_RETRY = 0.05  # Seconds between attempts to take the snapshot lock
+snapshot_write_lock = threading.Lock()
+published_crawl_status: Dict[str, Any] = {}  # get_crawl_status() of the crawler that wrote the loaded snapshot
+crawler_process = False  # Set in the crawler process, the only one with live crawl status and fingerprints
+
+# Background warm-up progress reported by /health/ready
+warmup_state = {
+    "phase": "starting",
+    "knowledge_source": None,  # "snapshot" or "crawl" once knowledge is usable
+    "sources_total": 0,
+    "sources_done": 0,
+    "started_at": None,
+    "completed_at": None,
+    "error": None
+}
+
+# Crawler scheduling: one crawler process per deployment publishes snapshots that every web worker reloads
+CRAWLER_MODE = os.getenv("CRAWLER_MODE", "process")  # "process": elect a worker to run the crawler; "off": only reload snapshots
+CRAWL_INTERVAL = 900  # Seconds between crawl cycles (15 minutes)
+CRAWL_RETRY_DELAY = 300  # Seconds before retrying a failed crawl cycle
+CRAWLER_RESTART_DELAY = 30  # Seconds before restarting a crawler process that exited
+CRAWLER_ELECTION_INTERVAL = 10  # Seconds between attempts of non-leader workers to take over
+SNAPSHOT_POLL_INTERVAL = 5  # Seconds between checks for a newer snapshot
+SUPERVISOR_LOCK_PATH = os.path.join(KNOWLEDGE_SNAPSHOT_DIR, "supervisor.lock")
+CRAWLER_LOCK_PATH = os.path.join(KNOWLEDGE_SNAPSHOT_DIR, "crawler.lock")
+crawler_stop = threading.Event()  # Set on SIGTERM in the crawler process
+crawl_lock = threading.Lock()  # Crawls of the scheduled and job threads take turns, one source at a time
+crawler_state = {
+    "mode": CRAWLER_MODE,
+    "role": None,  # "leader" supervises the crawler process, "follower" only reloads snapshots
+    "pid": None,
+    "started_at": None,
+    "restarts": 0,
+    "last_exit_code": None
+}
+
+# Incremental recrawl state: HTTP validators, content hash, parsed content and links per URL
+page_fingerprints: Dict[str, Dict[str, Any]] = {}
+FINGERPRINT_GROUP = "__fingerprints__"  # Snapshot page group holding the fingerprints without their content
+
+# Raw page bodies, stored once per distinct content and referenced by hash from page records
+# (set RAW_PAGES_DIR to an empty string to keep no bodies)
+page_bodies = PageBodyStore(RAW_PAGES_DIR) if RAW_PAGES_DIR else None
+last_crawl_delta = {"timestamp": None, "changed_pages": [], "total_pages": 0}
+
+# Crawl frontier scoring: URL path / anchor keywords that mark high-value pages
+PRIORITY_KEYWORDS = {
+    "admission": 5.0,
+    "fee": 5.0,
+    "hostel": 4.0,
+    "placement": 4.0,
+    "scholarship": 3.0,
+    "eligibility": 3.0,
+    "course": 2.0,
+    "program": 2.0,
+    "research": 1.5,
+    "event": 1.0,
+    "news": 1.0
+}
+
+# Historical yield: useful knowledge items each URL produced on its last parse
+page_yield: Dict[str, int] = {}
+
+# Low-priority PDF text extraction: queued URL -> source name, and extracted records by URL
+pdf_queue: Dict[str, str] = {}
+pdf_records: Dict[str, PageRecord] = {}
+
+# Crawler politeness and resilience settings
+CRAWLER_MAX_WORKERS = 8  # Fetch threads shared by all hosts of one crawl
+CRAWLER_TIMEOUT = (5, 15)  # (connect, read) seconds
+CRAWLER_MAX_RETRIES = 3
+CRAWLER_BACKOFF_BASE = 0.5  # Seconds; doubled per retry with full jitter
+CRAWLER_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+HOST_RATE_PER_SECOND = 2.0  # Token bucket refill rate per host
+HOST_BURST = 4
+HOST_INITIAL_CONCURRENCY = 2
+HOST_MAX_CONCURRENCY = 8
+HOST_SLOW_LATENCY = 5.0  # Seconds; slower responses halve the host's concurrency
+CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive failures before a host is paused
+CIRCUIT_COOLDOWN = 60.0  # Seconds a paused host waits before a probe request
+MAX_PAGE_BYTES = 2 * 1024 * 1024  # Hard cap on streamed HTML bodies
+MAX_PDF_BYTES = 10 * 1024 * 1024
+HTML_CONTENT_TYPES = {"text/html", "application/xhtml+xml"}
+PDF_QUEUE_BATCH = 20  # PDFs extracted per crawl cycle, after all HTML pages
+PDF_MAX_PAGES = 50
+
+class HostPolicy:
+    """Per-host token bucket, AIMD concurrency limit and circuit breaker with stats"""
+    
+    def __init__(self, host: str):
+        self.host = host
+        self.lock = threading.Lock()
+        self.rate = HOST_RATE_PER_SECOND
+        self.tokens = float(HOST_BURST)
+        self.last_refill = time.monotonic()
+        self.concurrency_limit = float(HOST_INITIAL_CONCURRENCY)
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self.circuit_open_until = 0.0
+        self.probe_in_flight = False
+        self.started_at = time.monotonic()
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.retries = 0
+        self.bytes_received = 0
+        self.avg_latency = 0.0
+    
+    def circuit_state(self) -> str:
+        if not self.circuit_open_until:
+            return "closed"
+        if time.monotonic() < self.circuit_open_until:
+            return "open"
+        return "half_open"
+    
+    def try_acquire(self) -> bool:
+        """Reserve a concurrency slot; False while the host is paused or saturated"""
+        with self.lock:
+            state = self.circuit_state()
+            if state == "open":
+                return False
+            if state == "half_open":
+                # Let exactly one probe request through after the cooldown
+                if self.probe_in_flight or self.in_flight:
+                    return False
+                self.probe_in_flight = True
+            elif self.in_flight >= int(self.concurrency_limit):
+                return False
+            self.in_flight += 1
+            return True
+    
+    def release(self):
+        with self.lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            self.probe_in_flight = False
+    
+    def wait_for_token(self):
+        """Block until the host's token bucket allows another request"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(HOST_BURST, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+    
+    def record_success(self, latency: float):
+        with self.lock:
+            self.requests += 1
+            self.successes += 1
+            self.avg_latency = latency if self.requests == 1 else 0.8 * self.avg_latency + 0.2 * latency
+            self.consecutive_failures = 0
+            self.circuit_open_until = 0.0
+            if latency > HOST_SLOW_LATENCY:
+                self.concurrency_limit = max(1.0, self.concurrency_limit / 2)
+            else:
+                self.concurrency_limit = min(HOST_MAX_CONCURRENCY, self.concurrency_limit + 1 / self.concurrency_limit)
+    
+    def record_bytes(self, size: int):
+        with self.lock:
+            self.bytes_received += size
+    
+    def record_failure(self, latency: float):
+        with self.lock:
+            self.requests += 1
+            self.failures += 1
+            self.avg_latency = latency if self.requests == 1 else 0.8 * self.avg_latency + 0.2 * latency
+            self.consecutive_failures += 1
+            self.concurrency_limit = max(1.0, self.concurrency_limit / 2)
+            if self.probe_in_flight or self.consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+                self.circuit_open_until = time.monotonic() + CIRCUIT_COOLDOWN
+                logger.warning(f"🚧 Pausing {self.host} for {CIRCUIT_COOLDOWN:.0f}s after {self.consecutive_failures} consecutive failures")
+    
+    def summary(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.started_at, 1e-6)
+        return {
+            "circuit": self.circuit_state(),
+            "rate_per_second": round(self.rate, 3),
+            "concurrency_limit": round(self.concurrency_limit, 2),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "successes": self.successes,
+            "failures": self.failures,
+            "retries": self.retries,
+            "error_rate": round(self.failures / self.requests, 3) if self.requests else 0.0,
+            "avg_latency_seconds": round(self.avg_latency, 3),
+            "requests_per_minute": round(self.requests * 60 / elapsed, 2),
+            "bytes_received": self.bytes_received
+        }
+
+host_policies: Dict[str, HostPolicy] = {}
+host_policies_lock = threading.Lock()
+
+def get_host_policy(url: str) -> HostPolicy:
+    """Get (or create) the politeness policy for a URL's host"""
+    host = urlparse(url).netloc.lower()
+    with host_policies_lock:
+        if host not in host_policies:
+            host_policies[host] = HostPolicy(host)
+        return host_policies[host]
+
+# robots.txt / sitemap discovery settings
+SITE_INFO_TTL = 6 * 3600  # Seconds before robots.txt and sitemaps are refetched
+SITEMAP_MAX_FILES = 20  # Sitemap documents followed per host (including indexes)
+SITEMAP_MAX_URLS = 5000
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+# Per-host robots.txt rules and sitemap URLs with their lastmod hints
+site_info: Dict[str, Dict[str, Any]] = {}
+
+def parse_lastmod(value: str):
+    """Parse a sitemap <lastmod> value into an aware UTC datetime"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+def parse_sitemap(body: bytes):
+    """Parse a sitemap or sitemap index, returning (child sitemaps, {page url: lastmod})"""
+    if body[:2] == b'\x1f\x8b':
+        body = gzip.decompress(body)
+    root = ET.fromstring(body)
+    
+    child_sitemaps = []
+    pages = {}
+    if root.tag.endswith('sitemapindex'):
+        for entry in root.iter(f"{SITEMAP_NS}sitemap"):
+            loc = entry.findtext(f"{SITEMAP_NS}loc")
+            if loc:
+                child_sitemaps.append(loc.strip())
+    else:
+        for entry in root.iter(f"{SITEMAP_NS}url"):
+            loc = entry.findtext(f"{SITEMAP_NS}loc")
+            if loc:
+                pages[loc.strip()] = parse_lastmod(entry.findtext(f"{SITEMAP_NS}lastmod"))
+    return child_sitemaps, pages
+
+def get_site_info(url: str) -> Dict[str, Any]:
+    """Fetch (or return cached) robots.txt rules and sitemap URLs for a URL's host"""
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    info = site_info.get(host)
+    if info and time.time() - info["fetched_at"] < SITE_INFO_TTL:
+        return info
+    
+    base = f"{parsed.scheme}://{parsed.netloc}"
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    }
+    
+    robots = RobotFileParser(f"{base}/robots.txt")
+    try:
+        response = fetch_url(f"{base}/robots.txt", headers)
+        if response.status_code == 200:
+            robots.parse(read_limited_body(response, MAX_PAGE_BYTES).decode('utf-8', 'replace').splitlines())
+        elif response.status_code in (401, 403):
+            robots.disallow_all = True
+        else:
+            robots.allow_all = True
+        response.close()
+    except Exception as e:
+        logger.warning(f"⚠️ Could not fetch robots.txt for {host}: {str(e)}")
+        robots.allow_all = True
+    
+    # Honour Crawl-delay by slowing the host's token bucket
+    crawl_delay = robots.crawl_delay("*")
+    if crawl_delay:
+        policy = get_host_policy(url)
+        policy.rate = min(policy.rate, 1 / float(crawl_delay))
+    
+    pending = list(robots.site_maps() or []) or [f"{base}/sitemap.xml"]
+    seen_sitemaps = set()
+    sitemap_urls = {}
+    while pending and len(seen_sitemaps) < SITEMAP_MAX_FILES and len(sitemap_urls) < SITEMAP_MAX_URLS:
+        sitemap_url = pending.pop(0)
+        if sitemap_url in seen_sitemaps:
+            continue
+        seen_sitemaps.add(sitemap_url)
+        try:
+            response = fetch_url(sitemap_url, headers)
+            if response.status_code != 200:
+                response.close()
+                continue
+            child_sitemaps, pages = parse_sitemap(read_limited_body(response, MAX_PDF_BYTES))
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read sitemap {sitemap_url}: {str(e)}")
+            continue
+        pending.extend(child_sitemaps)
+        for page_url, lastmod in pages.items():
+            if urlparse(page_url).netloc.lower() == host and robots.can_fetch("*", page_url):
+                sitemap_urls[page_url] = lastmod
+    
+    info = {
+        "fetched_at": time.time(),
+        "robots": robots,
+        "sitemap_urls": dict(itertools.islice(sitemap_urls.items(), SITEMAP_MAX_URLS))
+    }
+    site_info[host] = info
+    logger.info(f"🗺️ {host}: {len(info['sitemap_urls'])} sitemap URLs from {len(seen_sitemaps)} sitemap files")
+    return info
+
+def is_allowed_by_robots(url: str) -> bool:
+    """Check a URL against its host's robots.txt rules"""
+    return get_site_info(url)["robots"].can_fetch("*", url)
+
+def sitemap_freshness_bonus(url: str, lastmod) -> float:
+    """Priority adjustment for a sitemap URL based on its <lastmod> hint"""
+    if lastmod is None:
+        return 0.0
+    fingerprint = page_fingerprints.get(url)
+    if fingerprint and fingerprint.get("fetched_at") and lastmod <= fingerprint["fetched_at"]:
+        return -2.0  # Not modified since we last fetched it
+    age_days = (datetime.now(timezone.utc) - lastmod).days
+    if age_days <= 7:
+        return 3.0
+    if age_days <= 30:
+        return 1.0
+    return 0.0
 
 # Scraping configuration with INFINITE deep scraping
 SCRAPING_SOURCES = {
@@ -101,7 +476,8 @@ SCRAPING_SOURCES = {
         "enabled": True,
         "deep_scrape": True,
         "max_depth": 999,  # Infinite depth
-        "max_pages": 1000,  # Massive page limit
+        "max_pages": 1000,  # Page budget per crawl
+        "time_budget": 120,  # Seconds per crawl; all budgets fit the 15 minute window
         "follow_all_links": True
     },
     "srm_admissions": {
@@ -111,6 +487,7 @@ SCRAPING_SOURCES = {
         "deep_scrape": True,
         "max_depth": 999,
         "max_pages": 500,
+        "time_budget": 90,
         "follow_all_links": True
     },
     "srm_admissions_direct": {
@@ -120,6 +497,7 @@ SCRAPING_SOURCES = {
         "deep_scrape": True,
         "max_depth": 999,
         "max_pages": 500,
+        "time_budget": 90,
         "follow_all_links": True
     },
     "srm_engineering": {
@@ -129,6 +507,7 @@ SCRAPING_SOURCES = {
         "deep_scrape": True,
         "max_depth": 999,
         "max_pages": 500,
+        "time_budget": 90,
         "follow_all_links": True
     },
     "srm_news": {
@@ -138,6 +517,7 @@ SCRAPING_SOURCES = {
         "deep_scrape": True,
         "max_depth": 999,
         "max_pages": 300,
+        "time_budget": 90,
         "follow_all_links": True
     },
     "srm_academics": {
@@ -147,6 +527,7 @@ SCRAPING_SOURCES = {
         "deep_scrape": True,
         "max_depth": 999,
         "max_pages": 500,
+        "time_budget": 90,
         "follow_all_links": True
     },
     "srm_research": {
@@ -156,6 +537,7 @@ SCRAPING_SOURCES = {
         "deep_scrape": True,
         "max_depth": 999,
         "max_pages": 400,
+        "time_budget": 90,
         "follow_all_links": True
     },
     "srm_campus_life": {
@@ -165,6 +547,7 @@ SCRAPING_SOURCES = {
         "deep_scrape": True,
         "max_depth": 999,
         "max_pages": 300,
+        "time_budget": 90,
         "follow_all_links": True
     },
     "srm_international": {
@@ -174,71 +557,441 @@ SCRAPING_SOURCES = {
         "deep_scrape": True,
         "max_depth": 999,
         "max_pages": 300,
+        "time_budget": 90,
         "follow_all_links": True
     }
 }
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Application lifespan manager"""
-    # Startup
-    logger.info("🚀 Starting SRM Guide Bot Backend (Improved)...")
-    logger.info("✅ Simplified implementation with full features")
+def warm_up_knowledge_base():
+    """Initial crawl + knowledge build, run by the crawler process before its periodic cycles
     
-    # Initialize simple storage
-    global chat_history, user_sessions
-    chat_history = []
-    user_sessions = {}
-    logger.info("✅ Simple storage initialized")
+    Runs as a ``warmup`` crawl job, which is how web workers follow its
+    progress (see ``crawler_warmup_progress``). Without a snapshot to serve
+    yet, knowledge is published after every source instead of only at the end.
+    """
+    global last_crawl_delta
     
-    # Auto-scrape on startup
-    logger.info("🕷️ Auto-scraping SRM websites on startup...")
     try:
-        for source_id, source_info in SCRAPING_SOURCES.items():
-            if source_info["enabled"]:
+        warmup_state["phase"] = "crawling"
+        changed_pages = []
+        publish_each_source = current_snapshot is None
+        job = start_scheduled_crawl("warmup")
+        warmup_state["sources_total"] = len(job["sources"])
+        error = None
+        try:
+            for source_id in job["sources"]:
+                source_info = SCRAPING_SOURCES[source_id]
                 logger.info(f"Auto-scraping {source_info['name']}...")
+                start_crawl_job_source(job, source_id)
                 
                 # Use deep scraping parameters
                 max_depth = source_info.get("max_depth", 3)
                 max_pages = source_info.get("max_pages", 50)
                 
-                result = scrape_website(
-                    source_info["url"], 
-                    source_info["name"],
-                    depth=0,
-                    max_depth=max_depth,
-                    max_pages=max_pages
-                )
+                with crawl_lock:
+                    pages = scrape_website(
+                        source_info["url"], 
+                        source_info["name"],
+                        depth=0,
+                        max_depth=max_depth,
+                        max_pages=max_pages,
+                        changed_pages=changed_pages,
+                        time_budget=source_info.get("time_budget"),
+                        source_id=source_id,
+                        on_page=crawl_job_page_reporter(job)
+                    )
+                    if pages:
+                        replace_source_pages(source_id, pages, changed_pages)
                 
-                if result:
-                    scraped_data[source_id] = result
-                    sub_pages_count = len(result.get("sub_pages", []))
-                    logger.info(f"✅ Auto-scraped {source_info['name']}: {result.get('status', 'unknown')} with {sub_pages_count} sub-pages")
+                if pages:
+                    logger.info(f"✅ Auto-scraped {source_info['name']}: {pages[0].status} with {len(pages) - 1} sub-pages")
                 else:
                     logger.warning(f"⚠️ No data scraped from {source_info['name']}")
+                finish_crawl_job_source(job, source_id)
+                warmup_state["sources_done"] += 1
+                if publish_each_source and pages:
+                    build_knowledge_database()
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            finish_crawl_job(job, error)
         
-        total_pages = sum(len(data.get("sub_pages", [])) + 1 for data in scraped_data.values() if data)
-        logger.info(f"🚀 Auto-scraping completed. Processed {len(scraped_data)} main sources with {total_pages} total pages.")
+        with crawl_lock:
+            process_pdf_queue(changed_pages)
+        last_crawl_delta = {
+            "timestamp": datetime.now().isoformat(),
+            "changed_pages": changed_pages,
+            "total_pages": page_store.page_count
+        }
+        
+        logger.info(f"🚀 Auto-scraping completed. Processed {len(page_store)} main sources with {page_store.page_count} total pages.")
         
         # Build knowledge database for instant AI responses
+        warmup_state["phase"] = "building"
         logger.info("🧠 Building knowledge database for instant responses...")
         build_knowledge_database()
+        warmup_state["knowledge_source"] = "crawl"
         logger.info("✅ AI is now ready with instant responses from knowledge database!")
-        
-        # Start periodic scraping in background
-        logger.info("🔄 Starting periodic scraping (every 15 minutes) with INFINITE depth...")
-        scraping_thread = threading.Thread(target=periodic_scraping, daemon=True)
-        scraping_thread.start()
-        logger.info("✅ Periodic scraping started in background with infinite depth capability")
     except Exception as e:
+        warmup_state["error"] = str(e)
         logger.error(f"❌ Auto-scraping failed: {str(e)}")
+    finally:
+        warmup_state["phase"] = "complete"
+        warmup_state["completed_at"] = datetime.now().isoformat()
+
+def run_crawler() -> int:
+    """Entry point of the crawler process (``python main-improved.py --crawler``)
+    
+    Crawls every source, then recrawls every ``CRAWL_INTERVAL`` seconds until
+    SIGTERM, publishing each knowledge build as a snapshot. Crawl jobs queued
+    by the web workers run alongside on their own thread; both claim their
+    sources in ``crawl_job_store`` and take ``crawl_lock`` per source, so no
+    source is crawled twice at once. Exits with status 3
+    if another crawler process already holds the crawler lock.
+    """
+    global crawler_process
+    
+    lock = ProcessLock(CRAWLER_LOCK_PATH)
+    if not lock.acquire():
+        logger.warning(f"⚠️ Another crawler holds {CRAWLER_LOCK_PATH}, exiting")
+        return 3
+    
+    crawler_process = True
+    signal.signal(signal.SIGTERM, lambda signum, frame: crawler_stop.set())
+    logger.info(f"🕷️ Crawler process {os.getpid()} started")
+    try:
+        # Resume from the last snapshot so an unchanged crawl does not publish an empty database
+        load_knowledge_snapshot()
+        restore_crawl_state()
+        # Before any crawl claims a source: only claims of a previous crawler are left
+        for job_id in crawl_job_store.recover():
+            logger.warning(f"⚠️ Crawl job {job_id} was interrupted and is marked failed")
+        threading.Thread(target=run_crawl_jobs, name="crawl-jobs", daemon=True).start()
+        warm_up_knowledge_base()
+        logger.info("🔄 Starting periodic scraping (every 15 minutes) with INFINITE depth...")
+        periodic_scraping()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        crawler_stop.set()
+        lock.release()
+        logger.info(f"🛑 Crawler process {os.getpid()} stopped")
+    return 0
+
+async def supervise_crawler():
+    """Run the crawler process from exactly one web worker and restart it whenever it exits
+    
+    Workers compete for the supervisor lock; the winner spawns the crawler
+    process, the others keep retrying so one of them takes over if the
+    leader dies.
+    """
+    lock = ProcessLock(SUPERVISOR_LOCK_PATH)
+    crawler_state["role"] = "follower"
+    while not lock.acquire():
+        await asyncio.sleep(CRAWLER_ELECTION_INTERVAL)
+    crawler_state["role"] = "leader"
+    logger.info(f"👑 Worker {os.getpid()} elected to supervise the crawler process")
+    
+    process = None
+    try:
+        while True:
+            process = await asyncio.create_subprocess_exec(sys.executable, os.path.abspath(__file__), "--crawler")
+            crawler_state["pid"] = process.pid
+            crawler_state["started_at"] = datetime.now().isoformat()
+            logger.info(f"🕷️ Started crawler process {process.pid}")
+            
+            exit_code = await process.wait()
+            crawler_state["pid"] = None
+            crawler_state["last_exit_code"] = exit_code
+            crawler_state["restarts"] += 1
+            logger.warning(f"⚠️ Crawler process exited with status {exit_code}, restarting in {CRAWLER_RESTART_DELAY}s")
+            await asyncio.sleep(CRAWLER_RESTART_DELAY)
+    finally:
+        if process is not None and process.returncode is None:
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), timeout=10)
+            except asyncio.TimeoutError:
+                process.kill()
+        lock.release()
+
+async def reload_knowledge_snapshots():
+    """Hot-reload snapshots published by the crawler process as soon as they appear"""
+    while True:
+        await asyncio.sleep(SNAPSHOT_POLL_INTERVAL)
+        try:
+            if latest_build_version(KNOWLEDGE_SNAPSHOT_DIR) > knowledge_version:
+                if await asyncio.to_thread(load_knowledge_snapshot):
+                    warmup_state["knowledge_source"] = "snapshot"
+                    warmup_state["phase"] = "complete"
+                    warmup_state["completed_at"] = warmup_state["completed_at"] or datetime.now().isoformat()
+        except Exception as e:
+            logger.error(f"❌ Snapshot reload failed: {str(e)}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan manager"""
+    # Startup
+    logger.info("🚀 Starting SRM Guide Bot Backend (Improved)...")
+    logger.info("✅ Simplified implementation with full features")
+    
+    # Initialize simple storage
+    global chat_history, user_sessions
+    chat_history = []
+    user_sessions = {}
+    logger.info("✅ Simple storage initialized")
+    
+    # Serve immediately from the last persisted snapshot, if any
+    warmup_state["started_at"] = datetime.now().isoformat()
+    warmup_state["phase"] = "loading_snapshot"
+    if load_knowledge_snapshot():
+        warmup_state["knowledge_source"] = "snapshot"
+        warmup_state["phase"] = "complete"
+        warmup_state["completed_at"] = datetime.now().isoformat()
+    else:
+        warmup_state["phase"] = "waiting_for_crawler"
+    
+    # Crawling happens in a separate process; workers only pick up its snapshots
+    background_tasks = [asyncio.create_task(reload_knowledge_snapshots())]
+    if CRAWLER_MODE == "process":
+        logger.info("🕷️ Auto-scraping SRM websites in a crawler process...")
+        background_tasks.append(asyncio.create_task(supervise_crawler()))
     
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down SRM Guide Bot Backend...")
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
     logger.info("✅ Cleanup complete")
 
+# Crawl jobs started from the API: any worker queues them, the crawler process runs them
+CRAWL_JOBS_DIR = os.path.join(KNOWLEDGE_SNAPSHOT_DIR, "jobs")
+CRAWL_JOB_HISTORY = 50  # Finished jobs kept for status queries
+CRAWL_JOB_POLL_INTERVAL = 1  # Seconds between the crawler's checks for queued jobs
+SSE_POLL_INTERVAL = 0.5  # Seconds between checks for new job events
+TEST_SCRAPING_SOURCE = "test_scraping"
+TEST_SCRAPING_URL = "https://www.srmist.edu.in/admissions/"
+crawl_job_store = CrawlJobStore(CRAWL_JOBS_DIR, history=CRAWL_JOB_HISTORY)
+
+def crawl_job_page_reporter(job: Dict[str, Any]) -> Callable[[PageRecord], None]:
+    """``on_page`` callback recording every finished page of ``job`` as a progress event"""
+    def on_page(record: PageRecord):
+        if record.status == "error":
+            job["pages_failed"] += 1
+        else:
+            job["pages_done"] += 1
+        job["last_url"] = record.url
+        crawl_job_store.add_event(job, "page", {
+            "source_id": job["current_source"],
+            "url": record.url,
+            "status": record.status,
+            "depth": record.depth,
+            "pages_done": job["pages_done"],
+            "pages_failed": job["pages_failed"]
+        })
+    return on_page
+
+def start_crawl_job_source(job: Dict[str, Any], source_id: str):
+    """Record the source ``job`` is crawling now, so progress readers in other processes see it"""
+    job["current_source"] = source_id
+    crawl_job_store.save(job)
+
+def finish_crawl_job_source(job: Dict[str, Any], source_id: str, result: Dict[str, Any] = None):
+    """Record a crawled source of ``job`` and release its claim"""
+    job["results"][source_id] = result if result is not None else page_store.stats(source_id).to_dict()
+    crawl_job_store.release(job["id"], source_id)
+    crawl_job_store.add_event(job, "source_completed", {"source_id": source_id, "result": job["results"][source_id]})
+
+def finish_crawl_job(job: Dict[str, Any], error: str = None):
+    """Mark ``job`` completed, or failed with ``error``, and release the claims it still holds"""
+    job["status"] = "failed" if error else "completed"
+    job["error"] = error
+    job["current_source"] = None
+    job["finished_at"] = datetime.now().isoformat()
+    crawl_job_store.add_event(job, job["status"], crawl_job_summary(job))
+    for source_id in job["sources"]:
+        crawl_job_store.release(job["id"], source_id)
+
+def start_scheduled_crawl(kind: str) -> Dict[str, Any]:
+    """Claim the enabled sources for a warm-up or periodic crawl, as a job that is already running
+    
+    Sources a queued or running crawl job holds are left to that job, which
+    crawls and publishes them itself.
+    """
+    source_ids = [source_id for source_id, info in SCRAPING_SOURCES.items() if info["enabled"]]
+    job, already_running = crawl_job_store.start(source_ids, kind)
+    for source_id, job_id in already_running.items():
+        logger.info(f"⏭️ Skipping {SCRAPING_SOURCES[source_id]['name']}, crawl job {job_id} is crawling it")
+    crawl_job_store.add_event(job, "started", {"sources": job["sources"]})
+    return job
+
+def crawler_warmup_progress() -> Dict[str, Any]:
+    """Warm-up progress of the crawler process, read from its newest ``warmup`` crawl job (empty if none)"""
+    job = next((job for job in crawl_job_store.jobs() if job["kind"] == "warmup"), None)
+    if job is None:
+        return {}
+    return {
+        "phase": {"completed": "building", "failed": "failed"}.get(job["status"], "crawling"),
+        "sources_total": len(job["sources"]),
+        "sources_done": len(job["results"]),
+        "current_source": job["current_source"],
+        "crawl_job_id": job["id"],
+        "error": job["error"]
+    }
+
+def run_crawl_job(job: Dict[str, Any]):
+    """Crawl a job's sources in the crawler process, reporting every finished page as a progress event
+    
+    Sources crawled for real replace their pages like a periodic crawl, and
+    the result is published as the next snapshot for the web workers.
+    """
+    job["status"] = "running"
+    job["started_at"] = datetime.now().isoformat()
+    crawl_job_store.add_event(job, "started", {"sources": job["sources"]})
+    on_page = crawl_job_page_reporter(job)
+    
+    changed_pages = []
+    crawled_sources = False
+    error = None
+    try:
+        for source_id in job["sources"]:
+            start_crawl_job_source(job, source_id)
+            if source_id == TEST_SCRAPING_SOURCE:
+                logger.info("🧪 Testing scraping functionality...")
+                with crawl_lock:
+                    pages = scrape_website(TEST_SCRAPING_URL, "Test Admissions", depth=0, max_depth=1, max_pages=5, on_page=on_page)
+                finish_crawl_job_source(job, source_id, page_tree(pages))
+            else:
+                source_info = SCRAPING_SOURCES[source_id]
+                logger.info(f"Scraping {source_info['name']}...")
+                with crawl_lock:
+                    pages = scrape_website(source_info["url"], source_info["name"], changed_pages=changed_pages, source_id=source_id, on_page=on_page)
+                    replace_source_pages(source_id, pages, changed_pages)
+                crawled_sources = True
+                finish_crawl_job_source(job, source_id)
+        
+        if changed_pages:
+            build_knowledge_database()
+        elif crawled_sources:
+            publish_crawl_state()
+        logger.info(f"✅ Crawl job {job['id']} completed. Processed {len(job['results'])} sources.")
+    except Exception as e:
+        error = str(e)
+        logger.error(f"❌ Crawl job {job['id']} failed: {str(e)}")
+    finally:
+        finish_crawl_job(job, error)
+
+def run_crawl_jobs():
+    """Run queued crawl jobs one at a time until ``crawler_stop`` is set (crawler process thread)"""
+    while not crawler_stop.wait(CRAWL_JOB_POLL_INTERVAL):
+        try:
+            for job in crawl_job_store.queued():
+                if crawler_stop.is_set():
+                    break
+                run_crawl_job(job)
+        except Exception as e:
+            logger.error(f"❌ Crawl job queue failed: {str(e)}")
+
+def crawl_job_summary(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        **job,
+        "status_url": f"/api/scraping/jobs/{job['id']}",
+        "events_url": f"/api/scraping/jobs/{job['id']}/events"
+    }
+
+def crawl_job_response(job: Dict[str, Any], already_running: Dict[str, str]) -> JSONResponse:
+    """202 response for a submitted crawl; the crawler process picks new jobs up within a second"""
+    deduplicated = job["id"] in already_running.values()
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "success": True,
+            "message": f"Crawl job {job['id']} {'already running' if deduplicated else 'queued'} for {', '.join(job['sources'])}",
+            "job_id": job["id"],
+            "deduplicated": deduplicated,
+            "already_running": already_running,
+            "job": crawl_job_summary(job)
+        }
+    )
+
+# Listing endpoints (debug data, scraped pages, chat history)
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+GZIP_MINIMUM_SIZE = 1024  # Bytes; smaller responses are sent uncompressed
+UNCOMPRESSED_PATH_PATTERN = re.compile(r"^/api/scraping/jobs/[^/]+/events$")  # Server-sent event streams
+
+class StreamAwareGZipMiddleware:
+    """``GZipMiddleware`` that passes server-sent event streams through uncompressed
+    
+    The pinned Starlette's gzip responder buffers ``text/event-stream``
+    bodies inside the compressor, so clients would receive progress events
+    in bursts, or only when the job ends.
+    """
+    
+    def __init__(self, app, minimum_size: int = GZIP_MINIMUM_SIZE):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and UNCOMPRESSED_PATH_PATTERN.match(scope["path"]):
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip(scope, receive, send)
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """``fields=url,status`` query parameter -> field names, or None for every field"""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()] or None
+
+def project_fields(row: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    if fields is None:
+        return row
+    return {field: row[field] for field in fields if field in row}
+
+def paginate(rows: Iterable[Any], cursor: int, limit: int):
+    """Slice ``rows`` at ``cursor`` and return ``(page, next_cursor)``; next_cursor is None on the last page
+    
+    Cursors are positions in the listing, so a rebuild between two requests
+    can shift entries by the number added or removed.
+    """
+    cursor = max(cursor, 0)
+    page = list(itertools.islice(rows, cursor, cursor + limit + 1))
+    if len(page) > limit:
+        return page[:limit], cursor + limit
+    return page, None
+
+def listing_response(rows: Iterable[Dict[str, Any]], body: Dict[str, Any], key: str, cursor: int, limit: Optional[int], format: str):
+    """Paginated JSON body with ``rows`` under ``key``, or every row from ``cursor`` streamed as NDJSON
+    
+    NDJSON responses are produced row by row while the client reads, so
+    exporting a large listing never holds the whole body in memory.
+    """
+    cursor = max(cursor, 0)
+    if format == "ndjson":
+        # No upper bound: streaming is how large listings are exported, but a limit is at least 1 as in JSON
+        rows = itertools.islice(rows, cursor, None if limit is None else cursor + max(1, limit))
+        
+        def lines():
+            for row in rows:
+                yield json.dumps(row, ensure_ascii=False, default=str) + "\n"
+        
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    
+    limit = max(1, min(limit or DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT))
+    page, next_cursor = paginate(rows, cursor, limit)
+    return {**body, key: page, "cursor": cursor, "limit": limit, "next_cursor": next_cursor}
+
+def page_rows(pages: Iterable[PageRecord], fields: Optional[List[str]]):
+    """Flat page records as response rows, loading content only when it is requested"""
+    include_content = fields is None or "content" in fields
+    for page in pages:
+        row = {"source_id": page.source_id, "parent_url": page.parent_url, **page.to_dict(include_content)}
+        yield project_fields(row, fields)
+
 def create_application() -> FastAPI:
     """Create and configure FastAPI application"""
     
@@ -261,6 +1014,9 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
     
+    # Compress large JSON and NDJSON bodies for clients that accept gzip; event streams stay uncompressed
+    app.add_middleware(StreamAwareGZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+    
     # Health check endpoint
     @app.get("/health", tags=["Health"])
     async def health_check():
@@ -273,6 +1029,33 @@ def create_application() -> FastAPI:
             "features": ["chat", "ai_training", "analytics", "user_management"]
         }
     
+    @app.get("/health/live", tags=["Health"])
+    async def liveness_check():
+        """Liveness probe - the process is up and serving requests"""
+        return {"status": "alive"}
+    
+    @app.get("/health/ready", tags=["Health"])
+    async def readiness_check():
+        """Readiness probe - knowledge is loaded from a snapshot or a finished warm-up crawl
+        
+        Until then, warm-up progress is that of the crawler process's warm-up crawl.
+        """
+        ready = warmup_state["knowledge_source"] is not None
+        warmup = warmup_state
+        if not ready:
+            warmup = {**warmup_state, **await asyncio.to_thread(crawler_warmup_progress)}
+        return JSONResponse(
+            status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={
+                "status": "ready" if ready else "warming_up",
+                "warmup": warmup,
+                "knowledge_items": sum(len(items) for items in KNOWLEDGE_DATABASE.values()),
+                "knowledge_version": knowledge_version,
+                "crawler": crawler_state,
+                "last_database_update": last_database_update
+            }
+        )
+    
     # Root endpoint
     @app.get("/", tags=["Root"])
     async def root():
@@ -283,6 +1066,8 @@ def create_application() -> FastAPI:
             "description": "Intelligent AI Assistant for SRM University with Full Features",
             "docs": "/api/docs",
             "health": "/health",
+            "liveness": "/health/live",
+            "readiness": "/health/ready",
                             "endpoints": [
                     "/api/chat",
                     "/api/ai-training",
@@ -291,6 +1076,7 @@ def create_application() -> FastAPI:
                     "/api/users",
                     "/api/scraping/start",
                     "/api/scraping/status",
+                    "/api/scraping/jobs/{job_id}",
                     "/api/scraping/data/{source_id}",
                     "/api/scraping/source/{source_id}"
                 ]
@@ -356,48 +1142,65 @@ def create_application() -> FastAPI:
     
     # Debug endpoint to see all chat history
     @app.get("/api/debug/chat-history", tags=["Debug"])
-    async def debug_chat_history():
-        """Debug endpoint to see all chat history"""
-        return {
+    async def debug_chat_history(cursor: int = 0, limit: Optional[int] = None, fields: Optional[str] = None, format: str = "json"):
+        """Debug endpoint to page through all chat history (``format=ndjson`` streams it)"""
+        selected = parse_fields(fields)
+        rows = (project_fields(entry, selected) for entry in list(chat_history))
+        return listing_response(rows, {
             "success": True,
             "total_entries": len(chat_history),
-            "all_entries": chat_history,
             "message_types": {
                 "user": len([msg for msg in chat_history if msg["type"] == "user"]),
                 "assistant": len([msg for msg in chat_history if msg["type"] == "assistant"])
             }
-        }
+        }, "all_entries", cursor, limit, format)
     
     @app.get("/api/debug/scraped-data", tags=["Debug"])
-    async def debug_scraped_data():
-        """Debug endpoint to see all scraped data"""
-        return {
+    async def debug_scraped_data(source_id: Optional[str] = None, cursor: int = 0, limit: Optional[int] = None, fields: Optional[str] = None, format: str = "json"):
+        """Debug endpoint to page through scraped pages of every source (or ``source_id``)
+        
+        ``fields`` limits each page to the listed fields (e.g. ``url,status``);
+        ``format=ndjson`` streams every page instead of one page of results.
+        """
+        pages = page_store  # One table for the whole response, even if a reload swaps it
+        stats = pages.stats(source_id) if source_id else None
+        rows = page_rows(pages.pages(source_id), parse_fields(fields))
+        return listing_response(rows, {
             "success": True,
-            "total_sources": len(scraped_data),
-            "scraped_data": scraped_data,
+            "total_sources": len(pages),
+            "total_pages": pages.page_count if not source_id else (stats.pages if stats else 0),
             "summary": get_scraped_data_summary()
-        }
+        }, "pages", cursor, limit, format)
     
     @app.get("/api/debug/knowledge-database", tags=["Debug"])
-    async def debug_knowledge_database():
-        """Debug endpoint to see the knowledge database"""
-        return {
+    async def debug_knowledge_database(category: Optional[str] = None, cursor: int = 0, limit: Optional[int] = None, fields: Optional[str] = None, format: str = "json"):
+        """Debug endpoint to page through knowledge items, optionally of one ``category``"""
+        knowledge = KNOWLEDGE_DATABASE
+        selected = parse_fields(fields)
+        rows = (
+            project_fields({"category": name, "position": position, "text": text}, selected)
+            for name, items in knowledge.items() if category in (None, name)
+            for position, text in enumerate(items)
+        )
+        return listing_response(rows, {
             "success": True,
+            "version": knowledge_version,
             "last_updated": last_database_update,
-            "total_items": sum(len(items) for items in KNOWLEDGE_DATABASE.values()),
-            "database": KNOWLEDGE_DATABASE,
-            "summary": {cat: len(items) for cat, items in KNOWLEDGE_DATABASE.items()}
-        }
+            "total_items": sum(len(items) for items in knowledge.values()),
+            "summary": {cat: len(items) for cat, items in knowledge.items()}
+        }, "items", cursor, limit, format)
     
     @app.post("/api/rebuild-database", tags=["Debug"])
     async def rebuild_knowledge_database():
         """Manually rebuild the knowledge database"""
         try:
             logger.info("🔄 Manually rebuilding knowledge database...")
-            build_knowledge_database()
+            # Off the event loop; a build that is already running is waited for, since it covers this request
+            ran_build = await asyncio.to_thread(build_knowledge_database, True)
             return {
                 "success": True,
-                "message": "Knowledge database rebuilt successfully",
+                "message": "Knowledge database rebuilt successfully" if ran_build else "Knowledge database rebuilt by the build that was already running",
+                "coalesced": not ran_build,
                 "total_items": sum(len(items) for items in KNOWLEDGE_DATABASE.values()),
                 "last_updated": last_database_update
             }
@@ -413,20 +1216,10 @@ def create_application() -> FastAPI:
     
     @app.post("/api/test-scraping", tags=["Debug"])
     async def test_scraping():
-        """Test endpoint to manually trigger scraping and see results"""
+        """Test endpoint to queue a small crawl; poll the returned job to see its results"""
         try:
-            logger.info("🧪 Testing scraping functionality...")
-            
-            # Test with a simple URL first
-            test_url = "https://www.srmist.edu.in/admissions/"
-            test_result = scrape_website(test_url, "Test Admissions", depth=0, max_depth=1, max_pages=5)
-            
-            return {
-                "success": True,
-                "test_url": test_url,
-                "result": test_result,
-                "message": "Test scraping completed"
-            }
+            job, already_running = await asyncio.to_thread(crawl_job_store.submit, [TEST_SCRAPING_SOURCE], "test")
+            return crawl_job_response(job, already_running)
             
         except Exception as e:
             logger.error(f"❌ Test scraping failed: {str(e)}")
@@ -460,7 +1253,7 @@ def create_application() -> FastAPI:
                 "message": f"AI model trained successfully with {current_scraped_data.get('scraped_data_count', 0)} scraped sources",
                 "training_data_summary": {
                     "user_provided_data": len(data),
-                    "scraped_data_sources": list(scraped_data.keys()),
+                    "scraped_data_sources": page_store.sources(),
                     "last_scraped": current_scraped_data.get("last_updated", "Never")
                 }
             }
@@ -554,26 +1347,12 @@ def create_application() -> FastAPI:
     # Web Scraping endpoints
     @app.post("/api/scraping/start", tags=["Scraping"])
     async def start_scraping():
-        """Start scraping all enabled sources"""
+        """Queue a crawl of all enabled sources and return its job id immediately"""
         try:
             logger.info("🚀 Starting web scraping process...")
-            
-            scraping_results = {}
-            for source_id, source_info in SCRAPING_SOURCES.items():
-                if source_info["enabled"]:
-                    logger.info(f"Scraping {source_info['name']}...")
-                    result = scrape_website(source_info["url"], source_info["name"])
-                    scraped_data[source_id] = result
-                    scraping_results[source_id] = result
-            
-            logger.info(f"✅ Scraping completed. Processed {len(scraping_results)} sources.")
-            
-            return {
-                "success": True,
-                "message": f"Scraping completed successfully. Processed {len(scraping_results)} sources.",
-                "results": scraping_results,
-                "summary": get_scraped_data_summary()
-            }
+            source_ids = [source_id for source_id, source_info in SCRAPING_SOURCES.items() if source_info["enabled"]]
+            job, already_running = await asyncio.to_thread(crawl_job_store.submit, source_ids)
+            return crawl_job_response(job, already_running)
             
         except Exception as e:
             logger.error(f"Scraping error: {str(e)}")
@@ -585,6 +1364,71 @@ def create_application() -> FastAPI:
                 }
             )
 
+    @app.get("/api/scraping/jobs", tags=["Scraping"])
+    async def list_crawl_jobs():
+        """Recent and running crawl jobs, newest first"""
+        jobs = [crawl_job_summary(job) for job in await asyncio.to_thread(crawl_job_store.jobs)]
+        return {
+            "success": True,
+            "total_jobs": len(jobs),
+            "active_sources": await asyncio.to_thread(crawl_job_store.active_sources),
+            "jobs": jobs
+        }
+
+    @app.get("/api/scraping/jobs/{job_id}", tags=["Scraping"])
+    async def get_crawl_job(job_id: str):
+        """Progress and results of a crawl job"""
+        job = crawl_job_store.get(job_id)
+        if job is None:
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content={
+                    "error": True,
+                    "message": f"Crawl job '{job_id}' not found"
+                }
+            )
+        return {"success": True, "job": crawl_job_summary(job)}
+
+    @app.get("/api/scraping/jobs/{job_id}/events", tags=["Scraping"])
+    async def stream_crawl_job_events(job_id: str, request: Request):
+        """Server-sent events with per-page progress, ending with a ``completed`` or ``failed`` event
+        
+        Reconnecting clients resume after the ``Last-Event-ID`` they send.
+        """
+        job = crawl_job_store.get(job_id)
+        if job is None:
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content={
+                    "error": True,
+                    "message": f"Crawl job '{job_id}' not found"
+                }
+            )
+        
+        try:
+            last_seq = int(request.headers.get("last-event-id", 0))
+        except ValueError:
+            last_seq = 0
+        
+        async def events():
+            nonlocal last_seq
+            offset = 0
+            while True:
+                # The crawler process appends the events; tail its file from where the last read stopped
+                new_events, offset = crawl_job_store.read_events(job_id, offset)
+                for event in new_events:
+                    if event["seq"] <= last_seq:
+                        continue
+                    last_seq = event["seq"]
+                    yield f"id: {event['seq']}\nevent: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+                    if event["event"] in CRAWL_JOB_FINAL_STATES:
+                        return
+                if crawl_job_store.get(job_id) is None or await request.is_disconnected():
+                    return
+                await asyncio.sleep(SSE_POLL_INTERVAL)
+        
+        return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
     @app.get("/api/scraping/status", tags=["Scraping"])
     async def get_scraping_status():
         """Get current scraping status and data summary"""
@@ -592,12 +1436,15 @@ def create_application() -> FastAPI:
             "success": True,
             "status": "ready",
             "summary": get_scraped_data_summary(),
+            # Crawls run in the crawler process; its state arrives with the snapshot published after every crawl
+            **published_crawl_status,
+            "crawler": crawler_state,
             "sources": SCRAPING_SOURCES
         }
 
     @app.get("/api/scraping/data/{source_id}", tags=["Scraping"])
-    async def get_scraped_data(source_id: str):
-        """Get scraped data for a specific source"""
+    async def get_scraped_data(source_id: str, cursor: int = 0, limit: Optional[int] = None, fields: Optional[str] = None, format: str = "json"):
+        """Page through the scraped pages of a specific source"""
         if source_id not in SCRAPING_SOURCES:
             return JSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -607,16 +1454,18 @@ def create_application() -> FastAPI:
                 }
             )
         
-        source_data = scraped_data.get(source_id, {})
-        return {
+        pages = page_store
+        stats = pages.stats(source_id)
+        rows = page_rows(pages.pages(source_id), parse_fields(fields))
+        return listing_response(rows, {
             "success": True,
             "source": SCRAPING_SOURCES[source_id],
-            "data": source_data
-        }
+            "summary": stats.to_dict() if stats else None
+        }, "data", cursor, limit, format)
 
     @app.post("/api/scraping/source/{source_id}", tags=["Scraping"])
     async def scrape_specific_source(source_id: str):
-        """Scrape a specific source"""
+        """Queue a crawl of a specific source and return its job id immediately"""
         if source_id not in SCRAPING_SOURCES:
             return JSONResponse(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -638,14 +1487,8 @@ def create_application() -> FastAPI:
         
         try:
             logger.info(f"Scraping specific source: {source_info['name']}")
-            result = scrape_website(source_info["url"], source_info["name"])
-            scraped_data[source_id] = result
-            
-            return {
-                "success": True,
-                "message": f"Successfully scraped {source_info['name']}",
-                "result": result
-            }
+            job, already_running = await asyncio.to_thread(crawl_job_store.submit, [source_id])
+            return crawl_job_response(job, already_running)
             
         except Exception as e:
             logger.error(f"Scraping error for {source_id}: {str(e)}")
@@ -662,7 +1505,7 @@ def create_application() -> FastAPI:
     async def enhance_ai_knowledge():
         """Enhance AI knowledge with latest scraped data"""
         try:
-            if not scraped_data:
+            if not page_store:
                 return JSONResponse(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     content={
@@ -675,26 +1518,18 @@ def create_application() -> FastAPI:
             enhancement_results = {}
             total_items = 0
             
-            for source_id, source_data in scraped_data.items():
-                if source_data.get("status") == "success":
-                    content = source_data.get("content", {})
-                    items_processed = 0
-                    
-                    # Count processed items
-                    if "main_content" in content:
-                        items_processed += len(content["main_content"])
-                    if "admission_info" in content:
-                        items_processed += len(content["admission_info"])
-                    if "navigation" in content:
-                        items_processed += len(content["navigation"])
-                    
+            for source_id in page_store.sources():
+                stats = page_store.stats(source_id)
+                if stats.status == "success":
+                    root = page_store.root(source_id)
                     enhancement_results[source_id] = {
-                        "source_name": source_data.get("source", "Unknown"),
-                        "items_processed": items_processed,
-                        "content_types": list(content.keys()),
-                        "last_updated": source_data.get("timestamp", "Unknown")
+                        "source_name": root.source if root else source_id,
+                        "items_processed": stats.items,
+                        "pages_processed": stats.successful,
+                        "content_types": list(root.content.keys()) if root else [],
+                        "last_updated": stats.last_scraped
                     }
-                    total_items += items_processed
+                    total_items += stats.items
             
             logger.info(f"🧠 AI knowledge enhanced with {total_items} items from {len(enhancement_results)} sources")
             
@@ -839,307 +1674,888 @@ def generate_ai_response(message: str, user_id: str) -> str:
         else:
             return f"I understand you're asking about \"{message}\". As your SRM assistant, I'm here to help with:\n\n• 🎓 **Admissions & Applications**\n• 📚 **Academic Programs & Courses**\n• 🏠 **Campus Life & Facilities**\n• 💼 **Placements & Career Services**\n• 🎪 **Events & Student Activities**\n• 💰 **Fees & Scholarships**\n• 📍 **Campus Information**\n\nCould you be more specific about what aspect of SRM you'd like to know about? I'm also happy to help with any general questions!"
 
-def scrape_website(url: str, source_name: str, depth: int = 0, max_depth: int = 3, max_pages: int = 50, visited_urls: set = None) -> Dict[str, Any]:
-    """Deep scrape website content and extract relevant information from all linked pages"""
+def score_url(url: str, anchor_text: str = "", depth: int = 0, parent_yield: int = 0) -> float:
+    """Score a URL for the crawl frontier - higher scores are fetched first"""
+    path = urlparse(url).path.lower()
+    anchor = anchor_text.lower()
+    
+    score = 0.0
+    for keyword, weight in PRIORITY_KEYWORDS.items():
+        if keyword in path:
+            score += weight
+        if keyword in anchor:
+            score += weight * 0.5
+    
+    # Pages that produced useful knowledge before (or whose parent did) are worth refreshing first
+    known_yield = page_yield.get(url)
+    if known_yield is None:
+        known_yield = parent_yield / 2
+    score += math.log1p(known_yield)
+    
+    # Prefer shallow pages when everything else is equal
+    score -= depth * 0.5
+    return score
+
+def count_useful_items(content: Dict[str, Any]) -> int:
+    """Count the knowledge items a parsed page contributes"""
+    useful = sum(
+        1 for item in content.get("main_content", [])
+        if 20 <= len(item.get("text", "")) <= 500
+    )
+    for content_type in ["admission_info", "course_info", "research_info", "specific_admission"]:
+        useful += len(content.get(content_type, []))
+    return useful
+
+def scrape_website(url: str, source_name: str, depth: int = 0, max_depth: int = 3, max_pages: int = 50, visited_urls: set = None, changed_pages: List[str] = None, time_budget: float = None, source_id: str = None, on_page: Callable[[PageRecord], None] = None) -> List[PageRecord]:
+    """Crawl a source best-first and extract relevant information from linked pages
+    
+    The frontier is seeded from the host's sitemaps; URLs are checked against
+    robots.txt once, when they are queued. Links are pushed onto it scored by ``score_url`` so the
+    most valuable pages are fetched first; the crawl stops once ``max_pages``
+    pages have been fetched or ``time_budget`` seconds have elapsed. Pages are
+    fetched concurrently, limited per host by ``HostPolicy``. URLs whose
+    content actually changed since the previous crawl are appended to
+    ``changed_pages``. ``on_page`` is called with each page as it completes.
+    Returns the crawled pages as flat ``PageRecord``s in fetch order, starting
+    with ``url`` itself (empty if it was never fetched).
+    """
     if visited_urls is None:
         visited_urls = set()
     
+    started = time.monotonic()
+    counter = itertools.count()
+    frontier = []
+    records = {}
+    in_flight = {}
+    skipped_urls = 0
+    disallowed_urls = set()  # Kept apart from visited_urls: they are never fetched, so they use no page budget
+    
+    def enqueue(score, page_url, page_depth, parent_url):
+        if page_url in visited_urls or page_url in disallowed_urls:
+            return False
+        if not is_allowed_by_robots(page_url):
+            disallowed_urls.add(page_url)
+            return False
+        heapq.heappush(frontier, (-score, next(counter), page_url, page_depth, parent_url))
+        return True
+    
+    enqueue(0.0, url, depth, None)
+    
+    def fetch_page(policy, page_url, page_name, page_depth, parent_url):
+        try:
+            return crawl_page(page_url, page_name, page_depth, changed_pages, source_id, parent_url)
+        finally:
+            policy.release()
+    
+    with ThreadPoolExecutor(max_workers=CRAWLER_MAX_WORKERS) as pool:
+        while frontier or in_flight:
+            out_of_budget = len(visited_urls) >= max_pages or bool(time_budget and time.monotonic() - started >= time_budget)
+            
+            # Dispatch the best URLs until one's host has no capacity left
+            while frontier and not out_of_budget and len(in_flight) < CRAWLER_MAX_WORKERS:
+                item = heapq.heappop(frontier)
+                _, _, page_url, page_depth, parent_url = item
+                if page_url in visited_urls:
+                    continue
+                policy = get_host_policy(page_url)
+                if not policy.try_acquire():
+                    if policy.circuit_state() == "open":
+                        # Host is paused; leave its pages for the next crawl instead of waiting
+                        skipped_urls += 1
+                        continue
+                    heapq.heappush(frontier, item)
+                    break
+                visited_urls.add(page_url)
+                page_name = source_name if parent_url is None else f"{source_name} - Sub-page"
+                future = pool.submit(fetch_page, policy, page_url, page_name, page_depth, parent_url)
+                in_flight[future] = (page_url, page_depth, parent_url)
+                out_of_budget = len(visited_urls) >= max_pages
+            
+            if not in_flight:
+                if out_of_budget or not frontier:
+                    break
+                # Every remaining host is saturated or paused
+                time.sleep(0.2)
+                continue
+            
+            done, _ = wait(in_flight, timeout=1, return_when=FIRST_COMPLETED)
+            for future in done:
+                page_url, page_depth, parent_url = in_flight.pop(future)
+                record, links, anchors = future.result()
+                records[page_url] = record
+                if on_page:
+                    on_page(record)
+                
+                if record.status != "success":
+                    continue
+                
+                if parent_url is None:
+                    # Seed the frontier with this source's sitemap URLs, freshest first
+                    seeded = 0
+                    for sitemap_url, lastmod in get_site_info(page_url)["sitemap_urls"].items():
+                        if not sitemap_url.startswith(page_url) or not is_valid_srm_page(sitemap_url):
+                            continue
+                        score = score_url(sitemap_url, "", page_depth + 1) + sitemap_freshness_bonus(sitemap_url, lastmod)
+                        seeded += enqueue(score, sitemap_url, page_depth + 1, page_url)
+                    if seeded:
+                        logger.info(f"🗺️ Seeded {seeded} sitemap URLs for {source_name}")
+                
+                if page_depth >= max_depth:
+                    continue
+                
+                parent_yield = page_yield.get(page_url, 0)
+                for link_url in links:
+                    if link_url in visited_urls:
+                        continue
+                    if is_pdf_link(link_url):
+                        queue_pdf(link_url, source_name)
+                        continue
+                    if not is_valid_srm_page(link_url):
+                        continue
+                    score = score_url(link_url, anchors.get(link_url, ""), page_depth + 1, parent_yield)
+                    enqueue(score, link_url, page_depth + 1, page_url)
+    
     if len(visited_urls) >= max_pages:
-        logger.info(f"🛑 Stopping scraping at max pages {len(visited_urls)} (limit: {max_pages})")
+        logger.info(f"🛑 Stopped {source_name} at page budget {len(visited_urls)} (limit: {max_pages})")
+    elif time_budget and time.monotonic() - started >= time_budget:
+        logger.info(f"⏱️ Stopped {source_name} at time budget {time_budget}s with {len(frontier)} URLs left in frontier")
+    if skipped_urls:
+        logger.warning(f"🚧 Skipped {skipped_urls} URLs of {source_name} on paused hosts")
+    if disallowed_urls:
+        logger.info(f"🤖 Skipped {len(disallowed_urls)} URLs of {source_name} disallowed by robots.txt")
+    if records:
+        logger.info(f"✅ Successfully scraped {source_name}: {len(records)} pages in {time.monotonic() - started:.1f}s")
+    return list(records.values())
+
+def fetch_url(url: str, headers: Dict[str, str]) -> requests.Response:
+    """GET a URL under its host policy, retrying transient failures with jittered backoff
+    
+    The response is streamed: only headers have been read when it is returned,
+    so callers must read the body with ``read_limited_body`` (or close it).
+    """
+    policy = get_host_policy(url)
+    
+    for attempt in range(CRAWLER_MAX_RETRIES + 1):
+        if attempt:
+            with policy.lock:
+                policy.retries += 1
+            time.sleep(random.uniform(0, CRAWLER_BACKOFF_BASE * (2 ** attempt)))
+        
+        policy.wait_for_token()
+        started = time.monotonic()
+        try:
+            response = requests.get(url, headers=headers, timeout=CRAWLER_TIMEOUT, stream=True)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            policy.record_failure(time.monotonic() - started)
+            if attempt == CRAWLER_MAX_RETRIES or policy.circuit_state() == "open":
+                raise
+            continue
+        
+        latency = time.monotonic() - started
+        if response.status_code in CRAWLER_RETRYABLE_STATUS:
+            policy.record_failure(latency)
+            if attempt == CRAWLER_MAX_RETRIES or policy.circuit_state() == "open":
+                return response
+            response.close()
+            continue
+        
+        policy.record_success(latency)
+        return response
+
+def read_limited_body(response: requests.Response, max_bytes: int) -> bytes:
+    """Read a streamed response body, aborting as soon as it exceeds ``max_bytes``"""
+    declared = response.headers.get('Content-Length', '')
+    if declared.isdigit() and int(declared) > max_bytes:
+        response.close()
+        raise ValueError(f"Response too large ({declared} bytes, limit {max_bytes})")
+    
+    chunks = []
+    size = 0
+    try:
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            size += len(chunk)
+            if size > max_bytes:
+                raise ValueError(f"Response exceeded {max_bytes} bytes")
+            chunks.append(chunk)
+    finally:
+        response.close()
+        get_host_policy(response.url or "").record_bytes(size)
+    return b"".join(chunks)
+
+def get_content_type(response: requests.Response) -> str:
+    """Media type of a response without parameters, e.g. ``text/html``"""
+    return response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+
+def build_request_headers(url: str) -> Dict[str, str]:
+    """Browser-like headers plus conditional GET validators from the previous fetch of ``url``"""
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    }
+    fingerprint = page_fingerprints.get(url)
+    if fingerprint:
+        if fingerprint.get("etag"):
+            headers['If-None-Match'] = fingerprint["etag"]
+        if fingerprint.get("last_modified"):
+            headers['If-Modified-Since'] = fingerprint["last_modified"]
+    return headers
+
+def store_page_body(body: bytes, content_hash: str) -> Optional[str]:
+    """Keep a fetched body in ``page_bodies``; returns its hash, or None when it is not kept"""
+    if page_bodies is None or not body:
         return None
-    
-    if url in visited_urls:
-        logger.info(f"🔄 Already visited: {url}")
+    try:
+        return page_bodies.put(body, content_hash)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not store raw page body {content_hash}: {str(e)}")
         return None
+
+def prune_page_bodies():
+    """Delete stored bodies that no published page or recrawl fingerprint refers to"""
+    if page_bodies is None:
+        return
+    referenced = {record.body_hash for record in page_store.pages() if record.body_hash}
+    referenced.update(fingerprint["body_hash"] for fingerprint in list(page_fingerprints.values()) if fingerprint.get("body_hash"))
+    removed = page_bodies.prune(referenced)
+    if removed:
+        logger.info(f"🧹 Removed {removed} unreferenced raw page bodies")
+
+def replace_source_pages(source_id: str, pages: Iterable[PageRecord], changed_pages: List[str] = None):
+    """Install a crawl of one source, adding pages that appeared, disappeared or changed status to ``changed_pages``
+    
+    ``crawl_page`` only reports new content; a page that is gone, now fails or
+    was not reached last time changes the knowledge database just as well.
+    """
+    changes = page_store.replace_source(source_id, pages)
+    if changed_pages is not None:
+        known = set(changed_pages)
+        changed_pages.extend(url for url in changes if url not in known)
+
+def fingerprint_rows() -> Dict[str, Dict[str, Any]]:
+    """Recrawl fingerprints to persist with the page table, without the content their pages already hold"""
+    if not crawler_process:
+        # Carry the crawler's published fingerprints over unchanged
+        return (current_snapshot.page_group(FINGERPRINT_GROUP) if current_snapshot is not None else None) or {}
+    rows = {}
+    for url, fingerprint in list(page_fingerprints.items()):
+        row = {key: value for key, value in fingerprint.items() if key != "content"}
+        row["fetched_at"] = fingerprint["fetched_at"].isoformat() if fingerprint.get("fetched_at") else None
+        rows[url] = row
+    return rows
+
+def restore_crawl_state():
+    """Rebuild recrawl fingerprints and extracted PDFs from the loaded snapshot
     
+    Called once when the crawler process starts, so its first crawl still
+    sends conditional requests and skips unchanged pages.
+    """
+    if current_snapshot is None:
+        return
+    try:
+        rows = current_snapshot.page_group(FINGERPRINT_GROUP) or {}
+    except Exception as e:
+        logger.warning(f"⚠️ Could not restore page fingerprints: {str(e)}")
+        return
+    records = {record.url: record for record in page_store.pages()}
+    for url, row in rows.items():
+        record = records.get(url)
+        if record is None or record.status != "success" or not record.content:
+            continue  # Without its parsed content an unchanged page could not be reused
+        fingerprint = dict(row, content=record.content)
+        fingerprint["fetched_at"] = datetime.fromisoformat(row["fetched_at"]) if row.get("fetched_at") else None
+        page_fingerprints[url] = fingerprint
+    pdf_records.update((record.url, record) for record in page_store.pages("pdf_documents"))
+    logger.info(f"♻️ Restored {len(page_fingerprints)} page fingerprints from snapshot v{current_snapshot.build_version}")
+
+def crawl_page(url: str, source_name: str, depth: int = 0, changed_pages: List[str] = None, source_id: str = None, parent_url: str = None):
+    """Fetch and parse a single page, returning its ``PageRecord``, outgoing links and their anchor texts"""
     try:
         logger.info(f"🕷️ Scraping {source_name} (depth {depth}): {url}")
-        visited_urls.add(url)
         
-        # Set headers to mimic a real browser
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+        # Conditional GET: reuse validators from the previous crawl of this URL
+        fingerprint = page_fingerprints.get(url)
+        headers = build_request_headers(url)
         
-        # Make the request
-        response = requests.get(url, headers=headers, timeout=15)
+        # Make the request (streamed - only headers are read here)
+        response = fetch_url(url, headers)
+        if response.status_code >= 400:
+            response.close()
         response.raise_for_status()
         
-        # Parse HTML content
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Extract different types of content based on source
         scraped_info = {
+            "source_id": source_id or source_name,
             "source": source_name,
             "url": url,
+            "parent_url": parent_url,
             "depth": depth,
             "timestamp": datetime.now().isoformat(),
             "status": "success",
-            "content": {},
-            "sub_pages": []
+            "content": {}
         }
         
-        # Extract page title
-        scraped_info["content"]["title"] = soup.find('title').text.strip() if soup.find('title') else "No title found"
+        # Abort non-HTML responses before downloading their bodies
+        content_type = get_content_type(response)
+        if response.status_code != 304 and content_type and content_type not in HTML_CONTENT_TYPES:
+            response.close()
+            if content_type == "application/pdf":
+                queue_pdf(url, source_name)
+            logger.info(f"⏭️ Skipping non-HTML content ({content_type}): {url}")
+            scraped_info.update({"status": "skipped", "reason": f"content-type {content_type}"})
+            return PageRecord(**scraped_info), [], {}
         
-        # Extract main content text
-        main_content = []
-        for tag in soup.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'])[:30]:  # Increased to 30 elements
-            if tag.text.strip():
-                main_content.append({
-                    "type": tag.name,
-                    "text": tag.text.strip()
-                })
-        scraped_info["content"]["main_content"] = main_content
+        content_hash = None
+        body = b""
+        if response.status_code != 304:
+            body = read_limited_body(response, MAX_PAGE_BYTES)
+            content_hash = hashlib.sha256(body).hexdigest()
+        else:
+            response.close()
         
-        # Extract navigation links
-        nav_links = []
-        for link in soup.find_all('a', href=True)[:15]:  # Increased to 15 links
-            if link.text.strip():
-                nav_links.append({
-                    "text": link.text.strip(),
-                    "url": link.get('href')
-                })
-        scraped_info["content"]["navigation"] = nav_links
+        if fingerprint and (response.status_code == 304 or content_hash == fingerprint["content_hash"]):
+            # Page is unchanged since the last crawl - skip parsing entirely
+            logger.info(f"♻️ Unchanged since last crawl ({'304' if response.status_code == 304 else 'same hash'}): {url}")
+            scraped_info["content"] = fingerprint["content"]
+            scraped_info["unchanged"] = True
+            scraped_info["body_hash"] = fingerprint.get("body_hash")
+            discovered_links = fingerprint["links"]
+            anchors = fingerprint["anchors"]
+            fingerprint["etag"] = response.headers.get('ETag', fingerprint.get("etag"))
+            fingerprint["last_modified"] = response.headers.get('Last-Modified', fingerprint.get("last_modified"))
+            fingerprint["fetched_at"] = datetime.now(timezone.utc)
+        else:
+            # Parse HTML content
+            soup = BeautifulSoup(body, 'html.parser')
+            scraped_info["content"] = extract_page_content(url, soup)
+            scraped_info["body_hash"] = store_page_body(body, content_hash)
+            anchors = {}
+            discovered_links = discover_links(url, soup, max_links=100, anchor_texts=anchors)  # Increased to 100 links
+            page_yield[url] = count_useful_items(scraped_info["content"])
+            
+            page_fingerprints[url] = {
+                "etag": response.headers.get('ETag'),
+                "last_modified": response.headers.get('Last-Modified'),
+                "content_hash": content_hash,
+                "body_hash": scraped_info["body_hash"],
+                "content": scraped_info["content"],
+                "links": discovered_links,
+                "anchors": anchors,
+                "fetched_at": datetime.now(timezone.utc)
+            }
+            if changed_pages is not None:
+                changed_pages.append(url)
         
-        # Extract images with alt text
-        images = []
-        for img in soup.find_all('img')[:8]:  # Increased to 8 images
-            if img.get('alt'):
-                images.append({
-                    "alt": img.get('alt'),
-                    "src": img.get('src')
-                })
-        scraped_info["content"]["images"] = images
+        logger.info(f"🔍 Found {len(discovered_links)} potential links to follow")
+        return PageRecord(**scraped_info), discovered_links, anchors
         
-        # Extract specific content based on source type
-        if "admissions" in url.lower():
-            # Look for admission forms, deadlines, etc.
-            admission_info = []
-            for tag in soup.find_all(['p', 'div', 'span', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                text = tag.text.strip()
-                # Skip navigation/menu items
-                if any(skip in text.lower() for skip in ['menu', 'students', 'faculty', 'staff', 'parents', 'visitors', 'alumni', 'examinations', 'campuses']):
-                    continue
-                
-                if any(keyword in text.lower() for keyword in ['admission', 'apply', 'deadline', 'form', 'requirement', 'enrollment', 'entrance', 'exam', 'cutoff', 'merit', 'eligibility', 'procedure', 'process', 'date', 'last date', 'application', '2025', '2024', 'btech', 'mtech', 'phd', 'engineering', 'medical', 'management']):
-                    if len(text) > 20 and len(text) < 300:  # Better filtering
-                        # Clean up the text
-                        clean_text = ' '.join(text.split())  # Remove extra whitespace
-                        if clean_text not in admission_info:  # Avoid duplicates
-                            admission_info.append(clean_text)
+    except Exception as e:
+        logger.error(f"❌ Failed to scrape {source_name}: {str(e)}")
+        return PageRecord(
+            source_id=source_id or source_name,
+            source=source_name,
+            url=url,
+            parent_url=parent_url,
+            depth=depth,
+            timestamp=datetime.now().isoformat(),
+            status="error",
+            error=str(e)
+        ), [], {}
+
+def is_pdf_link(url: str) -> bool:
+    return urlparse(url).path.lower().endswith('.pdf')
+
+def queue_pdf(url: str, source_name: str):
+    """Queue a PDF for low-priority text extraction after the HTML crawl"""
+    if PdfReader is None or url in pdf_queue:
+        return
+    if not any(domain in url.lower() for domain in ['srmist.edu.in', 'srmuniversity.ac.in']):
+        return
+    pdf_queue[url] = source_name
+
+def extract_pdf_content(url: str, body: bytes) -> Dict[str, Any]:
+    """Extract a title and paragraph-sized text snippets from a PDF"""
+    reader = PdfReader(io.BytesIO(body))
+    
+    texts = []
+    for page in reader.pages[:PDF_MAX_PAGES]:
+        for paragraph in re.split(r'\n\s*\n', page.extract_text() or ""):
+            clean_text = ' '.join(paragraph.split())
+            if 20 <= len(clean_text) <= 500:
+                texts.append(clean_text)
+    
+    title = reader.metadata.title if reader.metadata and reader.metadata.title else urlparse(url).path.rsplit('/', 1)[-1]
+    return {
+        "title": title,
+        "main_content": [{"type": "pdf", "text": text} for text in texts[:100]]
+    }
+
+def process_pdf_queue(changed_pages: List[str] = None, limit: int = PDF_QUEUE_BATCH) -> int:
+    """Extract text from queued PDFs and publish them as the ``pdf_documents`` source"""
+    processed = 0
+    while pdf_queue and processed < limit:
+        url = next(iter(pdf_queue))
+        source_name = pdf_queue.pop(url)
+        if not is_allowed_by_robots(url):
+            continue
+        processed += 1
+        
+        try:
+            fingerprint = page_fingerprints.get(url)
+            response = fetch_url(url, build_request_headers(url))
+            if response.status_code >= 400:
+                response.close()
+            response.raise_for_status()
             
-            scraped_info["content"]["admission_info"] = admission_info[:25]  # Increased to 25 items
-            logger.info(f"📝 Found {len(admission_info)} admission-related items")
+            if response.status_code == 304 and fingerprint:
+                response.close()
+                continue
+            body = read_limited_body(response, MAX_PDF_BYTES)
+            content_hash = hashlib.sha256(body).hexdigest()
+            if fingerprint and content_hash == fingerprint["content_hash"]:
+                continue
             
-            # Also extract specific admission details
-            specific_admission = []
-            for tag in soup.find_all(['p', 'div']):
-                text = tag.text.strip()
-                if any(keyword in text.lower() for keyword in ['srmjee', 'neet', 'cutoff', 'merit list', 'admission open', 'last date', 'application form']):
-                    if len(text) > 30 and len(text) < 200:
-                        clean_text = ' '.join(text.split())
-                        if clean_text not in specific_admission:
-                            specific_admission.append(clean_text)
+            content = extract_pdf_content(url, body)
+            body_hash = store_page_body(body, content_hash)
+            page_fingerprints[url] = {
+                "etag": response.headers.get('ETag'),
+                "last_modified": response.headers.get('Last-Modified'),
+                "content_hash": content_hash,
+                "body_hash": body_hash,
+                "content": content,
+                "links": [],
+                "anchors": {},
+                "fetched_at": datetime.now(timezone.utc)
+            }
+            page_yield[url] = count_useful_items(content)
+            pdf_records[url] = PageRecord(
+                source_id="pdf_documents",
+                source=f"{source_name} - PDF",
+                url=url,
+                depth=1,
+                timestamp=datetime.now().isoformat(),
+                content=content,
+                body_hash=body_hash
+            )
+            if changed_pages is not None:
+                changed_pages.append(url)
+            logger.info(f"📄 Extracted {len(content['main_content'])} text snippets from PDF: {url}")
             
-            if specific_admission:
-                scraped_info["content"]["specific_admission"] = specific_admission[:10]
-                logger.info(f"🎯 Found {len(specific_admission)} specific admission details")
-        
-        elif "academics" in url.lower() or "courses" in url.lower() or "engineering" in url.lower():
-            # Extract course and program information
-            course_info = []
-            for tag in soup.find_all(['p', 'div', 'span', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                text = tag.text.strip()
-                if any(keyword in text.lower() for keyword in ['course', 'program', 'curriculum', 'specialization', 'degree', 'engineering', 'btech', 'mtech', 'phd', 'branch', 'department', 'faculty', 'specialization']):
-                    if len(text) > 10 and len(text) < 500:  # Filter out very short or very long text
-                        course_info.append(text)
-            scraped_info["content"]["course_info"] = course_info[:20]
-            logger.info(f"📚 Found {len(course_info)} course-related items")
-        
-        elif "research" in url.lower():
-            # Extract research information
-            research_info = []
-            for tag in soup.find_all(['p', 'div', 'span', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                text = tag.text.strip()
-                if any(keyword in text.lower() for keyword in ['research', 'innovation', 'publication', 'patent', 'laboratory', 'project', 'faculty', 'publication', 'conference', 'journal', 'paper']):
-                    if len(text) > 10 and len(text) < 500:  # Filter out very short or very long text
-                        research_info.append(text)
-            scraped_info["content"]["research_info"] = research_info[:20]
-            logger.info(f"🔬 Found {len(research_info)} research-related items")
-        
-        # INFINITE Deep scraping: Follow ALL possible links
-        if len(visited_urls) < max_pages:  # Only check page limit, no depth limit
-            discovered_links = discover_links(url, soup, max_links=100)  # Increased to 100 links
-            logger.info(f"🔍 Found {len(discovered_links)} potential links to follow")
+        except Exception as e:
+            logger.error(f"❌ Failed to extract PDF {url}: {str(e)}")
+    
+    if pdf_records:
+        replace_source_pages("pdf_documents", pdf_records.values(), changed_pages)
+    return processed
+
+def extract_page_content(url: str, soup: BeautifulSoup) -> Dict[str, Any]:
+    """Extract titles, text, links and category-specific info from a parsed page"""
+    content = {}
+    
+    # Extract page title
+    content["title"] = soup.find('title').text.strip() if soup.find('title') else "No title found"
+    
+    # Extract main content text
+    main_content = []
+    for tag in soup.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'])[:30]:  # Increased to 30 elements
+        if tag.text.strip():
+            main_content.append({
+                "type": tag.name,
+                "text": tag.text.strip()
+            })
+    content["main_content"] = main_content
+    
+    # Extract navigation links
+    nav_links = []
+    for link in soup.find_all('a', href=True)[:15]:  # Increased to 15 links
+        if link.text.strip():
+            nav_links.append({
+                "text": link.text.strip(),
+                "url": link.get('href')
+            })
+    content["navigation"] = nav_links
+    
+    # Extract images with alt text
+    images = []
+    for img in soup.find_all('img')[:8]:  # Increased to 8 images
+        if img.get('alt'):
+            images.append({
+                "alt": img.get('alt'),
+                "src": img.get('src')
+            })
+    content["images"] = images
+    
+    # Extract specific content based on source type
+    if "admissions" in url.lower():
+        # Look for admission forms, deadlines, etc.
+        admission_info = []
+        for tag in soup.find_all(['p', 'div', 'span', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+            text = tag.text.strip()
+            # Skip navigation/menu items
+            if any(skip in text.lower() for skip in ['menu', 'students', 'faculty', 'staff', 'parents', 'visitors', 'alumni', 'examinations', 'campuses']):
+                continue
             
-            sub_pages_scraped = 0
-            for link_url in discovered_links:
-                if is_valid_srm_page(link_url) and link_url not in visited_urls:
-                    try:
-                        logger.info(f"🔗 Following link (depth {depth + 1}): {link_url}")
-                        # Recursively scrape sub-pages with NO depth limit
-                        sub_page_data = scrape_website(
-                            link_url, 
-                            f"{source_name} - Sub-page", 
-                            depth + 1, 
-                            999,  # No depth limit
-                            max_pages, 
-                            visited_urls
-                        )
-                        
-                        if sub_page_data:
-                            scraped_info["sub_pages"].append(sub_page_data)
-                            sub_pages_scraped += 1
-                            logger.info(f"✅ Successfully scraped sub-page: {link_url}")
-                            
-                            # Much higher sub-page limit for comprehensive scraping
-                            if sub_pages_scraped >= 50:  # Increased to 50 sub-pages per main page
-                                logger.info(f"🛑 Reached sub-page limit for {source_name}")
-                                break
-                            
-                    except Exception as e:
-                        logger.error(f"❌ Failed to scrape sub-page {link_url}: {str(e)}")
-                        continue
-                else:
-                    logger.info(f"⏭️ Skipping invalid/already visited link: {link_url}")
+            if any(keyword in text.lower() for keyword in ['admission', 'apply', 'deadline', 'form', 'requirement', 'enrollment', 'entrance', 'exam', 'cutoff', 'merit', 'eligibility', 'procedure', 'process', 'date', 'last date', 'application', '2025', '2024', 'btech', 'mtech', 'phd', 'engineering', 'medical', 'management']):
+                if len(text) > 20 and len(text) < 300:  # Better filtering
+                    # Clean up the text
+                    clean_text = ' '.join(text.split())  # Remove extra whitespace
+                    if clean_text not in admission_info:  # Avoid duplicates
+                        admission_info.append(clean_text)
         
-        logger.info(f"✅ Successfully scraped {source_name} with {len(scraped_info['sub_pages'])} sub-pages")
-        return scraped_info
+        content["admission_info"] = admission_info[:25]  # Increased to 25 items
+        logger.info(f"📝 Found {len(admission_info)} admission-related items")
         
-    except Exception as e:
-        logger.error(f"❌ Failed to scrape {source_name}: {str(e)}")
-        return {
-            "source": source_name,
-            "url": url,
-            "depth": depth,
-            "timestamp": datetime.now().isoformat(),
-            "status": "error",
-            "error": str(e)
-        }
+        # Also extract specific admission details
+        specific_admission = []
+        for tag in soup.find_all(['p', 'div']):
+            text = tag.text.strip()
+            if any(keyword in text.lower() for keyword in ['srmjee', 'neet', 'cutoff', 'merit list', 'admission open', 'last date', 'application form']):
+                if len(text) > 30 and len(text) < 200:
+                    clean_text = ' '.join(text.split())
+                    if clean_text not in specific_admission:
+                        specific_admission.append(clean_text)
+        
+        if specific_admission:
+            content["specific_admission"] = specific_admission[:10]
+            logger.info(f"🎯 Found {len(specific_admission)} specific admission details")
+    
+    elif "academics" in url.lower() or "courses" in url.lower() or "engineering" in url.lower():
+        # Extract course and program information
+        course_info = []
+        for tag in soup.find_all(['p', 'div', 'span', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+            text = tag.text.strip()
+            if any(keyword in text.lower() for keyword in ['course', 'program', 'curriculum', 'specialization', 'degree', 'engineering', 'btech', 'mtech', 'phd', 'branch', 'department', 'faculty', 'specialization']):
+                if len(text) > 10 and len(text) < 500:  # Filter out very short or very long text
+                    course_info.append(text)
+        content["course_info"] = course_info[:20]
+        logger.info(f"📚 Found {len(course_info)} course-related items")
+    
+    elif "research" in url.lower():
+        # Extract research information
+        research_info = []
+        for tag in soup.find_all(['p', 'div', 'span', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+            text = tag.text.strip()
+            if any(keyword in text.lower() for keyword in ['research', 'innovation', 'publication', 'patent', 'laboratory', 'project', 'faculty', 'publication', 'conference', 'journal', 'paper']):
+                if len(text) > 10 and len(text) < 500:  # Filter out very short or very long text
+                    research_info.append(text)
+        content["research_info"] = research_info[:20]
+        logger.info(f"🔬 Found {len(research_info)} research-related items")
+    
+    return content
 
 def get_scraped_data_summary() -> Dict[str, Any]:
     """Get a summary of all scraped data"""
     summary = {
         "total_sources": len(SCRAPING_SOURCES),
         "enabled_sources": len([s for s in SCRAPING_SOURCES.values() if s["enabled"]]),
-        "scraped_data_count": len(scraped_data),
-        "last_updated": max([data.get("timestamp", "1970-01-01") for data in scraped_data.values()]) if scraped_data else "Never",
+        "scraped_data_count": len(page_store),
+        "total_pages": page_store.page_count,
+        "last_updated": page_store.last_updated,
         "sources": {}
     }
     
+    # Per-source counters are computed once when a crawl is stored
     for source_id, source_info in SCRAPING_SOURCES.items():
         if source_info["enabled"]:
-            source_data = scraped_data.get(source_id, {})
+            stats = page_store.stats(source_id)
             summary["sources"][source_id] = {
                 "name": source_info["name"],
                 "url": source_info["url"],
-                "last_scraped": source_data.get("timestamp", "Never"),
-                "status": source_data.get("status", "Not scraped"),
-                "content_length": len(str(source_data.get("content", {})))
+                "last_scraped": stats.last_scraped if stats else "Never",
+                "status": stats.status if stats else "Not scraped",
+                "pages": stats.pages if stats else 0,
+                "content_length": stats.content_size if stats else 0
             }
     
     return summary
 
-def build_knowledge_database():
-    """Build a structured knowledge database from scraped data for instant AI responses"""
-    global KNOWLEDGE_DATABASE, last_database_update
+# Keyword lists per category, in priority order: text goes to the first category with a match
+CATEGORY_KEYWORDS = {
+    "admissions": ['admission', 'apply', 'deadline', 'form', 'requirement', 'enrollment', 'entrance', 'exam', 'cutoff', 'merit', 'eligibility', 'procedure', 'process', 'date', 'last date', 'application', '2025', '2024', 'btech', 'mtech', 'phd', 'engineering', 'medical', 'management'],
+    "courses": ['course', 'program', 'curriculum', 'specialization', 'degree', 'engineering', 'btech', 'mtech', 'phd', 'branch', 'department', 'faculty', 'specialization', 'syllabus', 'semester'],
+    "research": ['research', 'innovation', 'publication', 'patent', 'laboratory', 'project', 'faculty', 'publication', 'conference', 'journal', 'paper', 'experiment', 'study'],
+    "events": ['event', 'festival', 'symposium', 'workshop', 'conference', 'activity', 'celebration', 'competition', 'seminar', 'webinar'],
+    "facilities": ['facility', 'infrastructure', 'laboratory', 'library', 'hostel', 'canteen', 'gym', 'sports', 'auditorium', 'classroom', 'equipment']
+}
+
+# Category-specific lists extracted by the crawler
+KNOWLEDGE_CONTENT_TYPES = {
+    "admission_info": "admissions",
+    "specific_admission": "admissions",
+    "course_info": "courses",
+    "research_info": "research"
+}
+
+def _compile_category_matcher():
+    """One regex for all category keywords, plus keyword -> highest-priority category"""
+    keyword_category = {}
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        for keyword in keywords:
+            keyword_category.setdefault(keyword, category)
+    priority = {category: index for index, category in enumerate(CATEGORY_KEYWORDS)}
+    # Alternatives ordered by category priority; the lookahead reports a match at every
+    # offset, so overlapping keywords are found just like with `keyword in text`
+    ordered = sorted(keyword_category, key=lambda keyword: (priority[keyword_category[keyword]], -len(keyword)))
+    pattern = re.compile("(?=(" + "|".join(re.escape(keyword) for keyword in ordered) + "))")
+    return pattern, keyword_category, priority
+
+CATEGORY_PATTERN, KEYWORD_CATEGORY, CATEGORY_PRIORITY = _compile_category_matcher()
+
+def categorize_text(text: str):
+    """Return (category, keyword hits) for a knowledge item in a single regex pass"""
+    hits = {}
+    for match in CATEGORY_PATTERN.finditer(text.lower()):
+        category = KEYWORD_CATEGORY[match.group(1)]
+        hits[category] = hits.get(category, 0) + 1
+    if not hits:
+        return "general", 0
+    category = min(hits, key=CATEGORY_PRIORITY.__getitem__)
+    return category, hits[category]
+
+def rank_knowledge_item(text: str, keyword_hits: int) -> float:
+    """Rank score within a category: keyword density plus a preference for readable lengths"""
+    score = min(keyword_hits, 5)
+    if 50 <= len(text) <= 300:
+        score += 1.0
+    return score
+
+def build_knowledge_database(wait: bool = False) -> bool:
+    """Build a structured knowledge database from scraped data for instant AI responses
+    
+    The new database is built off to the side and published with a single
+    reference swap, so readers never see a partial build. Calls made while a
+    build is running are coalesced into one more pass of the running build
+    and return False: immediately, or with ``wait`` once that pass has been
+    published. Returns True when this call ran the build itself.
+    """
+    global database_update_in_progress, knowledge_builds_requested, knowledge_builds_completed
+    
+    with knowledge_build_lock:
+        knowledge_builds_requested += 1
+        request = knowledge_builds_requested
+        if database_update_in_progress:
+            logger.info("⏳ Knowledge database build already running, coalescing request")
+            if wait:
+                knowledge_build_done.wait_for(lambda: knowledge_builds_completed >= request or not database_update_in_progress)
+                if knowledge_builds_completed < request:
+                    raise RuntimeError("the running knowledge database build failed")
+            return False
+        database_update_in_progress = True
     
-    logger.info("🧠 Building knowledge database from scraped data...")
+    try:
+        while True:
+            with knowledge_build_lock:
+                if knowledge_builds_completed >= knowledge_builds_requested:
+                    database_update_in_progress = False
+                    knowledge_build_done.notify_all()
+                    return True
+                covered = knowledge_builds_requested
+            _build_and_publish_knowledge_database()
+            with knowledge_build_lock:
+                knowledge_builds_completed = covered
+                knowledge_build_done.notify_all()
+    except Exception:
+        with knowledge_build_lock:
+            database_update_in_progress = False
+            knowledge_build_done.notify_all()
+        raise
+
+def _build_and_publish_knowledge_database():
+    """Build a fresh knowledge database from scraped data and swap it in"""
+    global KNOWLEDGE_DATABASE, KNOWLEDGE_INDEX, last_database_update
     
-    # Clear existing database
-    for category in KNOWLEDGE_DATABASE:
-        KNOWLEDGE_DATABASE[category] = []
+    logger.info("🧠 Building knowledge database from scraped data...")
     
-    if not scraped_data:
+    if not page_store:
         logger.warning("⚠️ No scraped data available for database building")
         return
     
-    def process_content_recursive(content_data, depth=0):
-        """Recursively process content and categorize it"""
-        if depth > 3:  # Prevent infinite recursion
+    # Drop pages that are near-duplicates of a page seen earlier (same page under another URL)
+    page_index = NearDuplicateIndex(PAGE_SIMILARITY_THRESHOLD)
+    pages = []
+    duplicate_pages = 0
+    for page in page_store.pages():
+        if page.status != "success":
+            continue
+        page_text = " ".join(item.get("text", "") for item in page.content.get("main_content", []))
+        known_pages = len(page_index)
+        if page_text.strip() and page_index.add(page_text) < known_pages:
+            duplicate_pages += 1
+            continue
+        pages.append(page)
+    
+    # Cluster near-duplicate text blocks; the first block of each cluster is its canonical item,
+    # kept as (category, rank score, first-seen order, text)
+    block_index = NearDuplicateIndex()
+    canonical_items = {}
+    page_clusters = []
+    merged_items = 0
+    
+    def add_candidate(clusters, category, text, score_boost):
+        nonlocal merged_items
+        known_blocks = len(block_index)
+        cluster = block_index.add(text)
+        clusters.append(cluster)
+        if cluster < known_blocks:
+            merged_items += 1
             return
-            
-        content = content_data.get("content", {})
+        matched_category, keyword_hits = categorize_text(text)
+        canonical_items[cluster] = (category or matched_category, rank_knowledge_item(text, keyword_hits) + score_boost, cluster, text)
+    
+    for page in pages:
+        content = page.content
+        depth_penalty = 0.1 * page.depth
+        clusters = []
         
         # Process main content
-        if "main_content" in content:
-            for item in content["main_content"]:
-                text = item.get("text", "").strip()
-                if len(text) < 20 or len(text) > 500:  # Filter appropriate length
-                    continue
-                
-                # Categorize content
-                text_lower = text.lower()
-                
-                # Admissions
-                if any(keyword in text_lower for keyword in ['admission', 'apply', 'deadline', 'form', 'requirement', 'enrollment', 'entrance', 'exam', 'cutoff', 'merit', 'eligibility', 'procedure', 'process', 'date', 'last date', 'application', '2025', '2024', 'btech', 'mtech', 'phd', 'engineering', 'medical', 'management']):
-                    if text not in KNOWLEDGE_DATABASE["admissions"]:
-                        KNOWLEDGE_DATABASE["admissions"].append(text)
-                
-                # Courses
-                elif any(keyword in text_lower for keyword in ['course', 'program', 'curriculum', 'specialization', 'degree', 'engineering', 'btech', 'mtech', 'phd', 'branch', 'department', 'faculty', 'specialization', 'syllabus', 'semester']):
-                    if text not in KNOWLEDGE_DATABASE["courses"]:
-                        KNOWLEDGE_DATABASE["courses"].append(text)
-                
-                # Research
-                elif any(keyword in text_lower for keyword in ['research', 'innovation', 'publication', 'patent', 'laboratory', 'project', 'faculty', 'publication', 'conference', 'journal', 'paper', 'experiment', 'study']):
-                    if text not in KNOWLEDGE_DATABASE["research"]:
-                        KNOWLEDGE_DATABASE["research"].append(text)
-                
-                # Events
-                elif any(keyword in text_lower for keyword in ['event', 'festival', 'symposium', 'workshop', 'conference', 'activity', 'celebration', 'competition', 'seminar', 'webinar']):
-                    if text not in KNOWLEDGE_DATABASE["events"]:
-                        KNOWLEDGE_DATABASE["events"].append(text)
-                
-                # Facilities
-                elif any(keyword in text_lower for keyword in ['facility', 'infrastructure', 'laboratory', 'library', 'hostel', 'canteen', 'gym', 'sports', 'auditorium', 'classroom', 'equipment']):
-                    if text not in KNOWLEDGE_DATABASE["facilities"]:
-                        KNOWLEDGE_DATABASE["facilities"].append(text)
-                
-                # General (everything else)
-                else:
-                    if text not in KNOWLEDGE_DATABASE["general"]:
-                        KNOWLEDGE_DATABASE["general"].append(text)
+        for item in content.get("main_content", []):
+            text = item.get("text", "").strip()
+            if len(text) < 20 or len(text) > 500:  # Filter appropriate length
+                continue
+            add_candidate(clusters, None, text, -depth_penalty)
         
         # Process specific content types
-        for content_type in ["admission_info", "course_info", "research_info", "specific_admission"]:
-            if content_type in content:
-                for item in content[content_type][:10]:  # Limit to 10 items per type
-                    if isinstance(item, str) and len(item) > 20 and len(item) < 500:
-                        if item not in KNOWLEDGE_DATABASE["admissions"]:
-                            KNOWLEDGE_DATABASE["admissions"].append(item)
-        
-        # Recursively process sub-pages
-        for sub_page in content_data.get("sub_pages", []):
-            process_content_recursive(sub_page, depth + 1)
-    
-    # Process all scraped sources
-    for source_id, source_data in scraped_data.items():
-        if source_data.get("status") == "success":
-            process_content_recursive(source_data)
-    
-    # Limit each category to prevent overwhelming
-    for category in KNOWLEDGE_DATABASE:
-        KNOWLEDGE_DATABASE[category] = KNOWLEDGE_DATABASE[category][:50]  # Max 50 items per category
+        for content_type, category in KNOWLEDGE_CONTENT_TYPES.items():
+            for item in content.get(content_type, [])[:10]:  # Limit to 10 items per type
+                if isinstance(item, str) and len(item) > 20 and len(item) < 500:
+                    add_candidate(clusters, category, item, 1.5 - depth_penalty)
+        page_clusters.append(clusters)
+    
+    # Blocks repeated across many pages are headers, footers and menus, not knowledge
+    boilerplate = boilerplate_clusters(page_clusters, len(pages))
+    candidates = {category: [] for category in KNOWLEDGE_DATABASE}
+    for cluster, (category, score, order, text) in canonical_items.items():
+        if cluster not in boilerplate and category in candidates:
+            candidates[category].append((score, order, text))
+    
+    # Keep the best-ranked items per category instead of the first ones found
+    new_database = {
+        category: [text for _, _, text in heapq.nlargest(50, items, key=lambda entry: (entry[0], -entry[1]))]
+        for category, items in candidates.items()
+    }
+    logger.info(
+        f"🧮 Categorized {len(canonical_items) - len(boilerplate)} unique items from {len(pages)} pages "
+        f"({duplicate_pages} near-duplicate pages, {merged_items} near-duplicate items, {len(boilerplate)} boilerplate blocks dropped)"
+    )
     
-    # Update timestamp
+    # Publish: one reference swap, readers keep whatever version they already hold
+    frozen = freeze_knowledge(new_database)
+    KNOWLEDGE_INDEX = KnowledgeIndex(frozen)
+    KNOWLEDGE_DATABASE = frozen
     last_database_update = datetime.now().isoformat()
     
-    total_items = sum(len(items) for items in KNOWLEDGE_DATABASE.values())
+    total_items = sum(len(items) for items in frozen.values())
     logger.info(f"✅ Knowledge database built successfully with {total_items} categorized items")
-    logger.info(f"📊 Database breakdown: {', '.join([f'{cat}: {len(items)}' for cat, items in KNOWLEDGE_DATABASE.items()])}")
+    logger.info(f"📊 Database breakdown: {', '.join([f'{cat}: {len(items)}' for cat, items in frozen.items()])}")
+    
+    save_knowledge_snapshot(frozen)
+
+def publish_crawl_state():
+    """Publish this crawl's status and page table without rebuilding knowledge
+    
+    Crawls that change no page still move timestamps, host statistics and
+    the recrawl delta forward; the current knowledge database is written
+    again with them as the next snapshot version, which workers reload like
+    any other.
+    """
+    save_knowledge_snapshot()
+
+def get_crawl_status() -> Dict[str, Any]:
+    """Host, PDF queue and recrawl state of the crawler running in this process"""
+    return {
+        "published_at": datetime.now().isoformat(),
+        "hosts": {host: policy.summary() for host, policy in list(host_policies.items())},
+        "pdf_queue": {"pending": len(pdf_queue), "extracted": len(pdf_records), "enabled": PdfReader is not None},
+        "last_crawl_delta": {
+            "timestamp": last_crawl_delta["timestamp"],
+            "changed_pages": len(last_crawl_delta["changed_pages"]),
+            "total_pages": last_crawl_delta["total_pages"]
+        }
+    }
+
+def save_knowledge_snapshot(database=None):
+    """Persist a published knowledge database as the next snapshot version and map it
+    
+    ``database`` defaults to the one published when the snapshot lock is
+    taken. The version is allocated under that lock, shared by the crawler
+    process and every web worker, so no two writers produce the same
+    snapshot file. Each source's pages go into their own page group, so
+    readers only decode the sources they list; the meta blob keeps just
+    their counters. The crawler's recrawl fingerprints get a group of their
+    own; outside the crawler process they and the crawl status are carried
+    over from the loaded snapshot.
+    """
+    global current_snapshot, knowledge_version
+    
+    with snapshot_write_lock:
+        lock = ProcessLock(SNAPSHOT_LOCK_PATH)
+        while not lock.acquire():
+            time.sleep(SNAPSHOT_LOCK_RETRY)
+        try:
+            version = max(knowledge_version, latest_build_version(KNOWLEDGE_SNAPSHOT_DIR)) + 1
+            sources = page_store.sources()
+            path = write_snapshot(
+                KNOWLEDGE_SNAPSHOT_DIR,
+                KNOWLEDGE_DATABASE if database is None else database,
+                version,
+                meta={
+                    "last_database_update": last_database_update,
+                    "page_stats": {source_id: page_store.stats(source_id).to_dict() for source_id in sources},
+                    # A rebuild in a web worker republishes the crawler's status, not its own empty one
+                    "crawl_status": get_crawl_status() if crawler_process else published_crawl_status
+                },
+                pages={**{source_id: page_store.source_rows(source_id) for source_id in sources},
+                       FINGERPRINT_GROUP: fingerprint_rows()}
+            )
+            # The previous snapshot stays mapped while anything still reads from it
+            knowledge_version = version
+            current_snapshot = KnowledgeSnapshot(path)
+            prune_snapshots(KNOWLEDGE_SNAPSHOT_DIR)
+            logger.info(f"💾 Knowledge snapshot v{version} saved to {path}")
+        except Exception as e:
+            logger.error(f"❌ Failed to save knowledge snapshot: {str(e)}")
+        finally:
+            lock.release()
+
+def load_knowledge_snapshot() -> bool:
+    """Memory-map the newest compatible knowledge snapshot, if one exists
+    
+    Nothing is decoded per item or page: knowledge and lookups are served
+    from the map, and page groups are decoded when a source is first read.
+    """
+    global KNOWLEDGE_DATABASE, KNOWLEDGE_INDEX, last_database_update, knowledge_version, current_snapshot, published_crawl_status, page_store
+    
+    started = time.perf_counter()
+    snapshot = open_latest_snapshot(KNOWLEDGE_SNAPSHOT_DIR)
+    if snapshot is None:
+        logger.info("ℹ️ No knowledge snapshot found, serving built-in knowledge until warm-up completes")
+        return False
+    try:
+        meta = snapshot.meta()
+        index = SnapshotKnowledgeIndex(snapshot)
+        # The published page table replaces this process's one as a whole, like the knowledge database
+        pages = PageStore()
+        for source_id, stats in meta.get("page_stats", {}).items():
+            pages.add_published(source_id, SourceStats.from_dict(stats),
+                                lambda source_id=source_id: snapshot.page_group(source_id) or [])
+        KNOWLEDGE_INDEX = index
+        KNOWLEDGE_DATABASE = index.knowledge
+        page_store = pages
+        last_database_update = meta.get("last_database_update", last_database_update)
+        published_crawl_status = meta.get("crawl_status", published_crawl_status)
+        knowledge_version = snapshot.build_version
+        current_snapshot = snapshot
+        logger.info(f"✅ Loaded knowledge snapshot v{snapshot.build_version} ({snapshot.item_count} items) in {(time.perf_counter() - started) * 1000:.1f}ms")
+        return True
+    except Exception as e:
+        snapshot.close()
+        logger.error(f"❌ Failed to load knowledge snapshot: {str(e)}")
+        return False
 
 def get_relevant_scraped_info(message: str) -> str:
     """Get instant response from pre-built knowledge database"""
-    global KNOWLEDGE_DATABASE
-    
-    if not any(KNOWLEDGE_DATABASE.values()):
-        # If database is empty, try to build it
-        build_knowledge_database()
+    # Take one reference to the published database and index; a concurrent rebuild swaps in new ones
+    knowledge = KNOWLEDGE_DATABASE
+    index = KNOWLEDGE_INDEX
     
     lower_message = message.lower()
-    relevant_info = []
     
     # Determine which categories to search based on message
     search_categories = []
@@ -1161,26 +2577,16 @@ def get_relevant_scraped_info(message: str) -> str:
     
     # If no specific category found, search all
     if not search_categories:
-        search_categories = list(KNOWLEDGE_DATABASE.keys())
-    
-    # Collect relevant information from selected categories
-    for category in search_categories:
-        if category in KNOWLEDGE_DATABASE:
-            # Find items that contain keywords from the message
-            for item in KNOWLEDGE_DATABASE[category][:10]:  # Limit to 10 items per category
-                if any(keyword in item.lower() for keyword in lower_message.split()):
-                    if item not in relevant_info:
-                        relevant_info.append(item)
-                        if len(relevant_info) >= 6:  # Limit total results
-                            break
-            if len(relevant_info) >= 6:
-                break
+        search_categories = list(knowledge.keys())
+    
+    # Top matches from the inverted index, restricted to the selected categories
+    relevant_info = index.search(message, search_categories, limit=6)
     
     # If no specific matches found, provide general information from relevant categories
     if not relevant_info and search_categories:
         for category in search_categories:
-            if category in KNOWLEDGE_DATABASE and KNOWLEDGE_DATABASE[category]:
-                relevant_info.extend(KNOWLEDGE_DATABASE[category][:3])
+            if category in knowledge and knowledge[category]:
+                relevant_info.extend(knowledge[category][:3])
                 if len(relevant_info) >= 6:
                     break
     
@@ -1193,8 +2599,12 @@ def get_relevant_scraped_info(message: str) -> str:
     
     return ""
 
-def discover_links(base_url: str, soup: BeautifulSoup, max_links: int = 100) -> List[str]:
-    """Discover ALL possible relevant internal and external links from a page"""
+def discover_links(base_url: str, soup: BeautifulSoup, max_links: int = 100, anchor_texts: Dict[str, str] = None) -> List[str]:
+    """Discover ALL possible relevant internal and external links from a page
+    
+    When ``anchor_texts`` is given it is filled with the anchor text of each
+    discovered ``<a>`` link, which the crawl frontier uses for scoring.
+    """
     discovered_links = []
     
     try:
@@ -1217,6 +2627,8 @@ def discover_links(base_url: str, soup: BeautifulSoup, max_links: int = 100) ->
                 # Avoid duplicate links
                 if href not in discovered_links:
                     discovered_links.append(href)
+                if anchor_texts is not None and link.text.strip():
+                    anchor_texts.setdefault(href, link.text.strip())
         
         # Method 2: Find links in different HTML structures
         for link in soup.find_all(['div', 'span', 'li', 'td', 'th'], class_=True):
@@ -1301,50 +2713,85 @@ def is_valid_srm_page(url: str) -> bool:
         return False
 
 def periodic_scraping():
-    """Background task to periodically scrape data every 15 minutes for maximum freshness"""
-    while True:
+    """Recrawl every 15 minutes for maximum freshness until ``crawler_stop`` is set"""
+    global last_crawl_delta
+    
+    delay = CRAWL_INTERVAL
+    while not crawler_stop.wait(delay):
+        delay = CRAWL_INTERVAL
         try:
-            time.sleep(900)  # Wait 15 minutes (reduced from 30)
             logger.info("🔄 Periodic scraping triggered...")
             
-            for source_id, source_info in SCRAPING_SOURCES.items():
-                if source_info["enabled"]:
+            changed_pages = []
+            job = start_scheduled_crawl("periodic")
+            error = None
+            try:
+                for source_id in job["sources"]:
+                    source_info = SCRAPING_SOURCES[source_id]
                     logger.info(f"Periodic scraping {source_info['name']}...")
+                    start_crawl_job_source(job, source_id)
                     
-                    # Use INFINITE deep scraping parameters
-                    max_pages = source_info.get("max_pages", 1000)
-                    
-                    result = scrape_website(
-                        source_info["url"], 
-                        source_info["name"],
-                        depth=0,
-                        max_depth=999,  # No depth limit
-                        max_pages=max_pages
-                    )
+                    # Refresh the most valuable pages first within the source's page/time budget
+                    with crawl_lock:
+                        pages = scrape_website(
+                            source_info["url"], 
+                            source_info["name"],
+                            depth=0,
+                            max_depth=source_info.get("max_depth", 999),
+                            max_pages=source_info.get("max_pages", 1000),
+                            changed_pages=changed_pages,
+                            time_budget=source_info.get("time_budget"),
+                            source_id=source_id,
+                            on_page=crawl_job_page_reporter(job)
+                        )
+                        if pages:
+                            replace_source_pages(source_id, pages, changed_pages)
                     
-                    if result:
-                        scraped_data[source_id] = result
-                        sub_pages_count = len(result.get("sub_pages", []))
-                        logger.info(f"✅ Periodic scraping completed for {source_info['name']}: {result.get('status', 'unknown')} with {sub_pages_count} sub-pages")
+                    if pages:
+                        logger.info(f"✅ Periodic scraping completed for {source_info['name']}: {pages[0].status} with {len(pages) - 1} sub-pages")
                     else:
                         logger.warning(f"⚠️ No data from periodic scraping of {source_info['name']}")
+                    finish_crawl_job_source(job, source_id)
+            except Exception as e:
+                error = str(e)
+                raise
+            finally:
+                finish_crawl_job(job, error)
             
-            total_pages = sum(len(data.get("sub_pages", [])) + 1 for data in scraped_data.values() if data)
-            logger.info(f"🔄 Periodic scraping completed. Processed {len(scraped_data)} main sources with {total_pages} total pages.")
+            with crawl_lock:
+                process_pdf_queue(changed_pages)
+                prune_page_bodies()
             
-            # Automatically rebuild knowledge database with new data
-            logger.info("🧠 Automatically rebuilding knowledge database with fresh data...")
-            build_knowledge_database()
-            logger.info("✅ Knowledge database automatically updated with latest information!")
+            total_pages = page_store.page_count
+            logger.info(f"🔄 Periodic scraping completed. Processed {len(page_store)} main sources with {total_pages} total pages.")
+            
+            last_crawl_delta = {
+                "timestamp": datetime.now().isoformat(),
+                "changed_pages": changed_pages,
+                "total_pages": total_pages
+            }
+            
+            # Only rebuild the knowledge database when some page actually changed; either way
+            # the crawl's status and pages are published for the web workers
+            if changed_pages:
+                logger.info(f"🧠 {len(changed_pages)} pages changed, rebuilding knowledge database with fresh data...")
+                build_knowledge_database()
+                logger.info("✅ Knowledge database automatically updated with latest information!")
+            else:
+                logger.info("♻️ No page changes detected, keeping current knowledge database")
+                publish_crawl_state()
             
         except Exception as e:
             logger.error(f"❌ Periodic scraping failed: {str(e)}")
-            time.sleep(300)  # Wait 5 minutes before retrying
+            delay = CRAWL_RETRY_DELAY
 
 # Create application instance
 app = create_application()
 
 if __name__ == "__main__":
+    if "--crawler" in sys.argv:
+        sys.exit(run_crawler())
+    
     print("🚀 Starting SRM Guide Bot Backend (Improved)...")
     print("✅ Same features as main.py but simplified implementation")
     print("✅ No complex dependencies required")
@@ -21,7 +21,8 @@ from slowapi.errors import RateLimitExceeded
 
 from app.core.config import settings
 from app.core.logging import setup_logging
-from app.core.database import init_db, close_db
+from app.core.database import init_db, close_db, get_mongodb_pool_stats
+from database_service import db_service
 from app.core.redis import init_redis, close_redis
 from app.core.celery import init_celery
 from app.api.v1.api import api_router
@@ -50,6 +51,10 @@ async def lifespan(app: FastAPI):
     await init_db()
     logger.info("✅ Database initialized")
     
+    # Counter flushes, cache invalidation, stats refreshes and archival
+    db_service.start_background_tasks()
+    logger.info("✅ Database background tasks started")
+    
     # Initialize Redis
     await init_redis()
     logger.info("✅ Redis initialized")
@@ -63,6 +68,10 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("🛑 Shutting down SRM Guide Bot Backend...")
     
+    # Stop background tasks first so queued counters are flushed while Mongo is still connected
+    await db_service.stop_background_tasks()
+    logger.info("✅ Database background tasks stopped")
+    
     # Close database connections
     await close_db()
     logger.info("✅ Database connections closed")
@@ -121,7 +130,8 @@ def create_application() -> FastAPI:
             "status": "healthy",
             "service": "SRM Guide Bot API",
             "version": "2.0.0",
-            "environment": settings.ENVIRONMENT
+            "environment": settings.ENVIRONMENT,
+            "mongodb_pool": get_mongodb_pool_stats()
         }
     
     # Root endpoint
@@ -1,16 +1,113 @@
 """
 MongoDB Configuration and Database Connection
+
+The one place Mongo clients are created. ``DatabaseService``, the ``app``
+package (``app.core.database``) and CLI scripts all share the clients of the global ``mongodb_config``, so each process has
+one tuned connection pool per client type. Indexes are created by the
+deploy scripts (``init_mongodb.py``, ``init_db.py``), never on import or
+startup.
 """
 
 import os
-from typing import Optional
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
 from pymongo import MongoClient
+from pymongo.monitoring import ConnectionPoolListener
+from mongodb_indexes import ensure_collections
 from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+class PoolMetrics(ConnectionPoolListener):
+    """Connection checkout counts and wait times, fed by pymongo pool events
+    
+    A checkout starts and completes on the same thread (Motor runs pymongo
+    calls on its worker threads), so the wait is timed per thread.
+    """
+    
+    def __init__(self, recent: int = 1000):
+        self._lock = threading.Lock()
+        self._started = threading.local()
+        self._recent_waits: Deque[float] = deque(maxlen=recent)
+        self.checkouts = 0
+        self.failed_checkouts = 0
+        self.checked_out = 0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.pools_cleared = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+    
+    def _finish_wait(self) -> float:
+        started = getattr(self._started, "value", None)
+        self._started.value = None
+        return (time.perf_counter() - started) * 1000 if started is not None else 0.0
+    
+    def connection_check_out_started(self, event):
+        self._started.value = time.perf_counter()
+    
+    def connection_checked_out(self, event):
+        wait = self._finish_wait()
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.total_wait_ms += wait
+            self.max_wait_ms = max(self.max_wait_ms, wait)
+            self._recent_waits.append(wait)
+    
+    def connection_check_out_failed(self, event):
+        wait = self._finish_wait()
+        with self._lock:
+            self.failed_checkouts += 1
+            self._recent_waits.append(wait)
+    
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+    
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+    
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+    
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pools_cleared += 1
+    
+    # Remaining pool events carry nothing the metrics use
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_ready(self, event):
+        pass
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = sorted(self._recent_waits)
+            return {
+                "checkouts": self.checkouts,
+                "failed_checkouts": self.failed_checkouts,
+                "checked_out": self.checked_out,
+                "open_connections": self.connections_created - self.connections_closed,
+                "pools_cleared": self.pools_cleared,
+                "average_wait_ms": self.total_wait_ms / self.checkouts if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait_ms,
+                "recent_p95_wait_ms": recent[int(0.95 * (len(recent) - 1))] if recent else 0.0
+            }
+
 class MongoDBConfig:
     """MongoDB configuration and connection management"""
     
@@ -32,12 +129,46 @@ class MongoDBConfig:
         # Collections
         self.collections = {
             'scraped_data': 'scraped_data',
+            'scraped_pages': 'scraped_pages',
             'knowledge_database': 'knowledge_database',
             'chat_history': 'chat_history',
             'user_sessions': 'user_sessions',
             'analytics': 'analytics',
-            'scraping_logs': 'scraping_logs'
+            'scraping_logs': 'scraping_logs',
+            'database_stats': 'database_stats'
+        }
+        
+        # Retention in days of the append-only collections (0 keeps documents
+        # forever) and the datetime field each one expires on
+        self.retention_days = {
+            'chat_history': int(os.getenv('CHAT_HISTORY_RETENTION_DAYS', '180')),
+            'analytics': int(os.getenv('ANALYTICS_RETENTION_DAYS', '400')),
+            'scraping_logs': int(os.getenv('SCRAPING_LOGS_RETENTION_DAYS', '30'))
         }
+        self.expiry_fields = {
+            'chat_history': 'timestamp',
+            'analytics': 'created_at',
+            'scraping_logs': 'timestamp'
+        }
+        
+        # Connection pool shared by every request on a client; size it for the
+        # number of concurrent Mongo operations one process runs
+        self.max_pool_size = int(os.getenv('MONGO_MAX_POOL_SIZE', '50'))
+        self.min_pool_size = int(os.getenv('MONGO_MIN_POOL_SIZE', '5'))
+        self.max_idle_time_ms = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', '300000'))
+        self.wait_queue_timeout_ms = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', '5000'))
+        self.server_selection_timeout_ms = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT', '5000'))
+        self.connect_timeout_ms = int(os.getenv('MONGO_CONNECT_TIMEOUT', '10000'))
+        self.socket_timeout_ms = int(os.getenv('MONGO_SOCKET_TIMEOUT', '10000'))
+        
+        # Reads may go to a secondary when the primary is unavailable; writes
+        # wait for a majority so a failover never loses acknowledged chat data
+        self.read_preference = os.getenv('MONGO_READ_PREFERENCE', 'primaryPreferred')
+        write_concern = os.getenv('MONGO_WRITE_CONCERN', 'majority')
+        self.write_concern_w = int(write_concern) if write_concern.isdigit() else write_concern
+        self.write_concern_journal = os.getenv('MONGO_WRITE_CONCERN_JOURNAL', 'true').lower() == 'true'
+        self.app_name = os.getenv('MONGO_APP_NAME', 'srm-guide-bot')
+        self.pool_metrics = PoolMetrics()
         
         # Connection objects
         self.sync_client: Optional[MongoClient] = None
@@ -45,40 +176,65 @@ class MongoDBConfig:
         self.database = None
         self.async_database = None
     
+    def client_options(self, min_pool_size: Optional[int] = None) -> Dict[str, Any]:
+        """Pool, timeout, read preference and write concern settings shared by every client"""
+        return {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size if min_pool_size is None else min_pool_size,
+            "maxIdleTimeMS": self.max_idle_time_ms,
+            "waitQueueTimeoutMS": self.wait_queue_timeout_ms,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+            "connectTimeoutMS": self.connect_timeout_ms,
+            "socketTimeoutMS": self.socket_timeout_ms,
+            "readPreference": self.read_preference,
+            "w": self.write_concern_w,
+            "journal": self.write_concern_journal,
+            "retryWrites": True,
+            "appname": self.app_name,
+            "event_listeners": [self.pool_metrics]
+        }
+    
+    def get_sync_client(self) -> MongoClient:
+        """Shared synchronous client, created on first use (for scripts and sync code)"""
+        if self.sync_client is None:
+            # Scripts are short-lived: keep no idle connections open
+            self.sync_client = MongoClient(self.mongo_uri, **self.client_options(min_pool_size=0))
+            self.database = self.sync_client[self.database_name]
+        return self.sync_client
+    
     def connect_sync(self) -> MongoClient:
-        """Create synchronous MongoDB connection"""
+        """Create synchronous MongoDB connection and check that the server answers"""
         try:
-            self.sync_client = MongoClient(
-                self.mongo_uri,
-                serverSelectionTimeoutMS=5000,
-                connectTimeoutMS=10000,
-                socketTimeoutMS=10000
-            )
+            client = self.get_sync_client()
             
             # Test connection
-            self.sync_client.admin.command('ping')
+            client.admin.command('ping')
             print(f"✅ MongoDB connected successfully to: {self.database_name}")
             
-            self.database = self.sync_client[self.database_name]
-            return self.sync_client
+            return client
             
         except Exception as e:
             print(f"❌ MongoDB connection failed: {str(e)}")
             raise
     
+    def get_async_client(self) -> AsyncIOMotorClient:
+        """Shared asynchronous (Motor) client, created on first use"""
+        if self.async_client is None:
+            self.connect_async()
+        return self.async_client
+    
     def connect_async(self) -> AsyncIOMotorClient:
-        """Create asynchronous MongoDB connection"""
+        """Create asynchronous MongoDB connection
+        
+        Motor connects lazily on the first awaited operation, so this never
+        blocks and is safe to call from inside the event loop.
+        """
         try:
-            self.async_client = AsyncIOMotorClient(
-                self.mongo_uri,
-                serverSelectionTimeoutMS=5000,
-                connectTimeoutMS=10000,
-                socketTimeoutMS=10000
-            )
-            
-            # Test connection
-            self.async_database = self.async_client[self.database_name]
-            print(f"✅ Async MongoDB connected successfully to: {self.database_name}")
+            if self.async_client is None:
+                self.async_client = AsyncIOMotorClient(self.mongo_uri, **self.client_options())
+                self.async_database = self.async_client[self.database_name]
+                print(f"✅ Async MongoDB client created for: {self.database_name} "
+                      f"(pool {self.min_pool_size}-{self.max_pool_size})")
             
             return self.async_client
             
@@ -86,64 +242,56 @@ class MongoDBConfig:
             print(f"❌ Async MongoDB connection failed: {str(e)}")
             raise
     
+    def get_database(self):
+        """Get synchronous database"""
+        if self.database is None:
+            self.get_sync_client()
+        return self.database
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool checkout and wait metrics of all clients"""
+        return self.pool_metrics.snapshot()
+    
     def get_collection(self, collection_name: str):
-        """Get synchronous collection"""
-        if not self.database:
-            self.connect_sync()
+        """Get synchronous collection (CLI scripts only; blocks the calling thread)"""
+        if self.database is None:
+            self.get_sync_client()
         return self.database[self.collections[collection_name]]
     
     def get_async_collection(self, collection_name: str):
-        """Get asynchronous collection"""
-        if not self.async_database:
+        """Get asynchronous (Motor) collection for use inside the event loop"""
+        if self.async_database is None:
             self.connect_async()
         return self.async_database[self.collections[collection_name]]
     
+    def get_async_database(self):
+        """Get asynchronous (Motor) database, for commands such as dbStats"""
+        if self.async_database is None:
+            self.connect_async()
+        return self.async_database
+    
     def close_connections(self):
         """Close all database connections"""
         if self.sync_client:
             self.sync_client.close()
+            self.sync_client = None
+            self.database = None
             print("✅ Sync MongoDB connection closed")
         
         if self.async_client:
             self.async_client.close()
+            self.async_client = None
+            self.async_database = None
             print("✅ Async MongoDB connection closed")
     
     def create_indexes(self):
-        """Create database indexes for optimal performance"""
+        """Provision retention and create database indexes (defined in mongodb_indexes)"""
         try:
-            # Scraped data indexes
-            scraped_collection = self.get_collection('scraped_data')
-            scraped_collection.create_index([("source_id", 1)])
-            scraped_collection.create_index([("timestamp", -1)])
-            scraped_collection.create_index([("status", 1)])
-            
-            # Knowledge database indexes
-            knowledge_collection = self.get_collection('knowledge_database')
-            knowledge_collection.create_index([("category", 1)])
-            knowledge_collection.create_index([("last_updated", -1)])
-            
-            # Chat history indexes
-            chat_collection = self.get_collection('chat_history')
-            chat_collection.create_index([("user_id", 1)])
-            chat_collection.create_index([("timestamp", -1)])
-            chat_collection.create_index([("type", 1)])
-            
-            # User sessions indexes
-            sessions_collection = self.get_collection('user_sessions')
-            sessions_collection.create_index([("user_id", 1)], unique=True)
-            sessions_collection.create_index([("last_active", -1)])
-            
-            # Analytics indexes
-            analytics_collection = self.get_collection('analytics')
-            analytics_collection.create_index([("date", -1)])
-            analytics_collection.create_index([("user_id", 1)])
-            
-            # Scraping logs indexes
-            logs_collection = self.get_collection('scraping_logs')
-            logs_collection.create_index([("timestamp", -1)])
-            logs_collection.create_index([("source_id", 1)])
-            logs_collection.create_index([("status", 1)])
+            ensure_collections(self.get_database(), self.collections, self.retention_days, self.expiry_fields)
             
+            print("✅ Retention configured: " + ", ".join(
+                f"{name} {days} days" if days else f"{name} kept forever" for name, days in self.retention_days.items()
+            ))
             print("✅ MongoDB indexes created successfully")
             
         except Exception as e:
@@ -0,0 +1,202 @@
+"""
+MongoDB collection provisioning and index definitions
+
+The single list of indexes every collection should have, and the retention
+setup (time-series chat history, TTL indexes) that must run before them.
+Both deploy paths (``MongoDBConfig.create_indexes`` for ``init_mongodb.py``
+and ``app.core.database.create_indexes`` for ``init_db.py``) call
+``ensure_collections``. TTL indexes are not listed in ``INDEXES``; they
+follow the retention settings in ``MongoDBConfig.retention_days``.
+"""
+
+import logging
+from typing import Dict, List, Optional, Set
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure, PyMongoError
+
+# Relative weight of each field in knowledge text search scores
+KNOWLEDGE_TEXT_WEIGHTS = {"content": 1, "keywords": 4, "category": 2}
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "scraped_data": [
+        IndexModel([("source_id", ASCENDING)]),
+        IndexModel([("timestamp", DESCENDING)]),
+        IndexModel([("status", ASCENDING)])
+    ],
+    "scraped_pages": [
+        IndexModel([("source_id", ASCENDING), ("url", ASCENDING)], unique=True),
+        IndexModel([("source_id", ASCENDING), ("last_seen", ASCENDING)]),
+        IndexModel([("body_hash", ASCENDING)], sparse=True)
+    ],
+    "knowledge_database": [
+        IndexModel([("category", ASCENDING)]),
+        IndexModel([("content_hash", ASCENDING)], unique=True, sparse=True),
+        IndexModel([("last_updated", DESCENDING)]),
+        IndexModel([(field, TEXT) for field in KNOWLEDGE_TEXT_WEIGHTS],
+                   name="knowledge_text", weights=KNOWLEDGE_TEXT_WEIGHTS, default_language="english")
+    ],
+    "chat_history": [
+        # Serves per-user history reads (user_id match, newest first) without an in-memory sort
+        IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING)]),
+        IndexModel([("timestamp", DESCENDING)]),
+        IndexModel([("type", ASCENDING)])
+    ],
+    "user_sessions": [
+        IndexModel([("user_id", ASCENDING)], unique=True),
+        IndexModel([("last_active", DESCENDING)])
+    ],
+    "analytics": [
+        IndexModel([("date", DESCENDING)]),
+        IndexModel([("user_id", ASCENDING)])
+    ],
+    "scraping_logs": [
+        IndexModel([("timestamp", DESCENDING)]),
+        IndexModel([("source_id", ASCENDING)]),
+        IndexModel([("status", ASCENDING)])
+    ]
+}
+
+# Indexes made redundant by ones above (a prefix of a compound index), dropped if present
+RETIRED_INDEXES: Dict[str, List[str]] = {
+    "chat_history": ["user_id_1"]
+}
+
+# Index options that conflict with an existing index of the same name or keys
+INDEX_CONFLICT_CODES = {85, 86}  # IndexOptionsConflict, IndexKeySpecsConflict
+
+logger = logging.getLogger(__name__)
+
+
+def ensure_collections(database, collections: Dict[str, str], retention_days: Dict[str, int],
+                       expiry_fields: Dict[str, str]) -> None:
+    """Provision retention, then create the indexes in ``INDEXES``
+
+    The one entry point of both deploy paths. Retention must come first: a
+    time-series collection cannot replace one that already exists.
+    """
+    ensure_retention(database, collections, retention_days, expiry_fields)
+    ensure_indexes(database, collections)
+
+
+def ensure_retention(database, collections: Dict[str, str], retention_days: Dict[str, int],
+                     expiry_fields: Dict[str, str]) -> None:
+    """Provision chat_history as a time-series collection and expire old documents
+
+    chat_history becomes a time-series collection (MongoDB 5.0+) when it
+    does not exist yet; otherwise, and for analytics and scraping_logs
+    (which are updated in place), a TTL index on the expiry field removes
+    documents older than their retention. Re-running applies changed
+    retention settings with collMod. A retention of 0 days keeps documents
+    forever.
+    """
+    chat_name = collections['chat_history']
+    chat_retention = retention_days['chat_history'] * 86400
+    if chat_name not in database.list_collection_names():
+        options = {"timeseries": {"timeField": "timestamp", "metaField": "user_id", "granularity": "seconds"}}
+        if chat_retention:
+            options["expireAfterSeconds"] = chat_retention
+        try:
+            database.create_collection(chat_name, **options)
+            logger.info("✅ chat_history created as a time-series collection")
+        except OperationFailure as e:
+            logger.warning(f"⚠️ Time-series collections unavailable, using a TTL index for chat_history: {str(e)}")
+
+    for name, days in retention_days.items():
+        collection_name = collections[name]
+        if timeseries_fields(database, collection_name) is not None:
+            database.command("collMod", collection_name, expireAfterSeconds=days * 86400 if days else "off")
+        else:
+            _ensure_ttl_index(database, collection_name, expiry_fields[name], days * 86400)
+
+
+def timeseries_fields(database, collection_name: str) -> Optional[Set[str]]:
+    """Time and meta fields of a time-series collection, or None for a regular (or missing) one"""
+    info = database.command("listCollections", filter={"name": collection_name})["cursor"]["firstBatch"]
+    if not info or info[0].get("type") != "timeseries":
+        return None
+    options = info[0].get("options", {}).get("timeseries", {})
+    return {field for field in (options.get("timeField"), options.get("metaField")) if field}
+
+
+def _ensure_ttl_index(database, collection_name: str, field: str, seconds: int) -> None:
+    """Create, retune or (for ``seconds == 0``) drop the TTL index on ``field``"""
+    collection = database[collection_name]
+    index_name = f"{field}_ttl"
+    existing = collection.index_information().get(index_name)
+    if not seconds:
+        if existing:
+            collection.drop_index(index_name)
+    elif existing is None:
+        collection.create_index([(field, 1)], name=index_name, expireAfterSeconds=seconds)
+    elif existing.get("expireAfterSeconds") != seconds:
+        database.command("collMod", collection_name, index={"name": index_name, "expireAfterSeconds": seconds})
+
+
+def ensure_indexes(database, collections: Dict[str, str] = None) -> None:
+    """Create the indexes in ``INDEXES`` on a synchronous pymongo database
+
+    ``collections`` maps logical names to stored collection names (defaults
+    to the same names). A collection has only one text index, so a text
+    index other than the defined one is dropped first; an existing index
+    that conflicts with a defined one (same name, or same keys under another
+    name) is dropped and recreated. Indexes listed in ``RETIRED_INDEXES``
+    are dropped. On a time-series collection, indexes on fields other than
+    its time and meta fields are skipped, since MongoDB 5.0 rejects them. A
+    collection that fails does not stop the others; the failures are raised
+    together at the end.
+    """
+    failed = []
+    for name, indexes in INDEXES.items():
+        collection_name = collections.get(name, name) if collections else name
+        try:
+            _ensure_collection_indexes(database[collection_name], name, indexes,
+                                       timeseries_fields(database, collection_name))
+        except PyMongoError as e:
+            logger.error(f"❌ Failed to create indexes on {collection_name}: {str(e)}")
+            failed.append(collection_name)
+    if failed:
+        raise OperationFailure(f"Index creation failed on: {', '.join(failed)}")
+
+
+def _ensure_collection_indexes(collection, name: str, indexes: List[IndexModel],
+                               timeseries: Optional[Set[str]] = None) -> None:
+    if timeseries is not None:
+        skipped = [index.document["name"] for index in indexes
+                   if not all(field.split(".")[0] in timeseries for field in index.document["key"])]
+        if skipped:
+            logger.info(f"ℹ️ Skipping indexes not supported on time-series {collection.name}: {', '.join(skipped)}")
+        indexes = [index for index in indexes if index.document["name"] not in skipped]
+    existing = collection.index_information()
+
+    wanted_text = [index.document["name"] for index in indexes if TEXT in index.document["key"].values()]
+    for index_name, info in existing.items():
+        if any(kind == TEXT for _, kind in info["key"]) and index_name not in wanted_text:
+            collection.drop_index(index_name)
+    for index_name in RETIRED_INDEXES.get(name, []):
+        if index_name in existing:
+            collection.drop_index(index_name)
+
+    for index in indexes:
+        try:
+            collection.create_indexes([index])
+        except OperationFailure as e:
+            if e.code not in INDEX_CONFLICT_CODES:
+                raise
+            conflicting = _conflicting_index(collection.index_information(), index)
+            if conflicting is None:
+                raise
+            # Same name with other keys or options, or same keys under another name: replace it
+            collection.drop_index(conflicting)
+            collection.create_indexes([index])
+
+
+def _conflicting_index(existing: Dict[str, dict], index: IndexModel) -> Optional[str]:
+    """Name of the existing index ``index`` collides with: the one with its name, else the one with its keys"""
+    if index.document["name"] in existing:
+        return index.document["name"]
+    keys = [tuple(key) for key in index.document["key"].items()]
+    for index_name, info in existing.items():
+        if [tuple(key) for key in info["key"]] == keys:
+            return index_name
+    return None
@@ -0,0 +1,109 @@
+"""
+MinHash near-duplicate detection for scraped text
+
+Each text is reduced to the set of its word bigrams, and a bottom-k MinHash
+signature (the ``SIGNATURE_SIZE`` smallest bigram hashes) estimates the
+Jaccard similarity between two texts. Texts at or above
+``SIMILARITY_THRESHOLD`` are near-duplicates: the same menu, footer or banner
+with a changed date or counter.
+
+``NearDuplicateIndex`` avoids comparing every pair: texts are bucketed by the
+``LSH_KEYS`` smallest hashes of their signature, and only texts sharing a
+bucket are compared.
+
+Shingles are hashed with Python's built-in (per-process salted) string hash,
+so signatures are only comparable within one process and never persisted.
+"""
+
+import heapq
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SIGNATURE_SIZE = 16  # Bottom-k MinHash signature length
+LSH_KEYS = 4  # Smallest signature hashes used as bucket keys
+SIMILARITY_THRESHOLD = 0.7  # Estimated Jaccard similarity of near-duplicate text blocks
+PAGE_SIMILARITY_THRESHOLD = 0.9  # Stricter for whole pages, which share their boilerplate
+MAX_BUCKET_CANDIDATES = 64  # Most recent texts compared per bucket
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text: str) -> List[str]:
+    """Word bigrams of the lowercased text (single words for one-word texts)"""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < 2:
+        return words
+    return [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def signature(text: str) -> Tuple[int, ...]:
+    """Bottom-k MinHash signature of ``text``, smallest hash first"""
+    return tuple(sorted(heapq.nsmallest(SIGNATURE_SIZE, set(map(hash, shingles(text))))))
+
+
+def estimate_similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    """Jaccard similarity estimated from two bottom-k signatures"""
+    if not first or not second:
+        return 0.0
+    first_set, second_set = set(first), set(second)
+    union = heapq.nsmallest(SIGNATURE_SIZE, first_set | second_set)
+    return sum(1 for value in union if value in first_set and value in second_set) / len(union)
+
+
+class NearDuplicateIndex:
+    """Clusters of near-duplicate texts; the first text added to a cluster is its canonical member"""
+
+    __slots__ = ("threshold", "_buckets", "_exact", "_signatures")
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._buckets: Dict[int, List[int]] = {}
+        self._exact: Dict[str, int] = {}
+        self._signatures: List[Tuple[int, ...]] = []
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def find(self, text: str, text_signature: Optional[Tuple[int, ...]] = None) -> Optional[int]:
+        """Cluster id of a text near-duplicate to ``text``, or None"""
+        cluster = self._exact.get(" ".join(text.lower().split()))
+        if cluster is not None:
+            return cluster
+        text_signature = signature(text) if text_signature is None else text_signature
+        checked = set()
+        for key in text_signature[:LSH_KEYS]:
+            for candidate in reversed(self._buckets.get(key, [])[-MAX_BUCKET_CANDIDATES:]):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                if estimate_similarity(text_signature, self._signatures[candidate]) >= self.threshold:
+                    return candidate
+        return None
+
+    def add(self, text: str, text_signature: Optional[Tuple[int, ...]] = None) -> int:
+        """Cluster id of ``text``, starting a new cluster if it has no near-duplicate yet"""
+        text_signature = signature(text) if text_signature is None else text_signature
+        cluster = self.find(text, text_signature)
+        if cluster is not None:
+            return cluster
+
+        cluster = len(self._signatures)
+        self._signatures.append(text_signature)
+        self._exact[" ".join(text.lower().split())] = cluster
+        for key in text_signature[:LSH_KEYS]:
+            self._buckets.setdefault(key, []).append(cluster)
+        return cluster
+
+
+def boilerplate_clusters(page_clusters: Iterable[Iterable[int]], total_pages: int,
+                         min_pages: int = 5, min_ratio: float = 0.2) -> set:
+    """Clusters that occur on at least ``min_pages`` pages and ``min_ratio`` of all pages
+
+    ``page_clusters`` holds the cluster ids of the text blocks of each page.
+    """
+    page_counts: Dict[int, int] = {}
+    for clusters in page_clusters:
+        for cluster in set(clusters):
+            page_counts[cluster] = page_counts.get(cluster, 0) + 1
+    threshold = max(min_pages, min_ratio * total_pages)
+    return {cluster for cluster, count in page_counts.items() if count >= threshold}
@@ -0,0 +1,151 @@
+"""
+Content-addressed store of raw crawled page bodies
+
+Each distinct body is written once, compressed, to ``<directory>/<ab>/<sha256>``
+where ``ab`` is the first two hex digits of its SHA-256. A recrawl that
+fetches the same bytes again finds the file already there and writes
+nothing, so page records (and the Mongo ``scraped_pages`` documents built
+from them) only carry the hash as a reference.
+
+Bodies are compressed with zstd when the optional ``zstandard`` package is
+installed and with zlib otherwise; the file suffix records which, so a store
+written with one codec stays readable after the other becomes available.
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+import zlib
+from typing import Dict, Iterable, Optional
+
+try:
+    import zstandard  # Optional: better ratio and speed than zlib
+except ImportError:
+    zstandard = None
+
+# Shared by the crawler (writer) and DatabaseService (reader)
+RAW_PAGES_DIR = os.getenv("RAW_PAGES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "raw_pages"))
+
+ZSTD_SUFFIX = ".zst"
+ZLIB_SUFFIX = ".zz"
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 6
+
+
+def body_hash(body: bytes) -> str:
+    """Address of a body in the store"""
+    return hashlib.sha256(body).hexdigest()
+
+
+class PageBodyStore:
+    """Raw page bodies on disk, stored once per distinct content"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL) if zstandard else None
+
+    def _path(self, digest: str, suffix: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest + suffix)
+
+    def find(self, digest: str) -> Optional[str]:
+        """Path of the stored body with ``digest``, or None"""
+        for suffix in (ZSTD_SUFFIX, ZLIB_SUFFIX):
+            path = self._path(digest, suffix)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def __contains__(self, digest: str) -> bool:
+        return self.find(digest) is not None
+
+    def put(self, body: bytes, digest: Optional[str] = None) -> str:
+        """Store ``body`` unless it is already stored and return its hash
+
+        ``digest`` saves rehashing when the caller already has the SHA-256.
+        A body that is already stored only has its modification time bumped.
+        Files are written to a temporary name and renamed into place, so
+        concurrent writers of the same body and readers never see a partial
+        file.
+        """
+        digest = digest or body_hash(body)
+        existing = self.find(digest)
+        if existing is not None:
+            try:
+                os.utime(existing)  # Still in use: keep it out of prune()'s age window
+            except FileNotFoundError:
+                pass
+            else:
+                return digest
+        if self._compressor is not None:
+            data, suffix = self._compressor.compress(body), ZSTD_SUFFIX
+        else:
+            data, suffix = zlib.compress(body, ZLIB_LEVEL), ZLIB_SUFFIX
+        path = self._path(digest, suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """The stored body with ``digest``, or None"""
+        path = self.find(digest)
+        if path is None:
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+        if path.endswith(ZLIB_SUFFIX):
+            return zlib.decompress(data)
+        if zstandard is None:
+            raise RuntimeError(f"zstandard is required to read {path}")
+        return zstandard.ZstdDecompressor().decompress(data)
+
+    def prune(self, keep: Iterable[str], min_age: float = 3600) -> int:
+        """Delete bodies not in ``keep`` and untouched for ``min_age`` seconds
+
+        The age check leaves alone bodies a crawl that is still running has
+        just written but not yet published. Returns the number deleted.
+        """
+        keep = set(keep)
+        cutoff = time.time() - min_age
+        removed = 0
+        for path, digest in self._files():
+            if digest in keep:
+                continue
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        """Number of stored bodies and their compressed size in bytes"""
+        bodies = size = 0
+        for path, _ in self._files():
+            try:
+                size += os.path.getsize(path)
+                bodies += 1
+            except FileNotFoundError:
+                pass
+        return {"bodies": bodies, "bytes": size}
+
+    def _files(self):
+        if not os.path.isdir(self.directory):
+            return
+        for prefix in os.listdir(self.directory):
+            prefix_dir = os.path.join(self.directory, prefix)
+            if len(prefix) != 2 or not os.path.isdir(prefix_dir):
+                continue
+            for name in os.listdir(prefix_dir):
+                digest, suffix = os.path.splitext(name)
+                if suffix in (ZSTD_SUFFIX, ZLIB_SUFFIX):
+                    yield os.path.join(prefix_dir, name), digest
@@ -0,0 +1,249 @@
+"""
+Flat table of crawled pages
+
+Every crawled page is one compact ``PageRecord`` keyed by URL within its
+source, with a link to its parent page instead of a nested ``sub_pages``
+list. Repeated strings (URLs, source names, boilerplate snippets that appear
+on every page) are interned, and each record's size and item count are
+computed once when it is stored, so per-source summaries are plain counters.
+
+``page_tree`` rebuilds the old nested ``sub_pages`` layout for API responses
+that still return it.
+
+Sources loaded from a snapshot start out as published counters only; their
+records are decoded the first time a reader needs them.
+"""
+
+import sys
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+RECORD_FIELDS = (
+    "source_id", "source", "url", "parent_url", "depth", "timestamp",
+    "status", "content", "error", "reason", "unchanged", "body_hash"
+)
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def intern_content(value):
+    """Copy of page ``content`` with every string (keys and values) interned"""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        return {sys.intern(key): intern_content(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [intern_content(item) for item in value]
+    return value
+
+
+def measure_content(value) -> int:
+    """Characters of text held in ``content``"""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(measure_content(item) for item in value.values())
+    if isinstance(value, list):
+        return sum(measure_content(item) for item in value)
+    return 0
+
+
+class PageRecord:
+    """One crawled page"""
+
+    __slots__ = RECORD_FIELDS + ("content_size", "item_count")
+
+    def __init__(self, source_id: str, source: str, url: str, parent_url: Optional[str] = None,
+                 depth: int = 0, timestamp: str = "", status: str = "success",
+                 content: Optional[Dict[str, Any]] = None, error: Optional[str] = None,
+                 reason: Optional[str] = None, unchanged: bool = False,
+                 body_hash: Optional[str] = None):
+        self.source_id = _intern(source_id)
+        self.source = _intern(source)
+        self.url = _intern(url)
+        self.parent_url = _intern(parent_url)
+        self.depth = depth
+        self.timestamp = timestamp
+        self.status = _intern(status)
+        self.content = intern_content(content or {})
+        self.error = error
+        self.reason = reason
+        self.unchanged = unchanged
+        self.body_hash = body_hash  # Raw body in the PageBodyStore, when one is kept
+        self.content_size = measure_content(self.content)
+        self.item_count = sum(len(items) for items in self.content.values() if isinstance(items, list))
+
+    def to_dict(self, include_content: bool = True) -> Dict[str, Any]:
+        """The page in the field layout API responses have always used"""
+        page = {
+            "source": self.source,
+            "url": self.url,
+            "depth": self.depth,
+            "timestamp": self.timestamp,
+            "status": self.status
+        }
+        if include_content and self.status != "error":
+            page["content"] = self.content
+        if self.error is not None:
+            page["error"] = self.error
+        if self.reason is not None:
+            page["reason"] = self.reason
+        if self.unchanged:
+            page["unchanged"] = True
+        return page
+
+    def to_row(self) -> Dict[str, Any]:
+        """All stored fields, for persisting the table"""
+        return {field: getattr(self, field) for field in RECORD_FIELDS}
+
+
+def page_tree(records: Iterable[PageRecord], include_content: bool = True) -> Optional[Dict[str, Any]]:
+    """Nest flat records under their parents in the old ``sub_pages`` layout
+
+    Records without a stored parent are roots. A single root is returned as
+    is; several roots (e.g. PDF documents) are wrapped in one synthetic page.
+    """
+    records = list(records)
+    nodes = {}
+    for record in records:
+        node = record.to_dict(include_content)
+        node["sub_pages"] = []
+        nodes[record.url] = node
+    roots = []
+    for record in records:
+        parent = nodes.get(record.parent_url) if record.parent_url else None
+        (parent["sub_pages"] if parent is not None else roots).append(nodes[record.url])
+    if not roots:
+        return None
+    if len(roots) == 1:
+        return roots[0]
+    return {
+        "source": records[0].source,
+        "url": "",
+        "depth": 0,
+        "timestamp": max(record.timestamp for record in records),
+        "status": "success",
+        "content": {},
+        "sub_pages": roots
+    }
+
+
+class SourceStats:
+    """Counters for one source, computed when its pages are stored"""
+
+    __slots__ = ("pages", "successful", "errors", "content_size", "items", "last_scraped", "status")
+
+    def __init__(self, records: List[PageRecord]):
+        self.pages = len(records)
+        self.successful = sum(1 for record in records if record.status == "success")
+        self.errors = sum(1 for record in records if record.status == "error")
+        self.content_size = sum(record.content_size for record in records)
+        self.items = sum(record.item_count for record in records)
+        self.last_scraped = max((record.timestamp for record in records), default="Never")
+        roots = [record for record in records if record.parent_url is None]
+        self.status = roots[0].status if len(roots) == 1 else ("success" if self.successful else "error")
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> "SourceStats":
+        """Counters saved with ``to_dict``"""
+        stats = cls.__new__(cls)
+        for field in cls.__slots__:
+            setattr(stats, field, values.get(field))
+        return stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+class PageStore:
+    """Crawled pages of every source, replaced one whole source at a time
+
+    Readers never see a half-replaced source: each crawl's pages are
+    installed with a single dict assignment under the store's lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sources: Dict[str, Dict[str, PageRecord]] = {}
+        self._stats: Dict[str, SourceStats] = {}
+        # Published sources whose records are decoded on first use
+        self._pending: Dict[str, Callable[[], Iterable[Dict[str, Any]]]] = {}
+
+    def replace_source(self, source_id: str, records: Iterable[PageRecord]) -> List[str]:
+        """Install a new crawl of ``source_id``; returns URLs that appeared, disappeared or changed status"""
+        pages = {record.url: record for record in records}
+        stats = SourceStats(list(pages.values()))
+        previous = self._records(source_id)
+        with self._lock:
+            self._sources[source_id] = pages
+            self._stats[source_id] = stats
+            self._pending.pop(source_id, None)
+        changed = [url for url, record in pages.items() if url not in previous or previous[url].status != record.status]
+        changed.extend(url for url in previous if url not in pages)
+        return changed
+
+    def add_published(self, source_id: str, stats: SourceStats, load_rows: Callable[[], Iterable[Dict[str, Any]]]):
+        """Add a source by its counters; ``load_rows()`` returns its ``source_rows`` when first needed"""
+        with self._lock:
+            self._sources.pop(source_id, None)
+            self._stats[source_id] = stats
+            self._pending[source_id] = load_rows
+
+    def _records(self, source_id: str) -> Dict[str, PageRecord]:
+        load_rows = self._pending.get(source_id)
+        if load_rows is not None:
+            records = [PageRecord(**{field: row.get(field) for field in RECORD_FIELDS if field in row}) for row in load_rows()]
+            with self._lock:
+                if self._pending.get(source_id) is load_rows:
+                    self._sources[source_id] = {record.url: record for record in records}
+                    del self._pending[source_id]
+        return self._sources.get(source_id, {})
+
+    def __contains__(self, source_id: str) -> bool:
+        return source_id in self._stats
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def __bool__(self) -> bool:
+        return bool(self._stats)
+
+    def sources(self) -> List[str]:
+        return list(self._stats)
+
+    def get(self, source_id: str, url: str) -> Optional[PageRecord]:
+        return self._records(source_id).get(url)
+
+    def pages(self, source_id: Optional[str] = None) -> Iterator[PageRecord]:
+        """Records of one source, or of every source, in crawl order"""
+        if source_id is not None:
+            yield from list(self._records(source_id).values())
+            return
+        for source in self.sources():
+            yield from list(self._records(source).values())
+
+    def root(self, source_id: str) -> Optional[PageRecord]:
+        for record in self._records(source_id).values():
+            if record.parent_url is None:
+                return record
+        return None
+
+    def stats(self, source_id: str) -> Optional[SourceStats]:
+        return self._stats.get(source_id)
+
+    @property
+    def page_count(self) -> int:
+        return sum(stats.pages for stats in list(self._stats.values()))
+
+    @property
+    def last_updated(self) -> str:
+        return max((stats.last_scraped for stats in list(self._stats.values())), default="Never")
+
+    def tree(self, source_id: str, include_content: bool = True) -> Optional[Dict[str, Any]]:
+        return page_tree(self.pages(source_id), include_content)
+
+    def source_rows(self, source_id: str) -> List[Dict[str, Any]]:
+        """All records of one source as rows, for persisting the table"""
+        return [record.to_row() for record in self.pages(source_id)]
@@ -37,15 +37,14 @@ def test_backend():
         if response.status_code == 200:
             data = response.json()
             print(f"📊 Total sources: {data.get('total_sources', 0)}")
-            sources = data.get('scraped_data', {})
-            for source_id, source_data in sources.items():
+            print(f"📄 Total pages: {data.get('total_pages', 0)}")
+            for source_id, source_data in data.get('summary', {}).get('sources', {}).items():
                 print(f"  - {source_id}: {source_data.get('status', 'unknown')}")
-                if 'content' in source_data:
-                    content = source_data['content']
-                    if 'admission_info' in content:
-                        print(f"    📝 Admission items: {len(content['admission_info'])}")
-                    if 'sub_pages' in source_data:
-                        print(f"    🔗 Sub-pages: {len(source_data['sub_pages'])}")
+                print(f"    🔗 Pages: {source_data.get('pages', 0)}")
+            for page in data.get('pages', []):
+                admission_info = page.get('content', {}).get('admission_info', [])
+                if admission_info:
+                    print(f"    📝 Admission items on {page['url']}: {len(admission_info)}")
     except Exception as e:
         print(f"❌ Debug data failed: {e}")
     
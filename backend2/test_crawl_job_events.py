@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Check that crawl job progress events stream incrementally
+
+Queues the small test crawl on a running backend and reads its server-sent
+events with ``Accept-Encoding: gzip``, the way browsers ask for them. The
+stream must come back uncompressed, and its events must arrive spread over
+the crawl rather than in one burst when the job ends.
+"""
+
+import json
+import time
+
+import requests
+
+BASE_URL = "http://localhost:8000"
+MIN_SPREAD = 1.0  # Seconds between the first and the final event of an incremental stream
+
+
+def test_crawl_job_events():
+    """Stream the events of a test crawl and report when each one arrived"""
+    print("🧪 Testing crawl job event streaming...")
+
+    response = requests.post(f"{BASE_URL}/api/test-scraping")
+    if response.status_code != 202:
+        print(f"❌ Could not queue the test crawl: {response.status_code} {response.text}")
+        return False
+    job = response.json()["job"]
+    print(f"📋 Job {job['id']} {job['status']}, streaming {job['events_url']}")
+
+    started = time.perf_counter()
+    arrivals = []
+    with requests.get(f"{BASE_URL}{job['events_url']}", headers={"Accept-Encoding": "gzip"}, stream=True, timeout=300) as stream:
+        encoding = stream.headers.get("Content-Encoding")
+        if encoding:
+            print(f"❌ Event stream is {encoding}-encoded; events would be buffered by the compressor")
+            return False
+        print(f"✅ Event stream is uncompressed ({stream.headers.get('Content-Type')})")
+
+        event = None
+        for line in stream.iter_lines(chunk_size=1, decode_unicode=True):
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                elapsed = time.perf_counter() - started
+                arrivals.append((event, elapsed))
+                data = json.loads(line[len("data: "):])
+                print(f"  {elapsed:6.2f}s  {event:<16} {data.get('url', '')}")
+                if event in ("completed", "failed"):
+                    break
+
+    if not arrivals or arrivals[-1][0] not in ("completed", "failed"):
+        print("❌ Stream ended before the job finished")
+        return False
+
+    spread = arrivals[-1][1] - arrivals[0][1]
+    if len(arrivals) < 3 or spread < MIN_SPREAD:
+        print(f"❌ {len(arrivals)} events arrived within {spread:.2f}s - they were not streamed as they happened")
+        return False
+    print(f"✅ {len(arrivals)} events arrived over {spread:.2f}s")
+    return True
+
+
+if __name__ == "__main__":
+    test_crawl_job_events()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Measure event-loop lag while DatabaseService handles concurrent chat load
+
+A probe task sleeps for a fixed interval over and over; any time it wakes up
+late is time the event loop spent blocked. Run it against a live MongoDB
+before and after a DatabaseService change and compare the lag percentiles.
+"""
+
+import asyncio
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+PROBE_INTERVAL = 0.01  # Seconds between event-loop probes
+CONCURRENT_USERS = 50
+TURNS_PER_USER = 20
+
+
+async def probe_event_loop(lags: list, stop: asyncio.Event):
+    """Record how late each PROBE_INTERVAL sleep wakes up, in milliseconds"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(max(0.0, loop.time() - started - PROBE_INTERVAL) * 1000)
+
+
+async def chat_user(db_service, user_id: str, response_times: list):
+    """The database calls one chat turn makes, repeated TURNS_PER_USER times"""
+    for turn in range(TURNS_PER_USER):
+        started = time.perf_counter()
+        await db_service.search_knowledge_database("admission engineering courses", limit=6)
+        await db_service.get_chat_history(user_id, limit=20)
+        await db_service.save_chat_message(user_id, f"question {turn}", "answer", 0.1, "database")
+        await db_service.update_user_session(user_id, response_time=0.1)
+        await db_service.update_analytics(user_id, 0.1, "database", "admissions")
+        response_times.append((time.perf_counter() - started) * 1000)
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+async def test_event_loop_lag():
+    """Run the chat load and report event-loop lag and per-turn latency"""
+    from database_service import db_service
+
+    print(f"🧪 Measuring event-loop lag: {CONCURRENT_USERS} users x {TURNS_PER_USER} chat turns...")
+
+    lags, response_times = [], []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_event_loop(lags, stop))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        chat_user(db_service, f"lag_test_user_{user}", response_times)
+        for user in range(CONCURRENT_USERS)
+    ))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe
+
+    print(f"⏱️ Total time: {elapsed:.2f}s ({len(response_times) / elapsed:.1f} turns/s)")
+    print(f"🔁 Event-loop lag: p50 {percentile(lags, 0.5):.1f}ms, "
+          f"p99 {percentile(lags, 0.99):.1f}ms, max {max(lags, default=0.0):.1f}ms")
+    print(f"💬 Chat turn latency: mean {statistics.mean(response_times):.1f}ms, "
+          f"p99 {percentile(response_times, 0.99):.1f}ms")
+
+    pool = db_service.get_pool_stats()
+    print(f"🏊 Pool checkouts: {pool['checkouts']}, wait avg {pool['average_wait_ms']:.1f}ms, "
+          f"p95 {pool['recent_p95_wait_ms']:.1f}ms, max {pool['max_wait_ms']:.1f}ms")
+
+    db_service.close_connections()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(test_event_loop_lag())
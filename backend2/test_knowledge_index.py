@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Check that knowledge lookups match plurals and dotted abbreviations
+
+Builds a small knowledge database into both a ``KnowledgeIndex`` and a
+snapshot, then asks each for items by the words students actually type:
+"admission" must find "Admissions ...", "btech" and "b.tech" must find
+"B.Tech ...". Runs without a backend or network.
+"""
+
+import tempfile
+
+from knowledge_index import KnowledgeIndex, SnapshotKnowledgeIndex
+from knowledge_snapshot import KnowledgeSnapshot, write_snapshot
+
+KNOWLEDGE = {
+    "admissions": [
+        "Admissions for 2025 are open through SRMJEEE",
+        "B.Tech applicants need 60% in Physics, Chemistry and Mathematics"
+    ],
+    "courses": [
+        "M.B.A and Ph.D programmes are offered at the Kattankulathur campus",
+        "Faculties run evening classes for working professionals"
+    ],
+    "fees": ["Hostel fees include mess charges"]
+}
+
+# Query -> text the item it must return starts with
+EXPECTED = {
+    "admission": "Admissions",
+    "admissions process": "Admissions",
+    "btech": "B.Tech",
+    "b.tech eligibility": "B.Tech",
+    "B.Tech": "B.Tech",
+    "mba": "M.B.A",
+    "phd programme": "M.B.A",
+    "faculty": "Faculties",
+    "class timings": "Faculties",
+    "hostel fee": "Hostel"
+}
+
+
+def test_knowledge_index():
+    """Run every EXPECTED query against a built index and a snapshot index"""
+    print("🧪 Testing knowledge index recall...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot = KnowledgeSnapshot(write_snapshot(directory, KNOWLEDGE, 1))
+        indexes = {"built": KnowledgeIndex(KNOWLEDGE), "snapshot": SnapshotKnowledgeIndex(snapshot)}
+
+        failures = 0
+        for name, index in indexes.items():
+            for query, expected in EXPECTED.items():
+                results = index.search(query, limit=1)
+                if results and results[0].startswith(expected):
+                    print(f"✅ {name}: {query!r} -> {results[0][:40]}")
+                else:
+                    failures += 1
+                    print(f"❌ {name}: {query!r} -> {results}, expected an item starting with {expected!r}")
+
+        del indexes
+        snapshot.close()
+
+    assert failures == 0, f"{failures} lookups missed"
+    print("✅ Every lookup found its item")
+
+
+if __name__ == "__main__":
+    test_knowledge_index()